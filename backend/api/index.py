@@ -5,21 +5,54 @@ import os
 import sys
 import logging
 import time
-import re
 import json
 import asyncio
+import hashlib
+import itertools
+import threading
+import tempfile
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 import httpx
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from flask_socketio import SocketIO
+from flask_socketio import SocketIO, join_room
 from pydantic import BaseModel
 
+from src.agents.agent_gc import DEFAULT_GC_PATH, AgentCollector
+from src.agents.templates import DEFAULT_AGENT_TEMPLATES
+from src.agents.template_agents import (
+    DEFAULT_REGISTRY_PATH,
+    TemplateAgentRegistry,
+    build_client_data,
+    config_fingerprint,
+    dynamic_variables,
+)
+from src.campaigns.calling_windows import DEFAULT_SCHEDULED_PATH, CallScheduler, CallingWindow
+from src.campaigns.contacts import ContactIngest, detect_format, normalize_e164
+from src.campaigns.engine import CampaignEngine
+from src.campaigns.recurring import DEFAULT_RECURRING_PATH, RecurringScheduler
+from src.extraction.incremental import live_extractions
+from src.jobs.call_watcher import CallWatcher
+from src.jobs.job_queue import JobQueue, JobQueueFull, RetryLater
+from src.extraction.schema import compile_template_schemas
+from src.extraction.transcript import extract_information_from_transcript, normalize_transcript
+from src.reliability.admission import AdmissionController, AdmissionRejected
+from src.reliability.circuit_breaker import CircuitBreakers, CircuitOpen
+from src.reliability.deadline import DeadlineExceeded, deadline, deadline_expired, request_timeout, run_stage
+from src.reliability.hedging import RequestHedger
+from src.reliability.idempotency import IdempotencyConflict, IdempotencyStore
+from src.reliability.status_cache import StatusCache
+from src.routes.phone_calls import init_phone_calls, phone_calls_bp
+from src.telephony.suppression import suppression_list
+
 # Disable Flask's default request logging
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)
@@ -33,6 +66,16 @@ CORS(app, origins="*")
 # Initialize Socket.IO
 sio = SocketIO(app, cors_allowed_origins="*")
 
+# Long-running servers load persisted state and start background workers at import. Serverless
+# deployments (vercel.json: read-only filesystem, no lasting threads) start them on first use instead
+START_BACKGROUND_WORKERS = os.getenv(
+    'START_BACKGROUND_WORKERS', '0' if os.getenv('VERCEL') else '1'
+).lower() in ('1', 'true', 'yes')
+
+# Twilio call routes and the ElevenLabs webhook that feeds live extraction
+init_phone_calls(emit_fn=lambda event, payload, room: sio.emit(event, payload, room=room))
+app.register_blueprint(phone_calls_bp, url_prefix='/api/phone')
+
 # ElevenLabs configuration
 ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY', 'your-api-key-here')
 ELEVENLABS_BASE_URL = "https://api.elevenlabs.io/v1"
@@ -64,15 +107,75 @@ class AgentConfig(BaseModel):
     voice_id: str = "21m00Tcm4TlvDq8ikWAM"
     language: str = "en"
     first_message: Optional[str] = None
+    allow_overrides: bool = False  # Let batch recipients override first message and language
+
+# Set inside ElevenLabsClient.session() so concurrent requests share one connection pool
+shared_http_client: ContextVar[Optional[httpx.AsyncClient]] = ContextVar('shared_http_client', default=None)
 
 class ElevenLabsClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, hedger: Optional[RequestHedger] = None, timeout: float = 5.0,
+                 breakers: Optional[CircuitBreakers] = None):
         self.api_key = api_key
+        self.hedger = hedger
+        self.breakers = breakers
+        self.timeout = timeout  # Per request; shortened to whatever is left of the request's deadline
         self.headers = {
             "xi-api-key": api_key,
             "Content-Type": "application/json"
         }
 
+    @asynccontextmanager
+    async def session(self, max_connections: int = 20):
+        """Share one pooled AsyncClient across every request made inside this block"""
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        async with httpx.AsyncClient(limits=limits) as client:
+            token = shared_http_client.set(client)
+            try:
+                yield client
+            finally:
+                shared_http_client.reset(token)
+
+    @asynccontextmanager
+    async def http(self):
+        """The session's shared client if there is one, otherwise a client for this request only"""
+        client = shared_http_client.get()
+        if client is not None:
+            yield client
+        else:
+            async with httpx.AsyncClient() as client:
+                yield client
+
+    async def send(self, endpoint: str, request_fn: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Make one upstream request through the endpoint's circuit breaker"""
+        if self.breakers is None:
+            return await request_fn()
+        breaker = self.breakers.get(endpoint)
+        if not breaker.allow():
+            raise CircuitOpen(endpoint, breaker.retry_after())
+        started = time.monotonic()
+        try:
+            response = await request_fn()
+        except DeadlineExceeded:
+            raise  # Our own budget ran out; that says nothing about the upstream
+        except Exception:
+            breaker.record(False, time.monotonic() - started)
+            raise
+        breaker.record(response.status_code < 500 and response.status_code != 429, time.monotonic() - started)
+        return response
+
+    async def get(self, endpoint: str, url: str, **kwargs) -> httpx.Response:
+        """GET an idempotent resource, hedged against slow responses when a hedger is configured"""
+        async with self.http() as client:
+            if self.hedger is None:
+                return await self.send(endpoint, lambda: client.get(
+                    url, headers=self.headers, timeout=request_timeout(self.timeout), **kwargs
+                ))
+            return await self.send(endpoint, lambda: self.hedger.run(
+                endpoint,
+                lambda: client.get(url, headers=self.headers, timeout=request_timeout(self.timeout), **kwargs),
+                is_ok=lambda response: response.status_code < 500
+            ))
+
     async def create_agent(self, config: AgentConfig) -> Dict:
         """Create a new conversational AI agent"""
         url = f"{ELEVENLABS_BASE_URL}/convai/agents/create"
@@ -96,9 +199,23 @@ class ElevenLabsClient:
             }
         }
         
-        async with httpx.AsyncClient() as client:
+        if config.allow_overrides:
+            payload["platform_settings"] = {
+                "overrides": {
+                    "conversation_config_override": {
+                        "agent": {
+                            "first_message": True,
+                            "language": True
+                        }
+                    }
+                }
+            }
+        
+        async with self.http() as client:
             try:
-                response = await client.post(url, json=payload, headers=self.headers)
+                response = await self.send("create_agent", lambda: client.post(
+                    url, json=payload, headers=self.headers, timeout=request_timeout(self.timeout)
+                ))
                 print(f"🔍 Agent Creation - Status: {response.status_code}")
                 
                 if response.status_code == 200:
@@ -122,8 +239,18 @@ class ElevenLabsClient:
                     "error": f"Exception creating agent: {str(e)}"
                 }
 
-    async def create_batch_call(self, agent_id: str, phone_number: str, call_name: str) -> Dict:
-        """Create a batch call"""
+    async def create_batch_call(self, agent_id: str, phone_number: str, call_name: str,
+                                client_data: Optional[Dict] = None, scheduled_time_unix: Optional[int] = None) -> Dict:
+        """Create a batch call to a single recipient"""
+        recipient = {"phone_number": phone_number}
+        if client_data:
+            # Per-call dynamic variables / overrides for a shared template agent
+            recipient["conversation_initiation_client_data"] = client_data
+        return await self.submit_batch_call(agent_id, [recipient], call_name, scheduled_time_unix)
+
+    async def submit_batch_call(self, agent_id: str, recipients: List[Dict], call_name: str,
+                                scheduled_time_unix: Optional[int] = None) -> Dict:
+        """Submit a batch call for one or more recipients, now or at scheduled_time_unix"""
         url = f"{ELEVENLABS_BASE_URL}/convai/batch-calling/submit"
         
         current_time = int(time.time())
@@ -132,19 +259,17 @@ class ElevenLabsClient:
             "call_name": call_name,
             "agent_id": agent_id,
             "agent_phone_number_id": ELEVENLABS_PHONE_NUMBER_ID,
-            "scheduled_time_unix": current_time,
-            "recipients": [
-                {
-                    "phone_number": phone_number
-                }
-            ]
+            "scheduled_time_unix": max(scheduled_time_unix or current_time, current_time),
+            "recipients": recipients
         }
         
         print(f"🔍 Batch Call Payload: {json.dumps(payload, indent=2)}")
         
-        async with httpx.AsyncClient() as client:
+        async with self.http() as client:
             try:
-                response = await client.post(url, json=payload, headers=self.headers)
+                response = await self.send("submit_batch_call", lambda: client.post(
+                    url, json=payload, headers=self.headers, timeout=request_timeout(self.timeout)
+                ))
                 print(f"🔍 Batch Call - Status: {response.status_code}")
                 print(f"🔍 Batch Call - Response: {response.text}")
                 
@@ -158,92 +283,173 @@ class ElevenLabsClient:
                 else:
                     return {
                         "success": False,
-                        "error": f"Failed to create batch call: {response.status_code} - {response.text}"
+                        "error": f"Failed to create batch call: {response.status_code} - {response.text}",
+                        # A gateway error means the submit may still have gone through behind it
+                        "outcome_unknown": response.status_code in (502, 504)
                     }
-            except Exception as e:
+            except (CircuitOpen, DeadlineExceeded, httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # The request never reached ElevenLabs, so no batch was created
                 return {
                     "success": False,
                     "error": f"Exception creating batch call: {str(e)}"
                 }
+            except Exception as e:
+                # Sent but not answered (e.g. a read timeout): the batch may exist upstream
+                return {
+                    "success": False,
+                    "error": f"Exception creating batch call: {str(e)}",
+                    "outcome_unknown": True
+                }
 
     async def get_batch_call_status(self, batch_call_id: str) -> Dict:
         """Get batch call status"""
         url = f"{ELEVENLABS_BASE_URL}/convai/batch-calling/{batch_call_id}"
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=self.headers)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "success": True,
-                        "status": result.get("status"),
-                        "batch_call": result
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to get batch call status: {response.status_code} - {response.text}"
-                    }
-            except Exception as e:
+        try:
+            response = await self.get("batch_call_status", url)
+            
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    "success": True,
+                    "status": result.get("status"),
+                    "batch_call": result
+                }
+            else:
                 return {
                     "success": False,
-                    "error": f"Exception getting batch call status: {str(e)}"
+                    "error": f"Failed to get batch call status: {response.status_code} - {response.text}"
                 }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Exception getting batch call status: {str(e)}"
+            }
 
-    async def get_conversations(self) -> Dict:
-        """Get all conversations"""
+    async def get_conversations(self, cursor: Optional[str] = None, agent_id: Optional[str] = None,
+                                page_size: Optional[int] = None) -> Dict:
+        """Get one page of conversations (newest first); pass next_cursor back for the next page"""
         url = f"{ELEVENLABS_BASE_URL}/convai/conversations"
+        params = {key: value for key, value in (
+            ("cursor", cursor), ("agent_id", agent_id), ("page_size", page_size)
+        ) if value}
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=self.headers)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "success": True,
-                        "conversations": result.get("conversations", [])
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to get conversations: {response.status_code} - {response.text}"
-                    }
-            except Exception as e:
+        try:
+            response = await self.get("conversations", url, params=params)
+            
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    "success": True,
+                    "conversations": result.get("conversations", []),
+                    "next_cursor": result.get("next_cursor"),
+                    "has_more": result.get("has_more", False)
+                }
+            else:
                 return {
                     "success": False,
-                    "error": f"Exception getting conversations: {str(e)}"
+                    "error": f"Failed to get conversations: {response.status_code} - {response.text}"
                 }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Exception getting conversations: {str(e)}"
+            }
 
     async def get_conversation_by_id(self, conversation_id: str) -> Dict:
         """Get conversation details by ID"""
         url = f"{ELEVENLABS_BASE_URL}/convai/conversations/{conversation_id}"
         
-        async with httpx.AsyncClient() as client:
+        try:
+            response = await self.get("conversation", url)
+            
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    "success": True,
+                    "conversation": result
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": f"Failed to get conversation: {response.status_code} - {response.text}"
+                }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Exception getting conversation: {str(e)}"
+            }
+
+    async def delete_agent(self, agent_id: str) -> Dict:
+        """Delete an agent"""
+        url = f"{ELEVENLABS_BASE_URL}/convai/agents/{agent_id}"
+        
+        async with self.http() as client:
             try:
-                response = await client.get(url, headers=self.headers)
+                response = await self.send("delete_agent", lambda: client.delete(
+                    url, headers=self.headers, timeout=request_timeout(self.timeout)
+                ))
                 
-                if response.status_code == 200:
-                    result = response.json()
+                # An agent that is already gone counts as deleted
+                if response.status_code in (200, 204, 404):
                     return {
                         "success": True,
-                        "conversation": result
+                        "agent_id": agent_id
                     }
                 else:
                     return {
                         "success": False,
-                        "error": f"Failed to get conversation: {response.status_code} - {response.text}"
+                        "error": f"Failed to delete agent: {response.status_code} - {response.text}"
                     }
             except Exception as e:
                 return {
                     "success": False,
-                    "error": f"Exception getting conversation: {str(e)}"
+                    "error": f"Exception deleting agent: {str(e)}"
                 }
 
 # Initialize ElevenLabs client
-elevenlabs_client = ElevenLabsClient(ELEVENLABS_API_KEY)
+# Status and conversation reads are hedged once they run slower than the endpoint's recent p95
+request_hedger = RequestHedger(
+    percentile=float(os.getenv('HEDGE_PERCENTILE', '0.95')),
+    max_delay=float(os.getenv('HEDGE_MAX_DELAY_SECONDS', '2')),
+    budget_ratio=float(os.getenv('HEDGE_BUDGET_RATIO', '0.1'))
+) if os.getenv('HEDGE_REQUESTS', 'true').lower() in ('1', 'true', 'yes') else None
+# While an endpoint keeps failing or timing out, calls to it fail fast instead of queuing behind it
+upstream_breakers = CircuitBreakers(
+    min_calls=int(os.getenv('BREAKER_MIN_CALLS', '10')),
+    failure_rate=float(os.getenv('BREAKER_FAILURE_RATE', '0.5')),
+    slow_call_seconds=float(os.getenv('BREAKER_SLOW_CALL_SECONDS', '3')),
+    slow_call_rate=float(os.getenv('BREAKER_SLOW_CALL_RATE', '0.8')),
+    open_seconds=float(os.getenv('BREAKER_OPEN_SECONDS', '30'))
+)
+elevenlabs_client = ElevenLabsClient(
+    ELEVENLABS_API_KEY, hedger=request_hedger, timeout=float(os.getenv('ELEVENLABS_TIMEOUT_SECONDS', '5')),
+    breakers=upstream_breakers
+)
+
+def agent_call_finished(batch_call_id: str) -> bool:
+    """An ephemeral agent can go once its call is terminal and nothing is left to fetch"""
+    call_info = active_calls.get(batch_call_id)
+    if call_info is None:
+        return False
+    status = call_info.get("status")
+    if status in ("failed", "cancelled"):
+        return True
+    return status == "completed" and call_info.get("conversation_processed", False)
+
+# Deletes the per-call agents make_call leaves behind
+agent_collector = AgentCollector(
+    delete_fn=lambda agent_id: asyncio.run(elevenlabs_client.delete_agent(agent_id)),
+    is_collectible=agent_call_finished,
+    batch_size=int(os.getenv('AGENT_GC_BATCH_SIZE', '20')),
+    delete_interval=float(os.getenv('AGENT_GC_DELETE_INTERVAL', '0.5')),
+    sweep_interval=float(os.getenv('AGENT_GC_SWEEP_INTERVAL', '300')),
+    dry_run=os.getenv('AGENT_GC_DRY_RUN', '').lower() in ('1', 'true', 'yes'),
+    path=os.getenv('AGENT_GC_DB', DEFAULT_GC_PATH),
+    orphan_after=float(os.getenv('AGENT_GC_ORPHAN_AFTER_SECONDS', str(2 * 3600)))
+)
+if START_BACKGROUND_WORKERS and agent_collector.pending():
+    agent_collector.ensure_started()  # Agents left over from before a restart
 
 # 1. Start: Use your first message to greet the person and don't wait for an answer and move to the questions, just continue immediately without a pause
 
@@ -260,19 +466,18 @@ def build_structured_prompt(agent_config: dict) -> str:
     
     if questions:
         # Create a more natural, conversational prompt
-        structured_prompt = f"""You are {agent_name}, calling for {call_purpose}.
+        parts = [f"""You are {agent_name}, calling for {call_purpose}.
 
 CONVERSATION SCRIPT - Follow this exact sequence:
 
 1. Then ask these questions ONE AT A TIME, waiting for each answer:
 
-"""
+"""]
         
         # Add questions in a simple, numbered format
-        for i, question in enumerate(questions, 1):
-            structured_prompt += f"   {i}. {question}\n"
+        parts.extend(f"   {i}. {question}\n" for i, question in enumerate(questions, 1))
         
-        structured_prompt += f"""
+        parts.append(f"""
 2. After all questions: Thank them and end the call
 3. Create a JSON object with the results of the call in an structured way.
 
@@ -289,11 +494,13 @@ CONVERSATION STYLE:
 - Show empathy and understanding
 - Keep your responses brief between questions
 - Focus on getting clear answers to each question
-"""
+""")
         
         # Add custom prompt as additional context if provided
         if base_prompt and base_prompt != 'You are a helpful AI assistant.' and base_prompt != f"You are {agent_name}, a professional AI assistant calling to {call_purpose}.":
-            structured_prompt += f"\nADDITIONAL INSTRUCTIONS:\n{base_prompt}"
+            parts.append(f"\nADDITIONAL INSTRUCTIONS:\n{base_prompt}")
+        
+        structured_prompt = "".join(parts)
     
     else:
         # If no questions, use a simpler prompt
@@ -323,188 +530,132 @@ def build_first_message(agent_config: dict) -> str:
     
     return first_message
 
-# Enhanced agent templates with better conversation flow
+# Templates ship with the code and never change while the app runs, so the schemas, rendered
+# template agent configs and the templates response below are built from them once
+AGENT_TEMPLATES = DEFAULT_AGENT_TEMPLATES
+
 def get_agent_templates():
+    return AGENT_TEMPLATES
+
+# Compile and validate every template's answer schema once at startup
+template_schemas = compile_template_schemas(get_agent_templates())
+
+@lru_cache(maxsize=256)
+def render_agent_config(agent_name: str, call_purpose: str, questions: tuple, first_message: str,
+                        custom_prompt: str, voice_id: str, language: str) -> tuple:
+    """Render (structured prompt, first message, AgentConfig) once per distinct call setup"""
+    agent_config = {
+        'name': agent_name,
+        'purpose': call_purpose,
+        'questions': list(questions),
+        'firstMessage': first_message,
+        'prompt': custom_prompt if custom_prompt else f"You are {agent_name}, a professional AI assistant calling to {call_purpose}."
+    }
+    
+    # Build the structured prompt that incorporates questions
+    structured_prompt = build_structured_prompt(agent_config)
+    
+    # Use the provided first message or build one
+    final_first_message = first_message if first_message else build_first_message(agent_config)
+    
+    # Create agent configuration with structured prompt
+    config = AgentConfig(
+        name=agent_name,
+        prompt=structured_prompt,  # Use the structured prompt that includes questions
+        voice_id=voice_id,
+        language=language,
+        first_message=final_first_message
+    )
+    return structured_prompt, final_first_message, config
+
+@lru_cache(maxsize=64)
+def render_template_agent_config(template_id: str, language: str, voice_id: str) -> AgentConfig:
+    """Render the shared agent for a template; per-call values stay as dynamic variables"""
+    template = get_agent_templates()[template_id]
+    custom_prompt = (template.get("custom_prompt") or '') + (
+        "\n\nCALL DETAILS:\n"
+        "- You are speaking with {{patient_name}}.\n"
+        "- You are calling for {{call_purpose}}.\n"
+        "- Their current medication is {{medication}}."
+    )
+    _, _, config = render_agent_config(
+        template["name"], template["purpose"], tuple(template.get("questions", [])),
+        template.get("first_message") or '', custom_prompt, voice_id, language
+    )
+    return config.model_copy(update={"allow_overrides": True})
+
+# One long-lived agent per template configuration, persisted across restarts
+template_agents = TemplateAgentRegistry(os.getenv('TEMPLATE_AGENTS_FILE', DEFAULT_REGISTRY_PATH))
+
+def ensure_template_agent(template_id: str, language: str, voice_id: str) -> Dict:
+    """Return the template's shared agent, creating it upstream only the first time"""
+    config = render_template_agent_config(template_id, language, voice_id)
+    key = TemplateAgentRegistry.make_key(
+        template_id, language, voice_id, config_fingerprint((config.prompt, config.first_message or ''))
+    )
+    result = template_agents.get_or_create(
+        key, template_id, lambda: asyncio.run(elevenlabs_client.create_agent(config))
+    )
+    if result["success"]:
+        result["config"] = config
+    return result
+
+def serialize_templates() -> tuple:
+    """Pre-serialize the templates response and its ETag"""
+    payload = json.dumps({"success": True, "templates": get_agent_templates()}, sort_keys=True).encode("utf-8")
+    return payload, hashlib.sha256(payload).hexdigest()[:32]
+
+templates_payload, templates_etag = serialize_templates()
+
+def recipient_conversation_ids(batch_call: Dict) -> Dict[str, str]:
+    """Map each recipient's phone number to its conversation id in a batch call status response"""
     return {
-        "standard_protocol": {
-            "name": "Standard Basic Protocol",
-            "purpose": "General follow-up",
-            "questions": [
-                "I've noticed that you have been improving lately, thats awesome!. On a scale from 1 to 10, how are you feeling?",
-                "Are you keeping up with Lisinopril as instructed?",
-                "In the past week, how often have you had symptoms like headaches, dizziness, or swelling?",
-                "Have you noticed any new or different symptoms since we last spoke?",
-                "Is there anything else you'd like Dr. Vinals to know about how you've been feeling?"
-            ],
-            "voice_id": "21m00Tcm4TlvDq8ikWAM",
-            "language": "en",
-            "first_message": "Hi, I'm the AI assistant of Dr. Vinals. I'm calling to follow up on you and to ask if there are any changes in your health since your last visit. I have a few quick questions that will only take a couple of minutes. Is now a good time?",
-            "custom_prompt": "You are a professional AI assistant calling on behalf of Dr. Vinals. You must ask each question one at a time and wait for complete responses. Be polite, professional, and empathetic. If a patient needs clarification, rephrase the question. Keep the conversation focused on getting answers to all the questions."
-        },
-        "hypertension_protocol": {
-            "name": "Hypertension Protocol",
-            "purpose": "Hypertension follow-up",
-            "questions": [
-                "I've noticed that you have been improving lately, thats awesome!. On a scale from 1 to 10, how are you feeling?",
-                "Are you keeping up with Lisinopril as instructed?",
-                "In the past week, how often have you had symptoms like headaches, dizziness, or swelling?",
-                "Have you noticed any new or different symptoms since we last spoke?",
-                "Is there anything else you'd like Dr. Vinals to know about how you've been feeling?"
-            ],
-            "voice_id": "EXAVITQu4vr4xnSDxMaL",
-            "language": "en",
-            "first_message": "Hi, I'm the AI assistant of Dr. Vinals. I'm calling to follow up on your hypertension treatment and see how you're doing. I have a few questions about your medication and symptoms. Is this a good time to talk?",
-            "custom_prompt": "You are a professional AI assistant calling on behalf of Dr. Vinals for a hypertension follow-up. Ask each question individually and wait for responses. Be understanding about medical concerns and encourage patients to be honest about their symptoms and medication compliance."
-        },
-        "diabetes_protocol": {
-            "name": "Diabetes Protocol", 
-            "purpose": "Diabetes follow-up",
-            "questions": [
-                "I've noticed that you have been improving lately, thats awesome!. On a scale from 1 to 10, how are you feeling?",
-                "Are you keeping up with Losartan as instructed?",
-                "In the past week, how often have you had symptoms like headaches, dizziness, or swelling?",
-                "Have you noticed any new or different symptoms since we last spoke?",
-                "Is there anything else you'd like Dr. Vinals to know about how you've been feeling?"
-            ],
-            "voice_id": "21m00Tcm4TlvDq8ikWAM",
-            "language": "en",
-            "first_message": "Hi, I'm the AI assistant of Dr. Vinals. I'm calling to check on your diabetes management and see how you're feeling. I have some questions about your medication and any symptoms you might be experiencing. Do you have a few minutes to talk?",
-            "custom_prompt": "You are a professional AI assistant calling on behalf of Dr. Vinals for a diabetes follow-up. Focus on medication compliance and symptom monitoring. Ask questions one at a time and be patient with responses. Show empathy for any challenges the patient might be facing."
-        }
+        recipient.get("phone_number"): recipient["conversation_id"]
+        for recipient in batch_call.get("recipients") or []
+        if recipient.get("conversation_id")
     }
 
-# Extract information from transcript - handles both string and list formats
-def extract_information_from_transcript(transcript, questions: List[str]) -> Dict:
-    """Extract structured information from conversation transcript - FIXED VERSION"""
-    extracted_info = {}
-    
-    # Handle both string and list transcript formats
-    if isinstance(transcript, list):
-        # If transcript is a list, join all parts into a single string
-        transcript_text = " ".join([str(item) for item in transcript if item])
-    elif isinstance(transcript, str):
-        transcript_text = transcript
-    else:
-        # Fallback for other types
-        transcript_text = str(transcript) if transcript else ""
-    
-    # Convert transcript to lowercase for easier matching
-    transcript_lower = transcript_text.lower()
-    
-    print(f"🔍 Processing transcript (length: {len(transcript_text)} chars)")
-    print(f"📝 Transcript preview: {transcript_text[:200]}...")
-    
-    for i, question in enumerate(questions):
-        question_key = f"question_{i+1}"
-        
-        # Try to find answers based on common patterns
-        answer = "Not answered"
-        
-        # Look for name patterns
-        if "name" in question.lower():
-            name_patterns = [
-                r"my name is ([^.!?]+)",
-                r"i'm ([^.!?]+)",
-                r"i am ([^.!?]+)",
-                r"call me ([^.!?]+)"
-            ]
-            for pattern in name_patterns:
-                match = re.search(pattern, transcript_lower)
-                if match:
-                    answer = match.group(1).strip()
-                    break
-        
-        # Look for email patterns
-        elif "email" in question.lower():
-            email_pattern = r"([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})"
-            match = re.search(email_pattern, transcript_text)  # Use original case for email
-            if match:
-                answer = match.group(1)
-        
-        # Look for satisfaction/rating patterns
-        elif any(word in question.lower() for word in ["satisfied", "satisfaction", "rating", "scale"]):
-            rating_patterns = [
-                r"(\d+)\s*out of\s*\d+",
-                r"(\d+)\s*/\s*\d+",
-                r"rate.*?(\d+)",
-                r"(\d+)\s*(?:stars?|points?)",
-                r"scale.*?(\d+)",
-                r"feeling.*?(\d+)"
-            ]
-            for pattern in rating_patterns:
-                match = re.search(pattern, transcript_lower)
-                if match:
-                    answer = f"{match.group(1)}/10"
-                    break
-        
-        # Look for medication patterns (for medical protocols)
-        elif any(word in question.lower() for word in ["medication", "medicine", "lisinopril", "losartan"]):
-            if any(word in transcript_lower for word in ["yes", "taking", "keep up", "continue", "prescribed"]):
-                answer = "Yes, taking as prescribed"
-            elif any(word in transcript_lower for word in ["no", "stopped", "not taking", "quit"]):
-                answer = "No, not taking medication"
-            elif any(word in transcript_lower for word in ["sometimes", "occasionally", "forget"]):
-                answer = "Taking inconsistently"
-        
-        # Look for symptoms patterns
-        elif "symptom" in question.lower():
-            symptoms = []
-            if "headache" in transcript_lower:
-                symptoms.append("headaches")
-            if "dizziness" in transcript_lower or "dizzy" in transcript_lower:
-                symptoms.append("dizziness")
-            if "swelling" in transcript_lower or "swollen" in transcript_lower:
-                symptoms.append("swelling")
-            if "fatigue" in transcript_lower or "tired" in transcript_lower:
-                symptoms.append("fatigue")
-            if "nausea" in transcript_lower:
-                symptoms.append("nausea")
-            
-            if symptoms:
-                answer = ", ".join(symptoms)
-            else:
-                answer = "No specific symptoms mentioned"
-        
-        # Look for frequency patterns (how often)
-        elif "how often" in question.lower() or "frequency" in question.lower():
-            frequency_patterns = [
-                r"(\d+)\s*times?\s*(?:a|per)\s*(?:day|week|month)",
-                r"(?:every|each)\s*(\w+)",
-                r"(daily|weekly|monthly|rarely|never|always|often|sometimes)"
-            ]
-            for pattern in frequency_patterns:
-                match = re.search(pattern, transcript_lower)
-                if match:
-                    answer = match.group(1) if match.group(1) else match.group(0)
-                    break
-        
-        # Generic answer extraction (look for responses after question-like patterns)
-        if answer == "Not answered":
-            # Try to find any response that might be related to the question
-            question_words = question.lower().split()
-            for word in question_words:
-                if len(word) > 3:  # Only look for meaningful words
-                    pattern = rf"{word}.*?([^.!?]+)"
-                    match = re.search(pattern, transcript_lower)
-                    if match:
-                        potential_answer = match.group(1).strip()
-                        if len(potential_answer) > 5:  # Only use if it's a substantial answer
-                            answer = potential_answer[:100]  # Limit length
-                            break
-        
-        extracted_info[question_key] = {
-            "question": question,
-            "answer": answer
-        }
-        
-        print(f"📊 Q{i+1}: {question[:50]}... -> A: {answer}")
-    
-    return extracted_info
+# Recipients in these states will never get a conversation id
+NO_CONVERSATION_RECIPIENT_STATUSES = ("failed", "cancelled")
+
+def unresolved_recipients(batch_call: Dict, phone_numbers: List[str]) -> List[str]:
+    """Recipients still waiting for a conversation id (their call may have ended but not been indexed yet)"""
+    conversation_ids = recipient_conversation_ids(batch_call)
+    statuses = {
+        recipient.get("phone_number"): recipient.get("status")
+        for recipient in batch_call.get("recipients") or []
+    }
+    return [
+        phone_number for phone_number in phone_numbers
+        if phone_number not in conversation_ids
+        and statuses.get(phone_number) not in NO_CONVERSATION_RECIPIENT_STATUSES
+    ]
 
-async def find_conversation_for_call(batch_call_id: str, agent_id: str) -> Dict:
+async def find_conversation_for_call(batch_call_id: str, agent_id: str, phone_number: Optional[str] = None,
+                                     shared_agent: bool = False) -> Dict:
     """Find conversation associated with a batch call"""
     try:
-        # Get all conversations
+        # The batch's recipient details carry the conversation id: one targeted request,
+        # or none at all if the finished batch is already cached
+        status_result = call_status_cache.terminal(batch_call_id)
+        if status_result is None:
+            status_result = await elevenlabs_client.get_batch_call_status(batch_call_id)
+            call_status_cache.store(batch_call_id, status_result)
+        if status_result["success"]:
+            conversation_ids = recipient_conversation_ids(status_result["batch_call"])
+            conversation_id = conversation_ids.get(phone_number) if phone_number else None
+            if conversation_id is None and len(conversation_ids) == 1:
+                conversation_id = next(iter(conversation_ids.values()))
+            if conversation_id:
+                print(f"✅ Found conversation from batch recipients: {conversation_id}")
+                return {
+                    "success": True,
+                    "conversation": {"conversation_id": conversation_id, "batch_call_id": batch_call_id},
+                    "source": "batch_recipients"
+                }
+        
+        # Last resort: scan the conversation list
+        print(f"⚠️  No recipient conversation id for {batch_call_id}, scanning conversation list")
         conversations_result = await elevenlabs_client.get_conversations()
         
         if not conversations_result["success"]:
@@ -523,17 +674,21 @@ async def find_conversation_for_call(batch_call_id: str, agent_id: str) -> Dict:
                 print(f"✅ Found conversation by batch_call_id: {conv.get('conversation_id')}")
                 return {
                     "success": True,
-                    "conversation": conv
+                    "conversation": conv,
+                    "source": "conversation_list"
                 }
         
-        # If not found by batch_call_id, try by agent_id
-        for conv in conversations:
-            if conv.get("agent_id") == agent_id:
-                print(f"✅ Found conversation by agent_id: {conv.get('conversation_id')}")
-                return {
-                    "success": True,
-                    "conversation": conv
-                }
+        # Matching by agent only identifies the call when the agent was created for it;
+        # shared template agents have many conversations
+        if not shared_agent:
+            for conv in conversations:
+                if conv.get("agent_id") == agent_id:
+                    print(f"✅ Found conversation by agent_id: {conv.get('conversation_id')}")
+                    return {
+                        "success": True,
+                        "conversation": conv,
+                        "source": "agent_fallback"
+                    }
         
         # Debug info
         debug_info = {
@@ -564,6 +719,27 @@ def handle_404(e):
         return '', 404
     return jsonify({"error": "Not found"}), 404
 
+@sio.on('join_call')
+def handle_join_call(data):
+    """Subscribe a dashboard client to live updates for one call"""
+    call_id = (data or {}).get('call_id')
+    if call_id:
+        join_room(call_id)
+
+@sio.on('join_job')
+def handle_join_job(data):
+    """Subscribe a dashboard client to progress updates for one background job"""
+    job_id = (data or {}).get('job_id')
+    if job_id:
+        join_room(f"job:{job_id}")
+
+@sio.on('join_campaign')
+def handle_join_campaign(data):
+    """Subscribe a dashboard client to progress updates for one campaign"""
+    campaign_id = (data or {}).get('campaign_id')
+    if campaign_id:
+        join_room(f"campaign:{campaign_id}")
+
 @app.route('/')
 def root():
     return jsonify({"message": "CEX Protocol AI Backend API"})
@@ -623,168 +799,501 @@ def test_agent_creation():
 
 @app.route('/api/agent-templates')
 def get_templates():
+    if request.if_none_match.contains(templates_etag):
+        response = Response(status=304)
+    else:
+        response = Response(templates_payload, mimetype="application/json")
+    response.set_etag(templates_etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route('/api/agent-templates/<template_id>/preview')
+def preview_template(template_id):
+    template = get_agent_templates().get(template_id)
+    if template is None:
+        return jsonify({
+            "success": False,
+            "message": "Template not found"
+        }), 404
+    
+    structured_prompt, final_first_message, _ = render_agent_config(
+        template["name"],
+        template["purpose"],
+        tuple(template.get("questions", [])),
+        template.get("first_message") or '',
+        template.get("custom_prompt") or '',
+        request.args.get('voiceId', template.get("voice_id", "21m00Tcm4TlvDq8ikWAM")),
+        request.args.get('language', template.get("language", "en"))
+    )
     return jsonify({
         "success": True,
-        "templates": get_agent_templates()
+        "template_id": template_id,
+        "prompt": structured_prompt,
+        "first_message": final_first_message
     })
 
-@app.route('/api/make-call', methods=['POST'])
-def make_call():
-    try:
-        data = request.get_json()
-        print(f"📞 Make call request for: {data.get('phoneNumber')}")
-        
-        # Extract data from the correct locations (root level, not nested in agentConfig)
-        phone_number = data.get('phoneNumber')
-        agent_name = data.get('agentName', 'AI Assistant')
-        call_purpose = data.get('callPurpose', 'follow up with you')
-        questions = data.get('questions', [])
-        voice_id = data.get('voiceId', '21m00Tcm4TlvDq8ikWAM')
-        first_message = data.get('firstMessage', '')
-        custom_prompt = data.get('customPrompt', '')
-        language = data.get('language', 'en')
-        
-        print(f"🤖 Creating agent: {agent_name}")
-        print(f"📋 Call purpose: {call_purpose}")
-        print(f"📝 Questions count: {len(questions)}")
-        print(f"💬 First message: {first_message}")
-        print(f"📜 Custom prompt length: {len(custom_prompt)} chars")
-        print(f"📜 Custom prompt: {custom_prompt}")
-        print(f"🎤 Voice ID: {voice_id}")
-        
-        if not phone_number:
-            return jsonify({
-                "success": False,
-                "message": "Phone number is required"
-            }), 400
-        
-        # Create agent config dictionary for prompt building
-        agent_config = {
-            'name': agent_name,
-            'purpose': call_purpose,
-            'questions': questions,
-            'firstMessage': first_message,
-            'prompt': custom_prompt if custom_prompt else f"You are {agent_name}, a professional AI assistant calling to {call_purpose}."
-        }
-        
-        # Build the structured prompt that incorporates questions
-        structured_prompt = build_structured_prompt(agent_config)
-        print(f"🔍 Generated prompt length: {len(structured_prompt)} characters")
-        print(f"📝 Prompt preview: {structured_prompt}...")
-        
-        # Use the provided first message or build one
-        if first_message:
-            final_first_message = first_message
-        else:
-            final_first_message = build_first_message(agent_config)
-        
-        print(f"💬 Final first message: {final_first_message}")
-        
-        print("🤖 Creating new agent for call...")
-        
-        # Create agent configuration with structured prompt
-        config = AgentConfig(
-            name=agent_name,
-            prompt=structured_prompt,  # Use the structured prompt that includes questions
-            voice_id=voice_id,
-            language=language,
-            first_message=final_first_message
-        )
-        
-        # Create the agent
-        agent_result = asyncio.run(elevenlabs_client.create_agent(config))
-        
-        if not agent_result["success"]:
-            print(f"❌ Agent creation failed: {agent_result['error']}")
-            return jsonify({
-                "success": False,
-                "message": "Failed to create agent",
-                "error": agent_result["error"]
-            }), 500
-        
-        agent_id = agent_result["agent_id"]
-        print(f"✅ Agent created: {agent_id}")
-        
-        # Create batch call
-        call_name = f"AI Call to {phone_number}"
-        print(f"📞 Initiating call to {phone_number} with agent {agent_id}")
-        
-        batch_call_result = asyncio.run(elevenlabs_client.create_batch_call(agent_id, phone_number, call_name))
-        
-        if not batch_call_result["success"]:
-            print(f"❌ Error making call: {batch_call_result['error']}")
-            return jsonify({
+def live_call_count(scope: str) -> int:
+    """Calls live now from the scope's phone number ("phone:<id>"), including
+    campaign, scheduled and recurring batches"""
+    phone_number_id = scope.split(":", 1)[1]
+    now = time.time()
+    return sum(
+        len(call_info.get("recipients") or ()) or 1
+        for call_info in list(active_calls.values())
+        if call_info.get("agent_phone_number_id", ELEVENLABS_PHONE_NUMBER_ID) == phone_number_id
+        and call_info.get("status") not in TERMINAL_CALL_STATUSES and (call_info.get("scheduled_time_unix") or 0) <= now
+    )
+
+def call_scopes() -> List[str]:
+    return [f"phone:{ELEVENLABS_PHONE_NUMBER_ID}"]
+
+# Bounds concurrent call setup and live calls so bursts get 429s instead of upstream errors
+call_admission = AdmissionController(
+    live_fn=live_call_count,
+    limits={
+        f"phone:{ELEVENLABS_PHONE_NUMBER_ID}": int(os.getenv('MAX_LIVE_CALLS_PER_NUMBER', '10'))
+    },
+    max_concurrent=int(os.getenv('MAKE_CALL_MAX_CONCURRENT', '8')),
+    max_queue=int(os.getenv('MAKE_CALL_MAX_QUEUE', '32')),
+    queue_timeout=float(os.getenv('MAKE_CALL_QUEUE_TIMEOUT_SECONDS', '10')),
+    retry_after=float(os.getenv('MAKE_CALL_RETRY_AFTER_SECONDS', '5'))
+)
+
+def start_call(data: Dict, scheduled_time_unix: Optional[int] = None,
+               progress: Optional[Callable[[str], None]] = None) -> tuple:
+    """Set up the agent and submit the batch call within one overall time budget"""
+    with deadline(float(os.getenv('MAKE_CALL_DEADLINE_SECONDS', '20'))):
+        return place_call(data, scheduled_time_unix, progress)
+
+def place_call(data: Dict, scheduled_time_unix: Optional[int] = None,
+               progress: Optional[Callable[[str], None]] = None) -> tuple:
+    """Set up the agent and submit the batch call; returns (response body, HTTP status)"""
+    progress = progress or (lambda stage: None)
+    print(f"📞 Make call request for: {data.get('phoneNumber')}")
+    
+    # Extract data from the correct locations (root level, not nested in agentConfig)
+    phone_number = data.get('phoneNumber')
+    agent_name = data.get('agentName', 'AI Assistant')
+    call_purpose = data.get('callPurpose', 'follow up with you')
+    questions = data.get('questions', [])
+    voice_id = data.get('voiceId', '21m00Tcm4TlvDq8ikWAM')
+    first_message = data.get('firstMessage', '')
+    custom_prompt = data.get('customPrompt', '')
+    language = data.get('language', 'en')
+    template_id = data.get('templateId')
+    
+    print(f"🤖 Creating agent: {agent_name}")
+    print(f"📋 Call purpose: {call_purpose}")
+    print(f"📝 Questions count: {len(questions)}")
+    print(f"💬 First message: {first_message}")
+    print(f"📜 Custom prompt length: {len(custom_prompt)} chars")
+    print(f"📜 Custom prompt: {custom_prompt}")
+    print(f"🎤 Voice ID: {voice_id}")
+    
+    if not phone_number:
+        return {
+            "success": False,
+            "message": "Phone number is required"
+        }, 400
+    
+    if suppression_list.is_suppressed(phone_number):
+        print(f"🚫 {phone_number} is on the suppression list, not dialing")
+        return {
+            "success": False,
+            "message": "Phone number is on the do-not-call list"
+        }, 403
+    
+    if scheduled_time_unix is None and not data.get('ignoreCallingWindow'):
+        # Outside the recipient's local calling hours the call waits in the scheduler
+        window_start = call_scheduler.next_window(normalize_e164(phone_number) or phone_number)
+        if window_start is None:
+            return {
                 "success": False,
-                "message": "Failed to initiate call",
-                "error": batch_call_result["error"]
-            }), 500
-        
-        batch_call_id = batch_call_result["batch_call_id"]
-        print(f"✅ Call initiated successfully: {batch_call_id}")
-        
-        # Store call information with enhanced details
-        active_calls[batch_call_id] = {
-            "phone_number": phone_number,
-            "agent_id": agent_id,
-            "agent_name": agent_name,
-            "call_purpose": call_purpose,
-            "questions": questions,
-            "first_message": final_first_message,
-            "custom_prompt": custom_prompt,
-            "structured_prompt": structured_prompt,
-            "voice_id": voice_id,
-            "status": "pending",
-            "created_at": datetime.now().isoformat(),
-            "conversation_processed": False
-        }
-        
-        return jsonify({
-            "success": True,
-            "message": "Call initiated successfully",
-            "batch_call_id": batch_call_id,
-            "agent_id": agent_id,
-            "agent_config": {
-                "name": agent_name,
-                "purpose": call_purpose,
-                "questions_count": len(questions),
+                "message": "No calling window for this number in the next week"
+            }, 422
+        if window_start > time.time() + 60:
+            if data.get('deferOutsideWindow'):
+                # The caller (a campaign) holds the contact itself and dials again when the window opens
+                return {
+                    "success": True,
+                    "outside_window": True,
+                    "message": "Outside the recipient's calling window; dial again when it opens",
+                    "retry_after": int(window_start - time.time()) + 1,
+                    "window_opens_at": datetime.fromtimestamp(window_start).isoformat()
+                }, 202
+            entry = call_scheduler.schedule(phone_number, data, window_start)
+            return {
+                "success": True,
+                "scheduled": True,
+                "message": "Outside the recipient's calling window; call scheduled",
+                "schedule_id": entry["schedule_id"],
+                "scheduled_for": entry["scheduled_for"]
+            }, 202
+    
+    # Calls that use a template unchanged share that template's long-lived
+    # agent; per-call values go in the batch submission instead. The agent's
+    # name and purpose are baked into its prompt, so calls that override
+    # them get their own agent like calls with their own questions
+    template = get_agent_templates().get(template_id) if template_id else None
+    use_template_agent = (
+        template is not None
+        and data.get('useTemplateAgent', True)
+        and list(questions) == template.get("questions", [])
+        and custom_prompt in ('', template.get("custom_prompt"))
+        and data.get('agentName') in (None, '', template.get("name"))
+        and data.get('callPurpose') in (None, '', template.get("purpose"))
+    )
+    if use_template_agent:
+        # Record what the call actually says, not the generic defaults
+        agent_name, call_purpose = template["name"], template["purpose"]
+    call_client_data = None
+    
+    # Don't start setting up a call that the upstream can't take right now
+    circuit = upstream_breakers.open_circuit(
+        "submit_batch_call", *(() if use_template_agent else ("create_agent",))
+    )
+    if circuit is not None:
+        print(f"⚡ Not placing call to {phone_number}: {circuit}")
+        return {
+            "success": False,
+            "message": "ElevenLabs is unavailable; retry shortly",
+            "error": str(circuit),
+            "retry_after": int(circuit.retry_after) + 1
+        }, 503
+    
+    try:
+        with call_admission.admit(call_scopes()):
+            progress("creating_agent")
+            if use_template_agent:
+                print(f"🤖 Using template agent for: {template_id}")
+                agent_result = run_stage("template_agent", lambda: ensure_template_agent(template_id, language, voice_id))
+                if agent_result["success"]:
+                    structured_prompt = agent_result["config"].prompt
+                    final_first_message = first_message or agent_result["config"].first_message
+                    call_client_data = build_client_data(
+                        dynamic_variables(data.get('patientName'), call_purpose, data.get('medication') or template.get("medication")),
+                        first_message=first_message if first_message and first_message != template.get("first_message") else None
+                    )
+            else:
+                # Prompt, first message and agent config are cached per distinct call setup
+                structured_prompt, final_first_message, config = render_agent_config(
+                    agent_name, call_purpose, tuple(questions), first_message or '', custom_prompt or '', voice_id, language
+                )
+                print(f"🔍 Generated prompt length: {len(structured_prompt)} characters")
+                print(f"📝 Prompt preview: {structured_prompt}...")
+                print(f"💬 Final first message: {final_first_message}")
+            
+                print("🤖 Creating new agent for call...")
+            
+                # Create the agent
+                agent_result = run_stage("create_agent", lambda: asyncio.run(elevenlabs_client.create_agent(config)))
+            
+            if not agent_result["success"]:
+                print(f"❌ Agent creation failed: {agent_result['error']}")
+                return {
+                    "success": False,
+                    "message": "Failed to create agent",
+                    "error": agent_result["error"]
+                }, 504 if deadline_expired() else 500
+            
+            agent_id = agent_result["agent_id"]
+            print(f"✅ Agent ready: {agent_id}")
+            
+            # Create batch call
+            progress("submitting_call")
+            call_name = f"AI Call to {phone_number}"
+            print(f"📞 Initiating call to {phone_number} with agent {agent_id}")
+            
+            batch_call_result = run_stage("create_batch_call", lambda: asyncio.run(elevenlabs_client.create_batch_call(
+                agent_id, phone_number, call_name, call_client_data, scheduled_time_unix
+            )))
+            
+            if not batch_call_result["success"]:
+                print(f"❌ Error making call: {batch_call_result['error']}")
+                body = {
+                    "success": False,
+                    "message": "Failed to initiate call",
+                    "error": batch_call_result["error"]
+                }
+                if batch_call_result.get("outcome_unknown"):
+                    body["outcome_unknown"] = True
+                    body["message"] = "The call may have been placed; check the call list before retrying"
+                return body, 504 if deadline_expired() else 500
+            
+            batch_call_id = batch_call_result["batch_call_id"]
+            print(f"✅ Call initiated successfully: {batch_call_id}")
+            
+            # Store call information with enhanced details
+            active_calls[batch_call_id] = {
+                "phone_number": phone_number,
+                "agent_id": agent_id,
+                "agent_name": agent_name,
+                "call_purpose": call_purpose,
+                "questions": questions,
                 "first_message": final_first_message,
-                "voice_id": voice_id
+                "custom_prompt": custom_prompt,
+                "structured_prompt": structured_prompt,
+                "voice_id": voice_id,
+                "language": language,
+                "template_id": template_id,
+                "agent_kind": "template" if use_template_agent else "ephemeral",
+                "agent_phone_number_id": ELEVENLABS_PHONE_NUMBER_ID,
+                "status": "pending",
+                "created_at": datetime.now().isoformat(),
+                "scheduled_time_unix": scheduled_time_unix,
+                "conversation_processed": False
             }
-        })
-        
+            
+            if not use_template_agent:
+                # Per-call agents are deleted once the call is done and processed
+                agent_collector.track(agent_id, batch_call_id)
+                agent_collector.ensure_started()
+            
+            call_watcher.ensure_started()
+            
+            # Answers fill in live from speech updates while the call is running
+            schema = template_schemas.resolve(template_id, questions)
+            live_extractions.start(batch_call_id, questions, language, schema.kinds if schema else None)
+            
+            return {
+                "success": True,
+                "message": "Call initiated successfully",
+                "batch_call_id": batch_call_id,
+                "agent_id": agent_id,
+                "agent_config": {
+                    "name": agent_name,
+                    "purpose": call_purpose,
+                    "questions_count": len(questions),
+                    "first_message": final_first_message,
+                    "voice_id": voice_id
+                }
+            }, 200
+    except AdmissionRejected as e:
+        print(f"🚦 Call to {phone_number} not admitted: {e.reason}")
+        return {
+            "success": False,
+            "message": "Too many calls in progress; retry shortly",
+            "error": e.reason,
+            "retry_after": int(e.retry_after),
+            "queue_depth": call_admission.stats()["queue_depth"]
+        }, 429
+
+# Outcomes of make-call requests sent with an Idempotency-Key header
+idempotency_store = IdempotencyStore(
+    ttl_seconds=float(os.getenv('IDEMPOTENCY_TTL_SECONDS', str(24 * 3600))),
+    max_entries=int(os.getenv('IDEMPOTENCY_MAX_KEYS', '10000'))
+)
+
+def run_start_call(data: Dict, progress: Optional[Callable[[str], None]] = None) -> tuple:
+    try:
+        return start_call(data, progress=progress)
     except Exception as e:
         print(f"❌ Error making call: {str(e)}")
         import traceback
         traceback.print_exc()
-        return jsonify({
+        return {
             "success": False,
             "message": "Failed to initiate call",
             "error": str(e)
-        }), 500
+        }, 500
 
-@app.route('/api/call-status/<batch_call_id>')
-def get_call_status(batch_call_id):
+# Background pipeline for make-call requests in async mode
+call_jobs = JobQueue(
+    emit_fn=lambda event, payload, room: sio.emit(event, payload, room=room),
+    max_workers=int(os.getenv('CALL_JOB_WORKERS', '4')),
+    max_pending=int(os.getenv('CALL_JOB_MAX_PENDING', '100'))
+)
+
+def enqueue_start_call(data: Dict, on_failure: Optional[Callable[[], None]] = None) -> tuple:
+    """Validate the request, then run agent setup and submission as a background job
+
+    on_failure runs if the job ends known not to have placed the call.
+    """
+    phone_number = (data or {}).get('phoneNumber')
+    if not phone_number:
+        return {
+            "success": False,
+            "message": "Phone number is required"
+        }, 400
+    if suppression_list.is_suppressed(phone_number):
+        return {
+            "success": False,
+            "message": "Phone number is on the do-not-call list"
+        }, 403
+    
+    def run(progress):
+        body, _ = run_start_call(data, progress)
+        if not body.get("success") and not body.get("outcome_unknown") and on_failure is not None:
+            on_failure()
+        return body
+    
     try:
-        print(f"📋 Getting status for call: {batch_call_id}")
-        
-        if batch_call_id not in active_calls:
+        job = call_jobs.submit("make_call", run, meta={"phone_number": phone_number})
+    except JobQueueFull as e:
+        return {
+            "success": False,
+            "message": "Too many calls are being set up; retry shortly",
+            "error": str(e),
+            "retry_after": int(call_admission.retry_after),
+            "queue_depth": call_jobs.stats()["pending"]
+        }, 429
+    print(f"📥 Queued make-call job {job['job_id']} for {phone_number}")
+    return {
+        "success": True,
+        "message": "Call accepted; follow progress on the job",
+        "job_id": job["job_id"],
+        "status_url": f"/api/jobs/{job['job_id']}"
+    }, 202
+
+@app.route('/api/make-call', methods=['POST'])
+def make_call():
+    data = request.get_json()
+    # Async mode: ?async=1 or "Prefer: respond-async"
+    run_async = (
+        request.args.get('async', '').lower() in ('1', 'true', 'yes')
+        or 'respond-async' in request.headers.get('Prefer', '')
+    )
+    handle = enqueue_start_call if run_async else run_start_call
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if not idempotency_key:
+        body, status = handle(data)
+        return call_response(body, status)
+    
+    try:
+        entry, is_first = idempotency_store.begin(idempotency_key, data)
+    except IdempotencyConflict:
+        return jsonify({
+            "success": False,
+            "message": "Idempotency-Key was already used with a different request"
+        }), 422
+    
+    if not is_first:
+        # A retry: wait for the original request instead of calling the patient twice
+        if not entry.wait(float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', '60'))):
             return jsonify({
                 "success": False,
-                "message": "Call not found"
-            }), 404
+                "message": "A request with this Idempotency-Key is still in progress"
+            }), 409
+        if entry.body.get("outcome_unknown"):
+            # The original submit may have reached ElevenLabs; retrying could call the patient twice
+            return jsonify({
+                "success": False,
+                "outcome_unknown": True,
+                "message": "The original request with this Idempotency-Key may have placed the call; check the call list",
+                "error": entry.body.get("error")
+            }), 409
+        print(f"🔁 Replaying make-call response for Idempotency-Key {idempotency_key}")
+        response, status = call_response(entry.body, entry.status)
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response, status
+    
+    if run_async:
+        # The 202 receipt is replayed while the job runs; a job that failed before submitting frees the key
+        body, status = enqueue_start_call(data, on_failure=lambda: idempotency_store.forget(entry))
+    else:
+        body, status = handle(data)
+    idempotency_store.complete(entry, body, status)
+    return call_response(body, status)
+
+def call_response(body: Dict, status: int):
+    """JSON response, with Retry-After when the body says when to retry"""
+    response = jsonify(body)
+    if body.get("retry_after") is not None:
+        response.headers['Retry-After'] = str(body["retry_after"])
+    return response, status
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    job = call_jobs.get(job_id) or conversation_jobs.get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "message": "Job not found"
+        }), 404
+    return jsonify({
+        "success": True,
+        "job": job
+    })
+
+@app.route('/api/call-status', methods=['GET', 'POST'])
+def get_call_statuses():
+    """Status of many calls at once: ?ids=a,b,c or a JSON body {"ids": [...]}"""
+    try:
+        if request.method == 'POST':
+            ids = (request.get_json() or {}).get('ids') or []
+        else:
+            ids = [i for i in request.args.get('ids', '').split(',') if i]
+        ids = list(dict.fromkeys(ids))  # dedupe, keep order
+        max_ids = int(os.getenv('CALL_STATUS_MAX_IDS', '500'))
+        if not ids or len(ids) > max_ids:
+            return jsonify({
+                "success": False,
+                "message": f"Pass between 1 and {max_ids} batch call ids"
+            }), 400
         
-        # Get status from ElevenLabs
-        status_result = asyncio.run(elevenlabs_client.get_batch_call_status(batch_call_id))
+        # Terminal statuses never change and recent ones are cached, so only cache misses go upstream
+        to_fetch = []
+        for batch_call_id in ids:
+            if batch_call_id not in active_calls or active_calls[batch_call_id].get("status") in TERMINAL_CALL_STATUSES:
+                continue
+            cached, _ = call_status_cache.peek(batch_call_id)
+            if cached is None:
+                to_fetch.append(batch_call_id)
+            else:
+                record_call_status(batch_call_id, cached["status"])
+        fetched = refresh_call_statuses(to_fetch)
+        
+        calls = {}
+        for batch_call_id in ids:
+            call_info = active_calls.get(batch_call_id)
+            if call_info is None:
+                calls[batch_call_id] = {"success": False, "message": "Call not found"}
+                continue
+            calls[batch_call_id] = {
+                "success": batch_call_id not in fetched or fetched[batch_call_id] is not None,
+                "status": call_info.get("status"),
+                "phone_number": call_info.get("phone_number"),
+                "conversation_processed": call_info.get("conversation_processed", False),
+                "has_results": batch_call_id in call_results
+            }
+        
+        return jsonify({
+            "success": True,
+            "calls": calls,
+            "fetched": len(to_fetch),
+            "answered_locally": len(ids) - len(to_fetch)
+        })
+    except Exception as e:
+        print(f"❌ Error getting call statuses: {str(e)}")
+        return jsonify({
+            "success": False,
+            "message": "Failed to get call statuses",
+            "error": str(e)
+        }), 500
+
+@app.route('/api/call-status/<batch_call_id>')
+def get_call_status(batch_call_id):
+    try:
+        print(f"📋 Getting status for call: {batch_call_id}")
+        
+        if batch_call_id not in active_calls:
+            return jsonify({
+                "success": False,
+                "message": "Call not found"
+            }), 404
+        
+        # Served from the cache when possible; stale entries refresh in the background
+        status_result = call_status_cache.get(batch_call_id)
         
         if status_result["success"]:
             status = status_result["status"]
-            active_calls[batch_call_id]["status"] = status
-            
-            # Only return status, don't process conversation automatically
+            # Completed calls queue their own conversation processing
+            record_call_status(batch_call_id, status)
             
             return jsonify({
                 "success": True,
                 "status": status,
+                "stale": status_result.get("stale", False),
                 "call_info": active_calls[batch_call_id],
                 "results": call_results.get(batch_call_id),
                 "conversation_processed": active_calls[batch_call_id].get("conversation_processed", False)
@@ -804,11 +1313,270 @@ def get_call_status(batch_call_id):
             "error": str(e)
         }), 500
 
+def process_call_conversation(batch_call_id: str) -> tuple:
+    """Fetch the call's conversation and extract answers; returns (response body, HTTP status)"""
+    print(f"🔄 Processing conversation for call: {batch_call_id}")
+    
+    if batch_call_id not in active_calls:
+        return {
+            "success": False,
+            "message": "Call not found in active calls"
+        }, 404
+    
+    call_info = active_calls[batch_call_id]
+    agent_id = call_info["agent_id"]
+    questions = call_info.get("questions", [])
+    language = call_info.get("language", "en")
+    schema = template_schemas.resolve(call_info.get("template_id"), questions)
+    
+    # If every speech update of the finished call was streamed, the answers already exist;
+    # without call_ended some updates may be missing, so the real transcript is fetched instead
+    live_state = live_extractions.get(batch_call_id)
+    if live_state is not None and live_state.ended and live_state.utterances:
+        live_extractions.pop(batch_call_id)
+        print(f"⚡ Finalizing live extraction for call {batch_call_id}")
+        conversation_id = live_state.conversation_id
+        if conversation_id is None:
+            conversation_result = asyncio.run(find_conversation_for_call(
+                batch_call_id, agent_id, call_info.get("phone_number"),
+                shared_agent=call_info.get("agent_kind") == "template"
+            ))
+            if conversation_result["success"]:
+                conversation_id = conversation_result["conversation"].get("conversation_id")
+        results = {
+            "conversation_id": conversation_id,
+            "transcript": live_state.transcript,
+            "extracted_info": schema.annotate(live_state.finalize()) if schema else live_state.finalize(),
+            "processed_at": datetime.now().isoformat(),
+            "processing_notes": f"Extracted live from {len(live_state.utterances)} streamed utterances"
+        }
+        call_results[batch_call_id] = results
+        active_calls[batch_call_id]["conversation_processed"] = True
+        processed_calls.add(batch_call_id)  # Mark as processed
+        
+        return {
+            "success": True,
+            "message": "Conversation processed successfully",
+            "results": results
+        }, 200
+    
+    if len(call_info.get("recipients") or []) > 1:
+        return process_recipient_conversations(batch_call_id, call_info, schema)
+    
+    # Find conversation
+    conversation_result = asyncio.run(find_conversation_for_call(
+        batch_call_id, agent_id, call_info.get("phone_number"),
+        shared_agent=call_info.get("agent_kind") == "template"
+    ))
+    
+    if not conversation_result["success"]:
+        # Usually the conversation is just not indexed yet; the job retries
+        return {
+            "success": False,
+            "retryable": True,
+            "message": conversation_result["message"],
+            "debug_info": conversation_result.get("debug_info")
+        }, 404
+    
+    conversation_id = conversation_result["conversation"].get("conversation_id")
+    print(f"🔍 Found conversation: {conversation_id} (via {conversation_result.get('source')})")
+    
+    results = extract_conversation_results(conversation_id, questions, language, schema)
+    if results is None:
+        return {
+            "success": False,
+            "retryable": True,
+            "message": "Failed to get conversation details"
+        }, 502
+    
+    call_results[batch_call_id] = results
+    active_calls[batch_call_id]["conversation_processed"] = True
+    processed_calls.add(batch_call_id)  # Mark as processed
+    live_extractions.pop(batch_call_id)  # Any partial live state is superseded by the transcript
+    
+    print(f"✅ Conversation processed successfully for call {batch_call_id}")
+    
+    return {
+        "success": True,
+        "message": "Conversation processed successfully",
+        "results": results
+    }, 200
+
+def extract_conversation_results(conversation_id: str, questions: List[str], language: str, schema) -> Optional[Dict]:
+    """Fetch one conversation's transcript and extract the answers; None if the fetch failed"""
+    conv_details_result = asyncio.run(elevenlabs_client.get_conversation_by_id(conversation_id))
+    
+    if not conv_details_result["success"]:
+        print(f"❌ Failed to get conversation details: {conv_details_result.get('error', 'Unknown error')}")
+        return None
+    
+    conv_details = conv_details_result["conversation"]
+    
+    # Enhanced transcript handling for different formats
+    raw_transcript = conv_details.get("transcript", "No transcript available")
+    
+    print(f"🔍 Raw transcript type: {type(raw_transcript)}")
+    print(f"🔍 Raw transcript content: {str(raw_transcript)[:200]}...")
+    
+    # Process transcript based on its format
+    transcript = normalize_transcript(raw_transcript)
+    
+    print(f"📝 Processed transcript: {transcript[:300]}...")
+    
+    # Enhanced error handling for information extraction
+    try:
+        if schema is not None:
+            # Template calls dispatch straight to their compiled typed extractors
+            extracted_info = schema.extract(transcript, language)
+        else:
+            extracted_info = extract_information_from_transcript(transcript, questions, language)
+        print(f"✅ Successfully extracted information for {len(extracted_info)} questions")
+    except Exception as e:
+        print(f"❌ Error extracting information: {str(e)}")
+        # Fallback: create basic extracted info
+        extracted_info = {}
+        for i, question in enumerate(questions):
+            extracted_info[f"question_{i+1}"] = {
+                "question": question,
+                "answer": "Could not extract answer due to processing error"
+            }
+    
+    return {
+        "conversation_id": conversation_id,
+        "transcript": transcript,
+        "extracted_info": extracted_info,
+        "processed_at": datetime.now().isoformat(),
+        "raw_transcript_type": str(type(raw_transcript)),
+        "processing_notes": f"Transcript was {type(raw_transcript).__name__} format, converted to string"
+    }
+
+def process_recipient_conversations(batch_call_id: str, call_info: Dict, schema) -> tuple:
+    """Process every recipient of a multi-recipient batch (e.g. recurring follow-ups)"""
+    status_result = call_status_cache.terminal(batch_call_id)
+    if status_result is not None and unresolved_recipients(status_result["batch_call"], call_info["recipients"]):
+        status_result = None  # Conversation ids appear after the batch finishes; look again
+    if status_result is None:
+        status_result = asyncio.run(elevenlabs_client.get_batch_call_status(batch_call_id))
+        call_status_cache.store(batch_call_id, status_result)
+    if not status_result["success"]:
+        return {
+            "success": False,
+            "retryable": True,
+            "message": "Failed to get batch call details",
+            "error": status_result["error"]
+        }, 502
+    
+    conversation_ids = recipient_conversation_ids(status_result["batch_call"])
+    waiting = unresolved_recipients(status_result["batch_call"], call_info["recipients"])
+    if waiting:
+        # Processing now would record these recipients as having no conversation for good
+        return {
+            "success": False,
+            "retryable": True,
+            "message": f"{len(waiting)} of {len(call_info['recipients'])} recipients have no conversation yet for batch call {batch_call_id}"
+        }, 404
+    
+    recipients = {}
+    for phone_number in call_info["recipients"]:
+        conversation_id = conversation_ids.get(phone_number)
+        recipients[phone_number] = extract_conversation_results(
+            conversation_id, call_info.get("questions", []), call_info.get("language", "en"), schema
+        ) if conversation_id else None
+    
+    results = {
+        "recipients": recipients,
+        "processed_at": datetime.now().isoformat(),
+        "processing_notes": f"{sum(1 for r in recipients.values() if r)} of {len(recipients)} recipients had a conversation"
+    }
+    call_results[batch_call_id] = results
+    active_calls[batch_call_id]["conversation_processed"] = True
+    processed_calls.add(batch_call_id)
+    
+    return {
+        "success": True,
+        "message": "Conversations processed successfully",
+        "results": results
+    }, 200
+
+def finish_conversation_job(batch_call_id: str, results: Dict) -> None:
+    """Attach processed results to the call and push them to subscribed dashboards"""
+    if batch_call_id in active_calls:
+        active_calls[batch_call_id]["conversation_results"] = results
+    try:
+        sio.emit('conversation_processed', {"batch_call_id": batch_call_id, "results": results}, room=batch_call_id)
+    except Exception as e:
+        print(f"Error emitting conversation results: {e}")
+
+# Conversation processing runs in the background once a call completes
+conversation_jobs = JobQueue(
+    emit_fn=lambda event, payload, room: sio.emit(event, payload, room=room),
+    max_workers=int(os.getenv('CONVERSATION_JOB_WORKERS', '2')),
+    max_pending=int(os.getenv('CONVERSATION_JOB_MAX_PENDING', '500'))
+)
+conversation_job_ids: Dict[str, str] = {}
+conversation_jobs_lock = threading.Lock()
+
+def enqueue_conversation_processing(batch_call_id: str) -> Dict:
+    """Queue processing for a call unless a job for it is already queued, running or done"""
+    with conversation_jobs_lock:
+        job_id = conversation_job_ids.get(batch_call_id)
+        job = conversation_jobs.get(job_id) if job_id else None
+        if job is not None and job["status"] != "failed":
+            return job
+        return submit_conversation_job(batch_call_id)
+
+def submit_conversation_job(batch_call_id: str) -> Dict:
+    
+    retries = {"count": 0}
+    
+    def run(progress):
+        circuit = upstream_breakers.open_circuit("batch_call_status", "conversation")
+        if circuit is not None:
+            # Waiting out the breaker says nothing about this call, so it does not use up an attempt
+            raise RetryLater("upstream_unavailable", max(circuit.retry_after, 10), counts=False)
+        progress("fetching_conversation")
+        body, _ = process_call_conversation(batch_call_id)
+        if body.get("retryable"):
+            # ElevenLabs indexes conversations a little after the call ends
+            delay = min(10 * 2 ** retries["count"], 120)
+            retries["count"] += 1
+            raise RetryLater("waiting_for_conversation", delay)
+        if body.get("success"):
+            finish_conversation_job(batch_call_id, body["results"])
+        return body
+    
+    job = conversation_jobs.submit(
+        "process_conversation", run, meta={"batch_call_id": batch_call_id},
+        max_attempts=int(os.getenv('CONVERSATION_JOB_MAX_ATTEMPTS', '6'))
+    )
+    conversation_job_ids[batch_call_id] = job["job_id"]
+    print(f"📥 Queued conversation processing for call {batch_call_id}: {job['job_id']}")
+    return job
+
+def record_call_status(batch_call_id: str, status: str) -> None:
+    """Store a call's latest status and queue its processing once it completes"""
+    call_info = active_calls.get(batch_call_id)
+    if call_info is None:
+        return
+    call_info["status"] = status
+    if status in TERMINAL_CALL_STATUSES and status != "completed":
+        live_extractions.pop(batch_call_id)  # Never processed, so nothing else would drop it
+    if status == "completed" and not call_info.get("conversation_processed"):
+        try:
+            enqueue_conversation_processing(batch_call_id)
+        except JobQueueFull as e:
+            print(f"⚠️  Could not queue processing for {batch_call_id}: {e}")
+
 @app.route('/api/process-conversation/<batch_call_id>', methods=['POST'])
 def process_conversation(batch_call_id):
-    """Manually process conversation for a specific call - FIXED VERSION"""
+    """Return processed results if they exist, otherwise queue processing and return the job"""
     try:
-        print(f"🔄 Manual conversation processing for call: {batch_call_id}")
+        if batch_call_id in call_results:
+            return jsonify({
+                "success": True,
+                "message": "Conversation processed successfully",
+                "results": call_results[batch_call_id]
+            })
         
         if batch_call_id not in active_calls:
             return jsonify({
@@ -816,97 +1584,14 @@ def process_conversation(batch_call_id):
                 "message": "Call not found in active calls"
             }), 404
         
-        call_info = active_calls[batch_call_id]
-        agent_id = call_info["agent_id"]
-        questions = call_info.get("questions", [])
-        
-        # Find conversation
-        conversation_result = asyncio.run(find_conversation_for_call(batch_call_id, agent_id))
-        
-        if not conversation_result["success"]:
-            return jsonify({
-                "success": False,
-                "message": conversation_result["message"],
-                "debug_info": conversation_result.get("debug_info")
-            }), 404
-        
-        conversation = conversation_result["conversation"]
-        conversation_id = conversation.get("conversation_id")
-        
-        print(f"🔍 Found conversation: {conversation_id}")
-        
-        # Get full conversation details
-        conv_details_result = asyncio.run(elevenlabs_client.get_conversation_by_id(conversation_id))
-        
-        if conv_details_result["success"]:
-            conv_details = conv_details_result["conversation"]
-            
-            # Enhanced transcript handling for different formats
-            raw_transcript = conv_details.get("transcript", "No transcript available")
-            
-            print(f"🔍 Raw transcript type: {type(raw_transcript)}")
-            print(f"🔍 Raw transcript content: {str(raw_transcript)[:200]}...")
-            
-            # Process transcript based on its format
-            if isinstance(raw_transcript, list):
-                # If it's a list, try to extract text from each item
-                transcript_parts = []
-                for item in raw_transcript:
-                    if isinstance(item, dict):
-                        # If item is a dict, look for common text fields
-                        text = item.get('text', item.get('content', item.get('message', str(item))))
-                        transcript_parts.append(str(text))
-                    else:
-                        transcript_parts.append(str(item))
-                transcript = " ".join(transcript_parts)
-            elif isinstance(raw_transcript, dict):
-                # If it's a dict, look for common text fields
-                transcript = raw_transcript.get('text', raw_transcript.get('content', str(raw_transcript)))
-            else:
-                # If it's already a string or other type
-                transcript = str(raw_transcript) if raw_transcript else "No transcript available"
-            
-            print(f"📝 Processed transcript: {transcript[:300]}...")
-            
-        else:
-            transcript = "Could not retrieve transcript"
-            print(f"❌ Failed to get conversation details: {conv_details_result.get('error', 'Unknown error')}")
-        
-        # Enhanced error handling for information extraction
-        try:
-            extracted_info = extract_information_from_transcript(transcript, questions)
-            print(f"✅ Successfully extracted information for {len(extracted_info)} questions")
-        except Exception as e:
-            print(f"❌ Error extracting information: {str(e)}")
-            # Fallback: create basic extracted info
-            extracted_info = {}
-            for i, question in enumerate(questions):
-                extracted_info[f"question_{i+1}"] = {
-                    "question": question,
-                    "answer": "Could not extract answer due to processing error"
-                }
-        
-        # Store results
-        results = {
-            "conversation_id": conversation_id,
-            "transcript": transcript,
-            "extracted_info": extracted_info,
-            "processed_at": datetime.now().isoformat(),
-            "raw_transcript_type": str(type(raw_transcript)),
-            "processing_notes": f"Transcript was {type(raw_transcript).__name__} format, converted to string"
-        }
-        
-        call_results[batch_call_id] = results
-        active_calls[batch_call_id]["conversation_processed"] = True
-        processed_calls.add(batch_call_id)  # Mark as processed
-        
-        print(f"✅ Conversation processed successfully for call {batch_call_id}")
-        
+        job = enqueue_conversation_processing(batch_call_id)
         return jsonify({
             "success": True,
-            "message": "Conversation processed successfully",
-            "results": results
-        })
+            "processing": True,
+            "message": "Conversation processing queued; results are pushed when ready",
+            "job_id": job["job_id"],
+            "status_url": f"/api/jobs/{job['job_id']}"
+        }), 202
         
     except Exception as e:
         print(f"❌ Error processing conversation: {str(e)}")
@@ -918,44 +1603,75 @@ def process_conversation(batch_call_id):
             "message": "Failed to process conversation"
         }), 500
 
+def iter_conversation_pages(limit: int, cursor: Optional[str], agent_id: Optional[str]):
+    """Yield (conversation summary, None) per conversation, then (None, page state) once at the end"""
+    remaining = limit
+    has_more = True
+    while remaining > 0 and has_more:
+        page = asyncio.run(elevenlabs_client.get_conversations(cursor, agent_id, min(remaining, 100)))
+        if not page["success"]:
+            raise RuntimeError(page["error"])
+        for conv in page["conversations"][:remaining]:
+            yield {
+                "conversation_id": conv.get("conversation_id"),
+                "agent_id": conv.get("agent_id"),
+                "batch_call_id": conv.get("batch_call_id"),
+                "status": conv.get("status"),
+                "created_at": conv.get("created_at") or conv.get("start_time_unix_secs")
+            }, None
+        remaining -= len(page["conversations"])
+        cursor, has_more = page.get("next_cursor"), bool(page.get("has_more") and page.get("next_cursor"))
+    yield None, {"next_cursor": cursor if has_more else None, "has_more": has_more}
+
 @app.route('/api/debug-conversations')
 def debug_conversations():
-    """Debug endpoint to see all available conversations"""
+    """Debug endpoint to page through conversations (?limit=&cursor=&agent_id=&format=ndjson)
+
+    The response is streamed one upstream page at a time, so the account's
+    history is never held in memory.
+    """
     try:
-        conversations_result = asyncio.run(elevenlabs_client.get_conversations())
-        
-        if conversations_result["success"]:
-            conversations = conversations_result["conversations"]
-            
-            debug_info = {
-                "total_conversations": len(conversations),
-                "conversations": []
-            }
-            
-            for conv in conversations:
-                debug_info["conversations"].append({
-                    "conversation_id": conv.get("conversation_id"),
-                    "agent_id": conv.get("agent_id"),
-                    "batch_call_id": conv.get("batch_call_id"),
-                    "status": conv.get("status"),
-                    "created_at": conv.get("created_at")
-                })
-            
-            return jsonify({
-                "success": True,
-                "debug_info": debug_info
-            })
-        else:
-            return jsonify({
-                "success": False,
-                "error": conversations_result["error"]
-            }), 500
-            
+        limit = max(1, min(int(request.args.get('limit', 100)), 1000))
+        cursor = request.args.get('cursor')
+        agent_id = request.args.get('agent_id')
+        ndjson = request.args.get('format') == 'ndjson' or 'application/x-ndjson' in request.headers.get('Accept', '')
+        
+        # Fetch the first page before streaming so upstream errors still get a proper status code
+        pages = iter_conversation_pages(limit, cursor, agent_id)
+        first = next(pages)
     except Exception as e:
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
+    
+    def generate_ndjson():
+        try:
+            for conv, state in itertools.chain([first], pages):
+                yield json.dumps(conv if conv is not None else {"page": state}) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+    
+    def generate_json():
+        yield '{"success": true, "debug_info": {"conversations": ['
+        count = 0
+        state = {"next_cursor": None, "has_more": False}
+        error = None
+        try:
+            for conv, page_state in itertools.chain([first], pages):
+                if conv is None:
+                    state = page_state
+                    continue
+                yield (", " if count else "") + json.dumps(conv)
+                count += 1
+        except Exception as e:
+            error = str(e)
+        yield f'], "total_conversations": {count}}}, "next_cursor": {json.dumps(state["next_cursor"])}, ' \
+              f'"has_more": {json.dumps(state["has_more"])}, "error": {json.dumps(error)}}}'
+    
+    if ndjson:
+        return Response(generate_ndjson(), mimetype='application/x-ndjson')
+    return Response(generate_json(), mimetype='application/json')
 
 @app.route('/api/call-results/<batch_call_id>')
 def get_call_results(batch_call_id):
@@ -977,6 +1693,509 @@ def get_call_results(batch_call_id):
             "error": str(e)
         }), 500
 
+@app.route('/api/agent-gc')
+def get_agent_gc_status():
+    return jsonify({
+        "success": True,
+        "agent_gc": agent_collector.stats(),
+        "pending_agents": agent_collector.pending()
+    })
+
+@app.route('/api/health')
+def health():
+    """Upstream circuit state plus cache, hedging and job queue figures"""
+    breakers = upstream_breakers.stats()
+    degraded = sorted(name for name, breaker in breakers.items() if breaker["state"] != "closed")
+    return jsonify({
+        "success": True,
+        "status": "degraded" if degraded else "ok",
+        "degraded_endpoints": degraded,
+        "circuit_breakers": breakers,
+        "call_status_cache": call_status_cache.stats(),
+        "hedging": request_hedger.stats() if request_hedger else None,
+        "admission": call_admission.stats(),
+        "jobs": {
+            "make_call": call_jobs.stats(),
+            "process_conversation": conversation_jobs.stats()
+        }
+    })
+
+@app.route('/api/call-status-cache')
+def get_call_status_cache():
+    return jsonify({
+        "success": True,
+        "cache": call_status_cache.stats(),
+        "hedging": request_hedger.stats() if request_hedger else None
+    })
+
+@app.route('/api/agent-gc/sweep', methods=['POST'])
+def sweep_agents():
+    """Run a garbage collection sweep now; pass ?dry_run=1 to only list candidates"""
+    try:
+        dry_run_arg = request.args.get('dry_run')
+        dry_run = None if dry_run_arg is None else dry_run_arg.lower() in ('1', 'true', 'yes')
+        result = agent_collector.sweep(dry_run=dry_run)
+        return jsonify({
+            "success": True,
+            "result": result
+        })
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+TERMINAL_CALL_STATUSES = ("completed", "failed", "cancelled")
+
+# Finished calls are cached for good; live ones are served for a few seconds, then
+# served stale while a single background refresh updates them
+call_status_cache = StatusCache(
+    fetch_fn=lambda batch_call_id: asyncio.run(elevenlabs_client.get_batch_call_status(batch_call_id)),
+    on_update=lambda batch_call_id, status_result: record_call_status(batch_call_id, status_result["status"]),
+    ttl=float(os.getenv('CALL_STATUS_TTL_SECONDS', '3')),
+    stale_ttl=float(os.getenv('CALL_STATUS_STALE_SECONDS', '60'))
+)
+
+async def fetch_call_statuses(batch_call_ids: List[str], max_concurrency: int) -> Dict[str, Dict]:
+    """Fetch many batch call statuses concurrently over one pooled client"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async with elevenlabs_client.session(max_connections=max_concurrency):
+        async def fetch(batch_call_id):
+            async with semaphore:
+                return batch_call_id, await elevenlabs_client.get_batch_call_status(batch_call_id)
+        
+        return dict(await asyncio.gather(*(fetch(batch_call_id) for batch_call_id in batch_call_ids)))
+
+def refresh_call_statuses(batch_call_ids: List[str]) -> Dict[str, Optional[str]]:
+    """Fetch and record the latest status of several calls; None where the fetch failed"""
+    if not batch_call_ids:
+        return {}
+    max_concurrency = int(os.getenv('CALL_STATUS_CONCURRENCY', '10'))
+    status_results = asyncio.run(fetch_call_statuses(batch_call_ids, max_concurrency))
+    statuses = {}
+    for batch_call_id, status_result in status_results.items():
+        call_status_cache.store(batch_call_id, status_result)
+        statuses[batch_call_id] = status_result["status"] if status_result["success"] else None
+        if status_result["success"]:
+            record_call_status(batch_call_id, status_result["status"])
+    return statuses
+
+def refresh_call_status(batch_call_id: str) -> Optional[str]:
+    """Fetch the latest batch call status from ElevenLabs and record it"""
+    return refresh_call_statuses([batch_call_id]).get(batch_call_id)
+
+def dial_campaign_contact(contact: Dict, template_id: str) -> Dict:
+    """Place one campaign call through the same path as /api/make-call"""
+    template = get_agent_templates().get(template_id)
+    if template is None:
+        return {"success": False, "error": f"Unknown template: {template_id}"}
+    body, _ = start_call({
+        "phoneNumber": contact.get("phone_number"),
+        "patientName": contact.get("name"),
+        "agentName": template.get("name"),
+        "callPurpose": template.get("purpose"),
+        "questions": template.get("questions", []),
+        "firstMessage": template.get("first_message", ""),
+        "customPrompt": template.get("custom_prompt", ""),
+        "voiceId": template.get("voice_id", '21m00Tcm4TlvDq8ikWAM'),
+        "language": contact.get("language") or template.get("language", "en"),
+        "templateId": template_id,
+        # Held contacts stay with the campaign so its concurrency caps and counters cover them
+        "deferOutsideWindow": True
+    })
+    return body
+
+if START_BACKGROUND_WORKERS:
+    # Build the do-not-call filter now rather than on the first dial
+    suppression_list.load()
+
+# Holds calls placed outside the recipient's local calling hours
+call_scheduler = CallScheduler(
+    # The scheduler has already picked the window, so place_call must not hold the call again
+    dispatch_fn=lambda payload, scheduled_time_unix: start_call(dict(payload, ignoreCallingWindow=True), scheduled_time_unix)[0],
+    window=CallingWindow(
+        start_hour=int(os.getenv('CALLING_WINDOW_START', '9')),
+        end_hour=int(os.getenv('CALLING_WINDOW_END', '20')),
+        weekdays=tuple(int(day) for day in os.getenv('CALLING_WINDOW_DAYS', '0,1,2,3,4,5,6').split(','))
+    ),
+    default_timezone=os.getenv('DEFAULT_CALL_TIMEZONE', 'UTC'),
+    lead_seconds=float(os.getenv('CALL_SCHEDULER_LEAD_SECONDS', '300')),
+    path=os.getenv('SCHEDULED_CALLS_DB', DEFAULT_SCHEDULED_PATH),
+    max_retries=int(os.getenv('CALL_SCHEDULER_MAX_RETRIES', '10'))
+)
+if START_BACKGROUND_WORKERS:
+    call_scheduler.ensure_started()  # Release calls held before a restart
+
+def dispatch_recurring_calls(template_id: str, language: str, schedules: List[Dict]) -> Dict[str, Dict]:
+    """Submit one batch of due follow-ups as a single multi-recipient batch call per calling window"""
+    template = get_agent_templates().get(template_id)
+    if template is None:
+        return {s["id"]: {"success": False, "error": f"Unknown template: {template_id}"} for s in schedules}
+    language = language or template.get("language", "en")
+    
+    results = {}
+    by_window: Dict[Optional[int], List[Dict]] = {}
+    for schedule in schedules:
+        if suppression_list.is_suppressed(schedule["phone_number"]):
+            results[schedule["id"]] = {"success": False, "skipped": True, "error": "Number is on the do-not-call list"}
+            continue
+        window_start = call_scheduler.next_window(schedule["phone_number"])
+        if window_start is None:
+            results[schedule["id"]] = {"success": False, "error": "No calling window in the next week"}
+            continue
+        # Recipients outside their calling hours go out in a batch scheduled for the window start
+        scheduled_time_unix = int(window_start) if window_start > time.time() + 60 else None
+        by_window.setdefault(scheduled_time_unix, []).append(schedule)
+    if not by_window:
+        return results
+    
+    # Failures carry retry_after so the scheduler retries once the upstream is back
+    circuit = upstream_breakers.open_circuit("submit_batch_call")
+    if circuit is not None:
+        for group in by_window.values():
+            for schedule in group:
+                results[schedule["id"]] = {"success": False, "error": str(circuit), "retry_after": int(circuit.retry_after) + 1}
+        return results
+    
+    agent_result = ensure_template_agent(template_id, language, template.get("voice_id", '21m00Tcm4TlvDq8ikWAM'))
+    if not agent_result["success"]:
+        for group in by_window.values():
+            for schedule in group:
+                results[schedule["id"]] = {"success": False, "error": agent_result.get("error")}
+        return results
+    agent_id = agent_result["agent_id"]
+    
+    for scheduled_time_unix, group in by_window.items():
+        recipients = [
+            {
+                "phone_number": schedule["phone_number"],
+                "conversation_initiation_client_data": build_client_data(
+                    dynamic_variables(schedule["patient_name"], template.get("purpose"), template.get("medication"))
+                )
+            }
+            for schedule in group
+        ]
+        call_name = f"{template['name'].strip()} follow-up ({len(recipients)} patients)"
+        try:
+            # Batches for a later window start no calls now, so they only take a setup slot
+            with call_admission.admit(call_scopes(), calls=len(recipients) if scheduled_time_unix is None else 0):
+                batch_call_result = asyncio.run(elevenlabs_client.submit_batch_call(agent_id, recipients, call_name, scheduled_time_unix))
+        except AdmissionRejected as e:
+            print(f"🚦 Recurring batch of {len(recipients)} not admitted: {e.reason}")
+            for schedule in group:
+                results[schedule["id"]] = {"success": False, "error": e.reason, "retry_after": int(e.retry_after)}
+            continue
+        
+        if batch_call_result["success"]:
+            batch_call_id = batch_call_result["batch_call_id"]
+            active_calls[batch_call_id] = {
+                "phone_number": group[0]["phone_number"] if len(group) == 1 else None,
+                "recipients": [schedule["phone_number"] for schedule in group],
+                "agent_id": agent_id,
+                "agent_name": template["name"],
+                "call_purpose": template.get("purpose"),
+                "questions": template.get("questions", []),
+                "language": language,
+                "template_id": template_id,
+                "agent_kind": "template",
+                "agent_phone_number_id": ELEVENLABS_PHONE_NUMBER_ID,
+                "status": "pending",
+                "created_at": datetime.now().isoformat(),
+                "scheduled_time_unix": scheduled_time_unix,
+                "recurring": True,
+                "conversation_processed": False
+            }
+            for schedule in group:
+                results[schedule["id"]] = {"success": True, "batch_call_id": batch_call_id}
+            call_watcher.ensure_started()
+        else:
+            for schedule in group:
+                # A submit that may have gone through is not retried, or patients could be called twice
+                results[schedule["id"]] = {
+                    "success": False,
+                    "skipped": bool(batch_call_result.get("outcome_unknown")),
+                    "error": batch_call_result["error"]
+                }
+    return results
+
+# Notices completed calls even when no dashboard is polling them
+call_watcher = CallWatcher(
+    pending_fn=lambda: [
+        batch_call_id for batch_call_id, call_info in list(active_calls.items())
+        if call_info.get("status") not in TERMINAL_CALL_STATUSES
+    ],
+    refresh_fn=refresh_call_statuses,
+    interval=float(os.getenv('CALL_WATCH_INTERVAL', '15'))
+)
+
+# Weekly (or other cadence) protocol follow-ups, persisted across restarts
+recurring_scheduler = RecurringScheduler(
+    os.getenv('RECURRING_SCHEDULES_DB', DEFAULT_RECURRING_PATH),
+    dispatch_fn=dispatch_recurring_calls,
+    tick_seconds=float(os.getenv('RECURRING_TICK_SECONDS', '60')),
+    batch_size=int(os.getenv('RECURRING_BATCH_SIZE', '100')),
+    retry_seconds=float(os.getenv('RECURRING_RETRY_SECONDS', '300'))
+)
+if START_BACKGROUND_WORKERS:
+    recurring_scheduler.ensure_started()  # Reload persisted schedules after a restart
+
+campaign_engine = CampaignEngine(
+    dial_fn=dial_campaign_contact,
+    status_fn=refresh_call_statuses,
+    is_suppressed=suppression_list.is_suppressed,
+    emit_fn=lambda event, payload, room: sio.emit(event, payload, room=room),
+    max_concurrent_calls=int(os.getenv('CAMPAIGN_MAX_CONCURRENT_CALLS', '5')),
+    poll_interval=float(os.getenv('CAMPAIGN_POLL_INTERVAL', '5'))
+)
+
+@app.route('/api/campaigns', methods=['POST'])
+def create_campaign():
+    """Start a campaign from an uploaded contact file (CSV or JSONL) or a JSON contact list"""
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            data = request.form.to_dict()
+            templates = json.loads(data.get('templates') or '{}')
+        else:
+            data = request.get_json() or {}
+            templates = data.get('templates') or {}
+            if not data.get('contacts'):
+                return jsonify({
+                    "success": False,
+                    "message": "A contact file or contact list is required"
+                }), 400
+        
+        default_template = data.get('templateId')
+        unknown = [t for t in [default_template, *templates.values()] if t and t not in get_agent_templates()]
+        if unknown:
+            return jsonify({
+                "success": False,
+                "message": f"Unknown template(s): {', '.join(unknown)}"
+            }), 400
+        
+        default_country_code = (data.get('defaultCountryCode') or '').lstrip('+') or None
+        if upload is not None:
+            # Spool the upload to disk; the campaign streams rows from it as it dials
+            fmt = detect_format(upload.filename or '')
+            fd, contacts_path = tempfile.mkstemp(prefix='contacts-', suffix=f'.{fmt}')
+            os.close(fd)
+            upload.save(contacts_path)
+            contacts = ContactIngest(contacts_path, fmt, default_country_code, cleanup=True)
+        else:
+            contacts = ContactIngest.from_rows(data['contacts'], default_country_code)
+        
+        campaign = campaign_engine.create_campaign(
+            name=data.get('name') or f"Campaign {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+            contacts=contacts,
+            templates={language.lower(): template_id for language, template_id in templates.items()},
+            default_template=default_template,
+            max_concurrent=int(data.get('maxConcurrent') or 2)
+        )
+        return jsonify({
+            "success": True,
+            "campaign": campaign.progress()
+        }), 201
+        
+    except Exception as e:
+        print(f"❌ Error creating campaign: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/campaigns')
+def list_campaigns():
+    return jsonify({
+        "success": True,
+        "engine": campaign_engine.stats(),
+        "campaigns": [campaign.progress() for campaign in list(campaign_engine.campaigns.values())]
+    })
+
+@app.route('/api/campaigns/<campaign_id>')
+def get_campaign(campaign_id):
+    campaign = campaign_engine.campaigns.get(campaign_id)
+    if campaign is None:
+        return jsonify({
+            "success": False,
+            "message": "Campaign not found"
+        }), 404
+    return jsonify({
+        "success": True,
+        "campaign": campaign.progress()
+    })
+
+@app.route('/api/campaigns/<campaign_id>/<action>', methods=['POST'])
+def update_campaign(campaign_id, action):
+    """Pause, resume or cancel a campaign"""
+    statuses = {"pause": "paused", "resume": "running", "cancel": "cancelled"}
+    if action not in statuses:
+        return jsonify({
+            "success": False,
+            "message": f"Unknown action: {action}"
+        }), 400
+    campaign = campaign_engine.set_status(campaign_id, statuses[action])
+    if campaign is None:
+        return jsonify({
+            "success": False,
+            "message": "Campaign not found"
+        }), 404
+    return jsonify({
+        "success": True,
+        "campaign": campaign.progress()
+    })
+
+@app.route('/api/scheduled-calls')
+def get_scheduled_calls():
+    return jsonify({
+        "success": True,
+        "scheduler": call_scheduler.stats(),
+        "scheduled_calls": call_scheduler.pending()
+    })
+
+@app.route('/api/scheduled-calls/<schedule_id>', methods=['GET', 'DELETE'])
+def scheduled_call(schedule_id):
+    entry = call_scheduler.cancel(schedule_id) if request.method == 'DELETE' else call_scheduler.get(schedule_id)
+    if entry is None:
+        return jsonify({
+            "success": False,
+            "message": "Scheduled call not found"
+        }), 404
+    return jsonify({
+        "success": True,
+        "scheduled_call": {key: value for key, value in entry.items() if key != "payload"}
+    })
+
+@app.route('/api/recurring-schedules')
+def list_recurring_schedules():
+    try:
+        recurring_scheduler.ensure_started()
+        return jsonify({
+            "success": True,
+            "stats": recurring_scheduler.stats(),
+            "schedules": recurring_scheduler.list(
+                phone_number=request.args.get('phone'),
+                limit=min(int(request.args.get('limit', 100)), 1000),
+                offset=int(request.args.get('offset', 0))
+            )
+        })
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/recurring-schedules', methods=['POST'])
+def create_recurring_schedule():
+    """Repeat a template call for one patient on a cadence (default: the template's follow_up_days)"""
+    try:
+        data = request.get_json() or {}
+        template_id = data.get('templateId')
+        template = get_agent_templates().get(template_id)
+        if template is None:
+            return jsonify({
+                "success": False,
+                "message": f"Unknown template: {template_id}"
+            }), 400
+        
+        phone_number = normalize_e164(data.get('phoneNumber'), (data.get('defaultCountryCode') or '').lstrip('+') or None)
+        if not phone_number:
+            return jsonify({
+                "success": False,
+                "message": "A valid phone number is required"
+            }), 400
+        
+        if data.get('intervalSeconds'):
+            interval_seconds = int(data['intervalSeconds'])
+        else:
+            interval_seconds = int(float(data.get('intervalDays') or template.get('follow_up_days') or 7) * 86400)
+        start_at = datetime.fromisoformat(data['startAt']).timestamp() if data.get('startAt') else None
+        
+        schedule = recurring_scheduler.upsert(
+            data.get('patientName'), phone_number, template_id,
+            data.get('language') or template.get('language', 'en'), interval_seconds, start_at
+        )
+        return jsonify({
+            "success": True,
+            "schedule": schedule
+        }), 201
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        print(f"❌ Error creating recurring schedule: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/recurring-schedules/<schedule_id>', methods=['GET', 'DELETE'])
+def recurring_schedule(schedule_id):
+    schedule = recurring_scheduler.cancel(schedule_id) if request.method == 'DELETE' else recurring_scheduler.get(schedule_id)
+    if schedule is None:
+        return jsonify({
+            "success": False,
+            "message": "Schedule not found"
+        }), 404
+    return jsonify({
+        "success": True,
+        "schedule": schedule
+    })
+
+@app.route('/api/suppression')
+def check_suppression():
+    """Check one number (?phone=...) or return suppression list stats"""
+    phone_number = request.args.get('phone')
+    if phone_number:
+        return jsonify({
+            "success": True,
+            "phone_number": phone_number,
+            "suppressed": suppression_list.is_suppressed(phone_number)
+        })
+    return jsonify({
+        "success": True,
+        "stats": suppression_list.stats()
+    })
+
+@app.route('/api/suppression', methods=['POST', 'DELETE'])
+def update_suppression():
+    """Bulk add (POST) or remove (DELETE) numbers, from a JSON list or an uploaded file"""
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            if (upload.filename or '').lower().endswith(('.csv', '.jsonl', '.ndjson')):
+                # Contact files in the campaign format, read with the same streaming ingest
+                fmt = detect_format(upload.filename)
+                fd, numbers_path = tempfile.mkstemp(prefix='suppression-', suffix=f'.{fmt}')
+                os.close(fd)
+                upload.save(numbers_path)
+                numbers = (contact["phone_number"] for contact in ContactIngest(numbers_path, fmt, cleanup=True))
+            else:
+                # Plain list, one number per line
+                numbers = (line.decode('utf-8-sig').strip() for line in upload.stream if line.strip())
+            reason = request.form.get('reason')
+        else:
+            data = request.get_json() or {}
+            numbers = data.get('numbers') or []
+            reason = data.get('reason')
+        
+        if request.method == 'POST':
+            result = suppression_list.add_many(numbers, reason)
+        else:
+            result = suppression_list.remove_many(numbers)
+        return jsonify({
+            "success": True,
+            "result": result
+        })
+    except Exception as e:
+        print(f"❌ Error updating suppression list: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
 @app.route('/api/active-calls')
 def get_active_calls():
     return jsonify({
@@ -0,0 +1,202 @@
+"""Benchmark transcript normalization and answer extraction.
+
+Runs normalize_transcript, extract_information_from_transcript and the
+compiled template schema (CompiledSchema.extract, the path template calls
+take) over the synthetic corpus in benchmarks/corpus.py and reports
+throughput, p50/p99 latency and peak memory per case. Results are compared
+against benchmarks/baseline.json and the script exits non-zero on a
+regression.
+
+Baseline timings come from whatever machine wrote them, so they are not
+compared as absolute milliseconds. Every run also times a fixed reference
+workload, and each case is compared by its ratio to that reference, which
+cancels out how fast the machine is.
+
+Usage (from backend/):
+    python benchmarks/bench_extraction.py
+    python benchmarks/bench_extraction.py --update-baseline
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+
+from benchmarks.corpus import QUESTIONS, iter_corpus
+from src.agents.templates import DEFAULT_AGENT_TEMPLATES
+from src.extraction.language_packs import get_rule_pack
+from src.extraction.schema import compile_template_schemas
+from src.extraction.transcript import extract_information_from_transcript, normalize_transcript
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Metrics compared against the baseline, with a tolerance multiplier each.
+# Tail latency is the noisiest number on shared machines, so it gets more slack.
+COMPARED_METRICS = {"p50_ms": 1.0, "p99_ms": 2.0, "peak_kib": 1.0}
+
+# Machine-speed yardstick: plain regex scanning and string work, no project code
+REFERENCE_CASE = "reference/regex-scan"
+_REFERENCE_PATTERNS = [re.compile(rf"\b{word}\w*\b") for word in (
+    "med", "pill", "take", "dizz", "head", "swell", "feel", "week", "doctor", "pain", "sleep", "tired",
+)]
+_REFERENCE_TEXT = " ".join(f"turn {i}: I take my pills most days but feel dizzy when I stand up" for i in range(200))
+
+
+def reference_workload() -> int:
+    text_lower = _REFERENCE_TEXT.lower()
+    hits = sum(len(pattern.findall(text_lower)) for pattern in _REFERENCE_PATTERNS)
+    return hits + len(text_lower.split())
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def measure(fn: Callable[[], object], iterations: int) -> Dict:
+    """Time fn over several iterations, then take one traced run for peak memory"""
+    fn()  # warm-up (also loads the language pack)
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total_seconds = sum(samples) / 1000.0
+    return {
+        "throughput_per_s": round(iterations / total_seconds, 1) if total_seconds else 0.0,
+        "p50_ms": round(percentile(samples, 50), 4),
+        "p99_ms": round(percentile(samples, 99), 4),
+        "peak_kib": round(peak / 1024.0, 1),
+    }
+
+
+def best_of(fn: Callable[[], object], iterations: int, rounds: int) -> Dict:
+    """Keep the best value of each metric across rounds to filter out scheduler noise"""
+    runs = [measure(fn, iterations) for _ in range(rounds)]
+    best = {metric: min(run[metric] for run in runs) for metric in ("p50_ms", "p99_ms", "peak_kib")}
+    best["throughput_per_s"] = max(run["throughput_per_s"] for run in runs)
+    return best
+
+
+def run_benchmarks(iterations: int, rounds: int) -> Dict[str, Dict]:
+    results = {REFERENCE_CASE: best_of(reference_workload, iterations, rounds)}
+    schema = compile_template_schemas(DEFAULT_AGENT_TEMPLATES).resolve(None, QUESTIONS)
+    # extraction prints progress for every question; keep it out of the timings
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for fmt, language, minutes, raw_transcript in iter_corpus():
+            get_rule_pack(language)
+            case = f"{fmt}/{language}/{minutes}m"
+            text = normalize_transcript(raw_transcript)
+
+            results[f"normalize/{case}"] = best_of(lambda: normalize_transcript(raw_transcript), iterations, rounds)
+            results[f"extract/{case}"] = best_of(
+                lambda: extract_information_from_transcript(text, QUESTIONS, language), iterations, rounds
+            )
+            if fmt == "string":  # The schema sees the same normalized text for every format
+                results[f"schema/{language}/{minutes}m"] = best_of(
+                    lambda: schema.extract(text, language), iterations, rounds
+                )
+    # Measured again at the end so a machine that sped up or slowed down mid-run is averaged out
+    again = best_of(reference_workload, iterations, rounds)
+    results[REFERENCE_CASE] = {
+        metric: round((value + again[metric]) / 2, 4) for metric, value in results[REFERENCE_CASE].items()
+    }
+    return results
+
+
+def machine_speed(results: Dict[str, Dict], baseline: Dict[str, Dict], metric: str) -> float:
+    """How much slower this run's machine is than the baseline's, from the reference workload"""
+    before = baseline.get(REFERENCE_CASE, {}).get(metric)
+    after = results.get(REFERENCE_CASE, {}).get(metric)
+    if not before or not after:
+        return 1.0  # Old baseline without a reference: compare as recorded
+    return after / before
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Return a description of every metric that regressed beyond the tolerance"""
+    regressions = []
+    for name, metrics in results.items():
+        expected = baseline.get(name)
+        if not expected or name == REFERENCE_CASE:
+            continue
+        for metric, slack in COMPARED_METRICS.items():
+            before = expected.get(metric)
+            after = metrics.get(metric)
+            if before is None or after is None:
+                continue
+            if metric.endswith("_ms"):
+                # Scale the baseline to this machine; differences under 50µs are timer noise
+                before = round(before * machine_speed(results, baseline, metric), 4)
+                floor = 0.05
+            else:
+                floor = 1.0
+            if after > max(before * (1 + tolerance * slack), before + floor):
+                regressions.append(f"{name} {metric}: {before} (scaled baseline) -> {after}")
+    return regressions
+
+
+def print_report(results: Dict[str, Dict]) -> None:
+    print(f"{'case':<32} {'ops/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'peak KiB':>10}")
+    for name, metrics in results.items():
+        print(
+            f"{name:<32} {metrics['throughput_per_s']:>10} {metrics['p50_ms']:>10} "
+            f"{metrics['p99_ms']:>10} {metrics['peak_kib']:>10}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark transcript extraction")
+    parser.add_argument("--iterations", type=int, default=200, help="timed runs per case")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per case; the fastest is kept")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown (0.5 = 50%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.iterations, args.rounds)
+    print_report(results)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"✅ Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️  No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) against baseline:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+
+    print("✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Synthetic call transcripts for the extraction benchmarks.
+
+Transcripts are generated from a fixed seed so that every run (and the stored
+baseline) measures exactly the same corpus.
+"""
+
+import random
+from typing import Dict, Iterator, List, Tuple
+
+# Roughly how many conversational turns fit in one minute of a call
+TURNS_PER_MINUTE = 8
+
+DURATIONS_MINUTES = (1, 5, 15, 30)
+FORMATS = ("string", "turns", "dict")
+LANGUAGES = ("en", "es")
+
+QUESTIONS = [
+    "I've noticed that you have been improving lately, thats awesome!. On a scale from 1 to 10, how are you feeling?",
+    "Are you keeping up with Lisinopril as instructed?",
+    "In the past week, how often have you had symptoms like headaches, dizziness, or swelling?",
+    "Have you noticed any new or different symptoms since we last spoke?",
+    "Is there anything else you'd like Dr. Vinals to know about how you've been feeling?",
+]
+
+_AGENT_LINES = {
+    "en": [
+        "On a scale from 1 to 10, how are you feeling?",
+        "Are you keeping up with your medication as instructed?",
+        "In the past week, how often have you had symptoms like headaches, dizziness, or swelling?",
+        "Have you noticed any new or different symptoms since we last spoke?",
+        "I understand. Could you tell me a little more about that?",
+        "Thank you, that's very helpful.",
+    ],
+    "es": [
+        "En una escala del 1 al 10, ¿cómo se siente?",
+        "¿Está tomando su medicamento como se le indicó?",
+        "En la última semana, ¿con qué frecuencia ha tenido dolor de cabeza, mareo o hinchazón?",
+        "¿Ha notado algún síntoma nuevo desde la última vez que hablamos?",
+        "Entiendo. ¿Me puede contar un poco más?",
+        "Gracias, eso es muy útil.",
+    ],
+}
+
+_USER_LINES = {
+    "en": [
+        "I'd say I'm feeling about {n} out of 10 today.",
+        "Yes, I take it every morning like the doctor said.",
+        "Maybe {n} times a week I get a headache, and I was a bit dizzy on Tuesday.",
+        "Not really, just a little tired after work.",
+        "Sometimes I forget the evening dose, to be honest.",
+        "My ankles were swollen last weekend but it went away.",
+        "Nothing else, everything is going fine.",
+        "Well, it depends on the day, some days are better than others.",
+    ],
+    "es": [
+        "Diría que me siento un {n} de 10 hoy.",
+        "Sí, lo tomo todas las mañanas como me indicó el doctor.",
+        "Tal vez {n} veces por semana tengo dolor de cabeza, y el martes estuve algo mareado.",
+        "La verdad no, solo un poco de cansancio después del trabajo.",
+        "A veces se me olvida la dosis de la noche.",
+        "Tuve los tobillos con hinchazón el fin de semana pero ya pasó.",
+        "Nada más, todo va bien.",
+        "Depende del día, algunos días estoy mejor que otros.",
+    ],
+}
+
+
+def generate_turns(language: str, minutes: int, rng: random.Random) -> List[Dict]:
+    """Build an alternating agent/user turn list in the ElevenLabs transcript shape"""
+    turns = []
+    for i in range(minutes * TURNS_PER_MINUTE):
+        if i % 2 == 0:
+            turns.append({
+                "role": "agent",
+                "message": rng.choice(_AGENT_LINES[language]),
+                "time_in_call_secs": i * 60 // TURNS_PER_MINUTE,
+            })
+        else:
+            turns.append({
+                "role": "user",
+                "message": rng.choice(_USER_LINES[language]).format(n=rng.randint(1, 10)),
+                "time_in_call_secs": i * 60 // TURNS_PER_MINUTE,
+            })
+    return turns
+
+
+def shape_transcript(turns: List[Dict], fmt: str):
+    """Return the turns in one of the raw formats process_conversation accepts"""
+    if fmt == "turns":
+        return turns
+    text = " ".join(turn["message"] for turn in turns)
+    if fmt == "dict":
+        return {"text": text}
+    return text
+
+
+def iter_corpus(seed: int = 1234) -> Iterator[Tuple[str, str, int, object]]:
+    """Yield (format, language, minutes, raw_transcript) for every corpus case"""
+    rng = random.Random(seed)
+    for language in LANGUAGES:
+        for minutes in DURATIONS_MINUTES:
+            turns = generate_turns(language, minutes, rng)
+            for fmt in FORMATS:
+                yield fmt, language, minutes, shape_transcript(turns, fmt)
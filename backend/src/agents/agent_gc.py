@@ -0,0 +1,170 @@
+"""Garbage collection for the per-call agents created by make_call.
+
+Every ad-hoc call creates an ElevenLabs agent that is never used again. The
+collector remembers which agents we created and, once their call is terminal
+and its conversation has been processed, deletes them upstream in small,
+rate-limited batches. Template agents are never tracked here.
+
+The tracked set is persisted so agents outstanding at a restart are still
+collected: their calls are no longer known, so they are deleted once they
+are older than orphan_after. Agents whose delete keeps failing are retried
+with backoff and dropped after max_failures attempts, so they never block
+the rest of the batch.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_GC_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "database", "ephemeral_agents.json")
+
+
+class AgentCollector:
+    """Tracks ephemeral agents and deletes them once their call is done"""
+
+    def __init__(
+        self,
+        delete_fn: Callable[[str], Dict],
+        is_collectible: Callable[[str], bool],
+        batch_size: int = 20,
+        delete_interval: float = 0.5,
+        sweep_interval: float = 300.0,
+        dry_run: bool = False,
+        path: Optional[str] = None,
+        orphan_after: float = 2 * 3600,
+        max_failures: int = 8,
+    ):
+        self.delete_fn = delete_fn
+        self.is_collectible = is_collectible
+        self.batch_size = batch_size
+        self.delete_interval = delete_interval
+        self.sweep_interval = sweep_interval
+        self.dry_run = dry_run
+        self.path = path
+        self.orphan_after = orphan_after
+        self.max_failures = max_failures
+        # agent_id -> {"batch_call_id", "created_at", "failures", "retry_at", "restored"}
+        self._agents: Dict[str, Dict] = self._load()
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.totals = {"deleted": 0, "failed": 0, "abandoned": 0, "sweeps": 0}
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path:
+            return {}
+        try:
+            with open(self.path) as f:
+                agents = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        for info in agents.values():
+            info["restored"] = True  # Its call died with the previous process
+        if agents:
+            print(f"🧹 Agent GC: {len(agents)} agent(s) carried over from the last run")
+        return agents
+
+    def _save(self) -> None:
+        # Caller holds self._lock
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._agents, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def track(self, agent_id: str, batch_call_id: str) -> None:
+        with self._lock:
+            self._agents[agent_id] = {"batch_call_id": batch_call_id, "created_at": time.time(), "failures": 0}
+            self._save()
+
+    def pending(self) -> List[str]:
+        with self._lock:
+            return list(self._agents)
+
+    def sweep(self, dry_run: Optional[bool] = None) -> Dict:
+        """Delete up to batch_size collectible agents; returns what was (or would be) deleted"""
+        dry_run = self.dry_run if dry_run is None else dry_run
+        now = time.time()
+        with self._lock:
+            candidates = [
+                agent_id for agent_id, info in self._agents.items()
+                if info.get("retry_at", 0) <= now and self._collectible(info, now)
+            ][:self.batch_size]
+
+        result = {"dry_run": dry_run, "candidates": candidates, "deleted": [], "failed": []}
+        if dry_run or not candidates:
+            return result
+
+        # Only one sweep deletes at a time, so the rate limit holds across threads
+        with self._sweep_lock:
+            for i, agent_id in enumerate(candidates):
+                if i:
+                    time.sleep(self.delete_interval)
+                outcome = self.delete_fn(agent_id)
+                with self._lock:
+                    if outcome.get("success"):
+                        self._agents.pop(agent_id, None)
+                        result["deleted"].append(agent_id)
+                    else:
+                        info = self._agents.get(agent_id)
+                        if info is not None:
+                            self._record_failure(agent_id, info)
+                        result["failed"].append({"agent_id": agent_id, "error": outcome.get("error")})
+
+            with self._lock:
+                self._save()
+            self.totals["deleted"] += len(result["deleted"])
+            self.totals["failed"] += len(result["failed"])
+            self.totals["sweeps"] += 1
+
+        if result["deleted"] or result["failed"]:
+            print(f"🧹 Agent GC: deleted {len(result['deleted'])}, failed {len(result['failed'])}")
+        return result
+
+    def _collectible(self, info: Dict, now: float) -> bool:
+        if info.get("restored"):
+            return now - info["created_at"] >= self.orphan_after
+        return self.is_collectible(info["batch_call_id"])
+
+    def _record_failure(self, agent_id: str, info: Dict) -> None:
+        # Caller holds self._lock; back off exponentially from one sweep interval
+        info["failures"] += 1
+        if info["failures"] >= self.max_failures:
+            print(f"⚠️  Agent GC: giving up on {agent_id} after {info['failures']} failed deletes")
+            self._agents.pop(agent_id, None)
+            self.totals["abandoned"] += 1
+            return
+        info["retry_at"] = time.time() + self.sweep_interval * 2 ** (info["failures"] - 1)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"❌ Agent GC sweep failed: {e}")
+
+    def ensure_started(self) -> None:
+        """Start the background sweeper thread once"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="agent-gc", daemon=True)
+                    self._thread.start()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "tracked": len(self._agents),
+                "backing_off": sum(1 for info in self._agents.values() if info.get("failures")),
+                "dry_run": self.dry_run,
+                "batch_size": self.batch_size,
+                "sweep_interval": self.sweep_interval,
+                "running": self._thread is not None,
+                **self.totals,
+            }
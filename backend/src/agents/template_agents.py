@@ -0,0 +1,109 @@
+"""Long-lived ElevenLabs agents, one per template configuration.
+
+Instead of creating an agent for every call, template calls reuse a single
+agent whose prompt references dynamic variables ({{patient_name}},
+{{call_purpose}}, {{medication}}); the per-call values travel with the batch
+submission. Agent ids are persisted so restarts do not create new agents.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+DEFAULT_REGISTRY_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "database", "template_agents.json")
+
+# Dynamic variables every template agent prompt may reference
+DYNAMIC_VARIABLES = ("patient_name", "call_purpose", "medication")
+
+
+class TemplateAgentRegistry:
+    """Maps a template configuration key to the agent created for it"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._agents: Dict[str, Dict] = self._load()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._agents, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def make_key(template_id: str, language: str, voice_id: str, fingerprint: str) -> str:
+        return f"{template_id}:{language}:{voice_id}:{fingerprint}"
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._agents.get(key)
+        return entry["agent_id"] if entry else None
+
+    def agent_ids(self) -> set:
+        return {entry["agent_id"] for entry in self._agents.values()}
+
+    def get_or_create(self, key: str, template_id: str, create_fn: Callable[[], Dict]) -> Dict:
+        """Return the agent for key, calling create_fn at most once per key
+
+        create_fn returns the ElevenLabsClient.create_agent result dict.
+        """
+        agent_id = self.get(key)
+        if agent_id:
+            return {"success": True, "agent_id": agent_id, "created": False}
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Concurrent first calls for the same template wait here instead of
+        # each creating their own agent
+        with key_lock:
+            agent_id = self.get(key)
+            if agent_id:
+                return {"success": True, "agent_id": agent_id, "created": False}
+
+            result = create_fn()
+            if not result.get("success"):
+                return result
+
+            with self._lock:
+                self._agents[key] = {"agent_id": result["agent_id"], "template_id": template_id}
+                self._save()
+            print(f"✅ Template agent created for {template_id}: {result['agent_id']}")
+            return {"success": True, "agent_id": result["agent_id"], "created": True}
+
+
+def dynamic_variables(patient_name: Optional[str], call_purpose: Optional[str],
+                      medication: Optional[str]) -> Dict[str, str]:
+    """Per-call values for a template agent; every referenced variable must be present"""
+    return {
+        "patient_name": patient_name or "the patient",
+        "call_purpose": call_purpose or "a follow-up",
+        "medication": medication or "your medication",
+    }
+
+
+def build_client_data(variables: Dict[str, str], first_message: Optional[str] = None) -> Dict:
+    """Build a recipient's conversation_initiation_client_data for batch submission
+
+    Template agents are created per language, so the language is never overridden here.
+    """
+    data = {"dynamic_variables": variables}
+    if first_message:
+        data["conversation_config_override"] = {"agent": {"first_message": first_message}}
+    return data
+
+
+def config_fingerprint(parts: Tuple[str, ...]) -> str:
+    """Short hash of the rendered agent config, so template edits get a fresh agent"""
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:16]
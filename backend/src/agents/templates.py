@@ -0,0 +1,80 @@
+"""Built-in agent templates (protocols) shared by the API and offline tools.
+
+api/index.py serves these (and may replace them at runtime); scripts such as
+the TTS cache warmer read them from here without building the web app.
+"""
+
+# Enhanced agent templates with better conversation flow
+DEFAULT_AGENT_TEMPLATES = {
+    "standard_protocol": {
+        "name": "Standard Basic Protocol",
+        "purpose": "General follow-up",
+        "medication": "Lisinopril",
+        "questions": [
+            "I've noticed that you have been improving lately, thats awesome!. On a scale from 1 to 10, how are you feeling?",
+            "Are you keeping up with Lisinopril as instructed?",
+            "In the past week, how often have you had symptoms like headaches, dizziness, or swelling?",
+            "Have you noticed any new or different symptoms since we last spoke?",
+            "Is there anything else you'd like Dr. Vinals to know about how you've been feeling?"
+        ],
+        "answer_schema": [
+            {"type": "rating", "min": 1, "max": 10},
+            {"type": "yes_no_partial"},
+            {"type": "frequency"},
+            {"type": "symptoms"},
+            {"type": "free_text"}
+        ],
+        "voice_id": "21m00Tcm4TlvDq8ikWAM",
+        "language": "en",
+        "first_message": "Hi, I'm the AI assistant of Dr. Vinals. I'm calling to follow up on you and to ask if there are any changes in your health since your last visit. I have a few quick questions that will only take a couple of minutes. Is now a good time?",
+        "custom_prompt": "You are a professional AI assistant calling on behalf of Dr. Vinals. You must ask each question one at a time and wait for complete responses. Be polite, professional, and empathetic. If a patient needs clarification, rephrase the question. Keep the conversation focused on getting answers to all the questions."
+    },
+    "hypertension_protocol": {
+        "name": "Hypertension Protocol",
+        "purpose": "Hypertension follow-up",
+        "medication": "Lisinopril",
+        "follow_up_days": 7,
+        "questions": [
+            "I've noticed that you have been improving lately, thats awesome!. On a scale from 1 to 10, how are you feeling?",
+            "Are you keeping up with Lisinopril as instructed?",
+            "In the past week, how often have you had symptoms like headaches, dizziness, or swelling?",
+            "Have you noticed any new or different symptoms since we last spoke?",
+            "Is there anything else you'd like Dr. Vinals to know about how you've been feeling?"
+        ],
+        "answer_schema": [
+            {"type": "rating", "min": 1, "max": 10},
+            {"type": "yes_no_partial"},
+            {"type": "frequency"},
+            {"type": "symptoms"},
+            {"type": "free_text"}
+        ],
+        "voice_id": "EXAVITQu4vr4xnSDxMaL",
+        "language": "en",
+        "first_message": "Hi, I'm the AI assistant of Dr. Vinals. I'm calling to follow up on your hypertension treatment and see how you're doing. I have a few questions about your medication and symptoms. Is this a good time to talk?",
+        "custom_prompt": "You are a professional AI assistant calling on behalf of Dr. Vinals for a hypertension follow-up. Ask each question individually and wait for responses. Be understanding about medical concerns and encourage patients to be honest about their symptoms and medication compliance."
+    },
+    "diabetes_protocol": {
+        "name": "Diabetes Protocol", 
+        "purpose": "Diabetes follow-up",
+        "medication": "Losartan",
+        "follow_up_days": 7,
+        "questions": [
+            "I've noticed that you have been improving lately, thats awesome!. On a scale from 1 to 10, how are you feeling?",
+            "Are you keeping up with Losartan as instructed?",
+            "In the past week, how often have you had symptoms like headaches, dizziness, or swelling?",
+            "Have you noticed any new or different symptoms since we last spoke?",
+            "Is there anything else you'd like Dr. Vinals to know about how you've been feeling?"
+        ],
+        "answer_schema": [
+            {"type": "rating", "min": 1, "max": 10},
+            {"type": "yes_no_partial"},
+            {"type": "frequency"},
+            {"type": "symptoms"},
+            {"type": "free_text"}
+        ],
+        "voice_id": "21m00Tcm4TlvDq8ikWAM",
+        "language": "en",
+        "first_message": "Hi, I'm the AI assistant of Dr. Vinals. I'm calling to check on your diabetes management and see how you're feeling. I have some questions about your medication and any symptoms you might be experiencing. Do you have a few minutes to talk?",
+        "custom_prompt": "You are a professional AI assistant calling on behalf of Dr. Vinals for a diabetes follow-up. Focus on medication compliance and symptom monitoring. Ask questions one at a time and be patient with responses. Show empathy for any challenges the patient might be facing."
+    }
+}
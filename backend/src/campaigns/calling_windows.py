@@ -0,0 +1,373 @@
+"""Local calling windows and a scheduler that holds calls until they open.
+
+A number's timezone(s) come from its E.164 country prefix (with a few area
+code overrides). Countries spanning several zones only get calls when every
+zone is inside the window, so a US number is never dialed at 6am Pacific
+because it is 9am Eastern.
+
+Pending calls sit in one heap keyed by release time and a single thread
+releases whatever is due in a batch. Each release happens a little ahead of
+the window and carries the window start as scheduled_time_unix, so
+ElevenLabs places the call exactly when the window opens. A release that
+is turned away with a retry_after (admission or an open circuit) goes back
+on the heap for that long, or until the next window if this one closes
+first, up to max_retries times. Held calls are also stored in SQLite so a
+restart does not drop calls the API already accepted.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+# Longest matching prefix (country code, optionally followed by an area code) wins
+PREFIX_TIMEZONES: Dict[str, Tuple[str, ...]] = {
+    # NANP: contiguous US/Canada; Alaska and Hawaii area codes on their own
+    "1": ("America/New_York", "America/Chicago", "America/Denver", "America/Los_Angeles"),
+    "1907": ("America/Anchorage",),
+    "1808": ("Pacific/Honolulu",),
+    "1787": ("America/Puerto_Rico",),
+    "1939": ("America/Puerto_Rico",),
+    # Spain, with the Canary Islands an hour behind
+    "34": ("Europe/Madrid",),
+    "34822": ("Atlantic/Canary",), "34828": ("Atlantic/Canary",),
+    "34922": ("Atlantic/Canary",), "34928": ("Atlantic/Canary",),
+    "44": ("Europe/London",),
+    "33": ("Europe/Paris",),
+    "49": ("Europe/Berlin",),
+    "39": ("Europe/Rome",),
+    "351": ("Europe/Lisbon",),
+    "52": ("America/Mexico_City",),
+    "54": ("America/Argentina/Buenos_Aires",),
+    "56": ("America/Santiago",),
+    "57": ("America/Bogota",),
+    "58": ("America/Caracas",),
+    "51": ("America/Lima",),
+    "593": ("America/Guayaquil",),
+    "502": ("America/Guatemala",), "503": ("America/El_Salvador",),
+    "504": ("America/Tegucigalpa",), "505": ("America/Managua",),
+    "506": ("America/Costa_Rica",), "507": ("America/Panama",),
+}
+LONGEST_PREFIX = max(len(prefix) for prefix in PREFIX_TIMEZONES)
+
+DEFAULT_SCHEDULED_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "database", "scheduled_calls.db")
+
+
+class CallingWindow:
+    """Allowed local calling hours, e.g. 9:00-20:00 every day"""
+
+    def __init__(self, start_hour: int = 9, end_hour: int = 20, weekdays: Tuple[int, ...] = tuple(range(7))):
+        if not 0 <= start_hour < end_hour <= 24:
+            raise ValueError(f"Invalid calling window {start_hour}-{end_hour}")
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.weekdays = tuple(sorted(set(weekdays)))
+
+    @property
+    def key(self) -> Tuple:
+        return (self.start_hour, self.end_hour, self.weekdays)
+
+
+@lru_cache(maxsize=4096)
+def timezones_for(phone_number: str, default_timezone: str = "UTC") -> Tuple[str, ...]:
+    """Every timezone a number may ring in, from its longest known prefix"""
+    digits = phone_number.lstrip("+")
+    for length in range(min(LONGEST_PREFIX, len(digits)), 0, -1):
+        zones = PREFIX_TIMEZONES.get(digits[:length])
+        if zones:
+            return zones
+    return (default_timezone,)
+
+
+@lru_cache(maxsize=1024)
+def _zone_intervals(zone: str, window_key: Tuple, start_day: date, days: int) -> Tuple[Tuple[float, float], ...]:
+    """Allowed (start, end) unix intervals in one zone for local days start_day..start_day+days"""
+    start_hour, end_hour, weekdays = window_key
+    tz = ZoneInfo(zone)
+    intervals = []
+    for offset in range(days):
+        day = start_day + timedelta(days=offset)
+        if day.weekday() not in weekdays:
+            continue
+        start = datetime(day.year, day.month, day.day, tzinfo=tz) + timedelta(hours=start_hour)
+        end = datetime(day.year, day.month, day.day, tzinfo=tz) + timedelta(hours=end_hour)
+        intervals.append((start.timestamp(), end.timestamp()))
+    return tuple(intervals)
+
+
+def _intersect(a: Tuple[Tuple[float, float], ...], b: Tuple[Tuple[float, float], ...]) -> Tuple[Tuple[float, float], ...]:
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start, end = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return tuple(result)
+
+
+def next_allowed_time(zones: Tuple[str, ...], window: CallingWindow, now: Optional[float] = None) -> Optional[float]:
+    """Earliest unix time >= now when every zone is inside the window (None if never within 8 days)"""
+    now = time.time() if now is None else now
+    # Start a day early so a window that opened "yesterday" in UTC terms is included
+    start_day = datetime.fromtimestamp(now, timezone.utc).date() - timedelta(days=1)
+    intervals = None
+    for zone in zones:
+        zone_intervals = _zone_intervals(zone, window.key, start_day, 9)
+        intervals = zone_intervals if intervals is None else _intersect(intervals, zone_intervals)
+    for start, end in intervals or ():
+        if end > now:
+            return max(start, now)
+    return None
+
+
+class CallScheduler:
+    """Holds calls for numbers outside their calling window and releases them in batches"""
+
+    def __init__(
+        self,
+        dispatch_fn: Callable[[Dict, Optional[int]], Dict],
+        window: CallingWindow,
+        default_timezone: str = "UTC",
+        lead_seconds: float = 300.0,
+        max_batch: int = 50,
+        path: str = DEFAULT_SCHEDULED_PATH,
+        max_retries: int = 10,
+    ):
+        self.dispatch_fn = dispatch_fn
+        self.window = window
+        self.default_timezone = default_timezone
+        self.lead_seconds = lead_seconds
+        self.max_batch = max_batch
+        self.path = path
+        self.max_retries = max_retries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._heap: List[Tuple[float, int, str]] = []
+        self._entries: Dict[str, Dict] = {}
+        self._finished: deque = deque()
+        self.keep_finished = 1000
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.stats_counters = {"scheduled": 0, "released": 0, "cancelled": 0, "failed": 0, "retried": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS scheduled_calls ("
+                "schedule_id TEXT PRIMARY KEY, phone_number TEXT NOT NULL, payload TEXT NOT NULL, "
+                "window_start REAL NOT NULL, release_at REAL NOT NULL, status TEXT NOT NULL, "
+                "retries INTEGER NOT NULL DEFAULT 0, batch_call_id TEXT, error TEXT)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _save(self, entry: Dict, release_at: float) -> None:
+        # Caller holds self._condition
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scheduled_calls "
+                "(schedule_id, phone_number, payload, window_start, release_at, status, retries, batch_call_id, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (entry["schedule_id"], entry["phone_number"], json.dumps(entry["payload"]), entry["window_start"],
+                 release_at, entry["status"], entry["retries"], entry.get("batch_call_id"), entry.get("error")),
+            )
+
+    def _set_status(self, entry: Dict) -> None:
+        # Caller holds self._condition
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "UPDATE scheduled_calls SET status = ?, batch_call_id = ?, error = ? WHERE schedule_id = ?",
+                (entry["status"], entry.get("batch_call_id"), entry.get("error"), entry["schedule_id"]),
+            )
+
+    def next_window(self, phone_number: str, now: Optional[float] = None) -> Optional[float]:
+        return next_allowed_time(timezones_for(phone_number, self.default_timezone), self.window, now)
+
+    def schedule(self, phone_number: str, payload: Dict, window_start: float) -> Dict:
+        """Queue a call to be dispatched when its window opens"""
+        self.ensure_started()
+        entry = {
+            "schedule_id": f"sch_{uuid.uuid4().hex[:12]}",
+            "phone_number": phone_number,
+            "scheduled_for": datetime.fromtimestamp(window_start, timezone.utc).isoformat(),
+            "window_start": window_start,
+            "status": "scheduled",
+            "retries": 0,
+            "payload": payload,
+        }
+        release_at = window_start - self.lead_seconds
+        with self._condition:
+            self._save(entry, release_at)
+            self._entries[entry["schedule_id"]] = entry
+            heapq.heappush(self._heap, (release_at, next(self._sequence), entry["schedule_id"]))
+            self.stats_counters["scheduled"] += 1
+            self._condition.notify()
+        print(f"🕘 Call to {phone_number} held until {entry['scheduled_for']}")
+        return entry
+
+    def cancel(self, schedule_id: str) -> Optional[Dict]:
+        # Cancelled entries stay in the heap and are skipped when they come up
+        self.ensure_started()
+        with self._condition:
+            entry = self._entries.get(schedule_id)
+            if entry is not None and entry["status"] == "scheduled":
+                entry["status"] = "cancelled"
+                self.stats_counters["cancelled"] += 1
+                self._set_status(entry)
+                self._retire(schedule_id)
+            return entry
+
+    def get(self, schedule_id: str) -> Optional[Dict]:
+        self.ensure_started()
+        with self._condition:
+            entry = self._entries.get(schedule_id)
+            return {key: value for key, value in entry.items() if key != "payload"} if entry else None
+
+    def pending(self) -> List[Dict]:
+        self.ensure_started()
+        with self._condition:
+            return [
+                {key: value for key, value in entry.items() if key != "payload"}
+                for entry in self._entries.values() if entry["status"] == "scheduled"
+            ]
+
+    def stats(self) -> Dict:
+        self.ensure_started()
+        with self._condition:
+            return {
+                **self.stats_counters,
+                "pending": sum(1 for entry in self._entries.values() if entry["status"] == "scheduled"),
+                "next_release": datetime.fromtimestamp(self._heap[0][0], timezone.utc).isoformat() if self._heap else None,
+            }
+
+    def ensure_started(self) -> None:
+        """Reload held calls from disk and start the release thread (once)"""
+        if self._thread is not None:
+            return
+        with self._condition:
+            if self._thread is not None:
+                return
+            rows = self._connection().execute(
+                "SELECT * FROM scheduled_calls WHERE status IN ('scheduled', 'releasing')"
+            ).fetchall()
+            for row in rows:
+                entry = {
+                    "schedule_id": row["schedule_id"],
+                    "phone_number": row["phone_number"],
+                    "scheduled_for": datetime.fromtimestamp(row["window_start"], timezone.utc).isoformat(),
+                    "window_start": row["window_start"],
+                    "status": row["status"],
+                    "retries": row["retries"],
+                    "payload": json.loads(row["payload"]),
+                }
+                self._entries[entry["schedule_id"]] = entry
+                if entry["status"] == "releasing":
+                    # It may have been placed before the restart; dialing again could call twice
+                    entry["status"] = "failed"
+                    entry["error"] = "Interrupted by a restart while being released"
+                    self.stats_counters["failed"] += 1
+                    self._set_status(entry)
+                    self._retire(entry["schedule_id"])
+                    continue
+                heapq.heappush(self._heap, (row["release_at"], next(self._sequence), entry["schedule_id"]))
+            if rows:
+                print(f"🕘 Call scheduler reloaded {len(rows)} held call(s)")
+            self._thread = threading.Thread(target=self._run, name="call-scheduler", daemon=True)
+            self._thread.start()
+
+    def _take_due(self) -> List[Dict]:
+        """Wait until something is due, then pop up to max_batch due entries"""
+        with self._condition:
+            while True:
+                now = time.time()
+                if self._heap and self._heap[0][0] <= now:
+                    break
+                timeout = self._heap[0][0] - now if self._heap else None
+                self._condition.wait(timeout)
+
+            due = []
+            while self._heap and self._heap[0][0] <= now and len(due) < self.max_batch:
+                _, _, schedule_id = heapq.heappop(self._heap)
+                entry = self._entries.get(schedule_id)
+                if entry is not None and entry["status"] == "scheduled":
+                    entry["status"] = "releasing"
+                    self._set_status(entry)
+                    due.append(entry)
+            return due
+
+    def _run(self) -> None:
+        while True:
+            due = self._take_due()
+            if due:
+                print(f"🕘 Releasing {len(due)} scheduled call(s)")
+            for entry in due:
+                window_start = entry["window_start"]
+                scheduled_time_unix = int(window_start) if window_start > time.time() else None
+                try:
+                    result = self.dispatch_fn(entry["payload"], scheduled_time_unix)
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+                with self._condition:
+                    if (not result.get("success") and result.get("retry_after") is not None
+                            and entry["retries"] < self.max_retries):
+                        self._requeue(entry, time.time() + float(result["retry_after"]))
+                        if entry["status"] == "scheduled":
+                            continue
+                        # No window left to retry in: record the failure below
+                    elif result.get("success"):
+                        entry["status"] = "released"
+                        entry["batch_call_id"] = result.get("batch_call_id")
+                        self.stats_counters["released"] += 1
+                    else:
+                        entry["status"] = "failed"
+                        entry["error"] = result.get("error") or result.get("message")
+                        self.stats_counters["failed"] += 1
+                    self._set_status(entry)
+                    self._retire(entry["schedule_id"])
+
+    def _requeue(self, entry: Dict, retry_at: float) -> None:
+        """Hold a turned-away call until retry_at, or the next window if that one has closed by then"""
+        # Caller holds self._condition
+        window_start = self.next_window(entry["phone_number"], retry_at)
+        if window_start is None:
+            entry["status"] = "failed"
+            entry["error"] = "No calling window in the next week"
+            self.stats_counters["failed"] += 1
+            return
+        entry["status"] = "scheduled"
+        entry["retries"] += 1
+        entry["window_start"] = window_start
+        entry["scheduled_for"] = datetime.fromtimestamp(window_start, timezone.utc).isoformat()
+        release_at = max(retry_at, window_start - self.lead_seconds)
+        self._save(entry, release_at)
+        heapq.heappush(self._heap, (release_at, next(self._sequence), entry["schedule_id"]))
+        self.stats_counters["retried"] += 1
+
+    def _retire(self, schedule_id: str) -> None:
+        # Caller holds self._condition; keep the most recent finished entries for lookups
+        self._finished.append(schedule_id)
+        while len(self._finished) > self.keep_finished:
+            expired = self._finished.popleft()
+            self._entries.pop(expired, None)
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM scheduled_calls WHERE schedule_id = ?", (expired,))
@@ -0,0 +1,224 @@
+"""Streaming contact-file ingest for campaigns.
+
+Contact files (CSV in the number-elevenlabs.csv format, or JSONL with one
+contact object per line) are read one row at a time. Each row is validated,
+its phone number normalized to E.164 and checked against a dedupe index that
+keeps an 8-byte digest per number instead of the row itself, so a large
+patient list is never materialized in memory.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from typing import IO, Dict, Iterable, Iterator, Optional, Tuple
+
+# Country calling code -> (min, max) length of the national number that follows.
+# Calling codes are prefix-free, so the first match on 1-3 leading digits wins.
+COUNTRY_CODES: Dict[str, Tuple[int, int]] = {
+    "1": (10, 10),   # NANP (US, Canada, Caribbean)
+    "7": (10, 10),   # Russia, Kazakhstan
+    "20": (9, 10), "27": (9, 9), "30": (10, 10), "31": (9, 9), "32": (8, 9),
+    "33": (9, 9), "34": (9, 9), "36": (8, 9), "39": (6, 11), "40": (9, 9),
+    "41": (9, 9), "43": (4, 13), "44": (9, 10), "45": (8, 8), "46": (7, 13),
+    "47": (8, 8), "48": (9, 9), "49": (6, 13), "51": (8, 9), "52": (10, 10),
+    "53": (6, 8), "54": (10, 11), "55": (10, 11), "56": (9, 9), "57": (8, 10),
+    "58": (10, 10), "60": (7, 10), "61": (9, 9), "62": (8, 12), "63": (8, 10),
+    "64": (8, 10), "65": (8, 8), "66": (8, 9), "81": (9, 10), "82": (8, 10),
+    "84": (9, 10), "86": (10, 11), "90": (10, 10), "91": (10, 10), "92": (9, 10),
+    "351": (9, 9), "353": (7, 9), "358": (5, 12), "502": (8, 8), "503": (8, 8),
+    "504": (8, 8), "505": (8, 8), "506": (8, 8), "507": (7, 8), "591": (8, 8),
+    "593": (8, 9), "595": (9, 9), "598": (8, 8), "966": (9, 9), "971": (8, 9),
+    "972": (8, 9),
+}
+
+# E.164 allows at most 15 digits; anything under 8 is not a dialable number
+E164_MIN_DIGITS = 8
+E164_MAX_DIGITS = 15
+
+PHONE_FIELDS = ("phone_number", "phone", "phoneNumber")
+SEPARATORS = re.compile(r"[\s().\-/]")
+
+
+@lru_cache(maxsize=1024)
+def country_code_for(prefix: str) -> Optional[str]:
+    """Calling code at the start of up to three leading digits, or None if unknown"""
+    for length in (1, 2, 3):
+        if prefix[:length] in COUNTRY_CODES:
+            return prefix[:length]
+    return None
+
+
+def normalize_e164(raw: Optional[str], default_country_code: Optional[str] = None) -> Optional[str]:
+    """Normalize a phone number to +<country><number>, or None if it is not valid
+
+    Numbers written with +, 00 or 011 are international. Bare digits are taken
+    as national numbers of default_country_code when their length fits that
+    country, otherwise as already carrying a country code (the format of
+    number-elevenlabs.csv).
+    """
+    if not raw:
+        return None
+    number = SEPARATORS.sub("", str(raw))
+    if number.startswith("+"):
+        digits = number[1:]
+    elif number.startswith("00"):
+        digits = number[2:]
+    elif number.startswith("011"):
+        digits = number[3:]
+    else:
+        digits = number
+        if default_country_code:
+            national = digits[1:] if digits.startswith("0") else digits  # drop trunk prefix
+            low, high = COUNTRY_CODES.get(default_country_code, (0, 0))
+            if low <= len(national) <= high:
+                digits = default_country_code + national
+    if not digits.isdigit() or not E164_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS:
+        return None
+
+    code = country_code_for(digits[:3])
+    if code is not None:
+        low, high = COUNTRY_CODES[code]
+        if not low <= len(digits) - len(code) <= high:
+            return None
+    return f"+{digits}"
+
+
+class DedupeIndex:
+    """Set of 8-byte number digests; far smaller than keeping the rows themselves"""
+
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, key: str) -> bool:
+        """Record a key; returns False if it was already present"""
+        digest = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+        if digest in self._seen:
+            return False
+        self._seen.add(digest)
+        return True
+
+    def __len__(self):
+        return len(self._seen)
+
+
+class ContactIngest:
+    """Iterate normalized, deduplicated contacts from a CSV or JSONL file
+
+    Iterating opens the file and yields one contact at a time; rows that fail
+    validation or repeat an earlier number are counted and skipped. Contacts
+    that are already in memory (a JSON request body) go through the same
+    checks with ContactIngest.from_rows. close() releases the file (and
+    deletes it when cleanup is set) without reading it to the end.
+    """
+
+    def __init__(self, path: Optional[str], fmt: Optional[str] = None, default_country_code: Optional[str] = None,
+                 cleanup: bool = False, rows: Optional[Iterable[Dict]] = None):
+        self.path = path
+        self.rows = rows
+        self.format = fmt or (detect_format(path) if path else "rows")
+        self.default_country_code = default_country_code
+        self.cleanup = cleanup
+        self.dedupe = DedupeIndex()
+        self.counters = {"rows": 0, "accepted": 0, "invalid": 0, "duplicates": 0}
+        self.errors: deque = deque(maxlen=50)
+        self._iterator: Optional[Iterator[Dict]] = None
+        self._closed = False
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict], default_country_code: Optional[str] = None) -> "ContactIngest":
+        return cls(None, default_country_code=default_country_code, rows=rows)
+
+    def __iter__(self) -> Iterator[Dict]:
+        self._iterator = self._iterate()
+        return self._iterator
+
+    def close(self) -> None:
+        """Stop reading: close the open file and remove it if it was spooled for us"""
+        self._closed = True
+        if self._iterator is not None:
+            try:
+                self._iterator.close()
+            except ValueError:
+                pass  # Being read on another thread; it stops at the next row
+        elif self.cleanup and self.path:
+            self._remove_file()
+
+    def _remove_file(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _iterate(self) -> Iterator[Dict]:
+        if self.rows is not None:
+            for index, row in enumerate(self.rows, 1):
+                contact = self._validate(index, row if isinstance(row, dict) else None)
+                if contact is not None:
+                    yield contact
+            return
+
+        try:
+            with open(self.path, newline="", encoding="utf-8-sig") as f:
+                for line_number, row in self._rows(f):
+                    if self._closed:
+                        return
+                    contact = self._validate(line_number, row)
+                    if contact is not None:
+                        yield contact
+        finally:
+            if self.cleanup:
+                self._remove_file()
+            print(f"📇 Contact ingest finished for {os.path.basename(self.path)}: {self.counters}")
+
+    def _rows(self, f: IO[str]) -> Iterator[Tuple[int, Optional[Dict]]]:
+        if self.format == "jsonl":
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield line_number, row if isinstance(row, dict) else None
+        else:
+            # Line 1 is the header
+            for line_number, row in enumerate(csv.DictReader(f), 2):
+                yield line_number, {key.strip(): (value or "").strip() for key, value in row.items() if key}
+
+    def _validate(self, line_number: int, row: Optional[Dict]) -> Optional[Dict]:
+        self.counters["rows"] += 1
+        if row is None:
+            return self._reject(line_number, "Malformed row")
+
+        raw_phone = next((row[field] for field in PHONE_FIELDS if row.get(field)), None)
+        phone_number = normalize_e164(raw_phone, self.default_country_code)
+        if phone_number is None:
+            return self._reject(line_number, f"Invalid phone number: {raw_phone!r}")
+        if not self.dedupe.add(phone_number):
+            self.counters["duplicates"] += 1
+            return None
+
+        self.counters["accepted"] += 1
+        return {
+            "name": str(row.get("name") or "").strip(),
+            "phone_number": phone_number,
+            "language": str(row.get("language") or "").strip().lower(),
+            "template_id": row.get("template_id") or None,
+        }
+
+    def _reject(self, line_number: int, error: str) -> None:
+        self.counters["invalid"] += 1
+        self.errors.append({"line": line_number, "error": error})
+        return None
+
+    def stats(self) -> Dict:
+        return {**self.counters, "recent_errors": list(self.errors)[-10:]}
+
+
+def detect_format(filename: str) -> str:
+    """'jsonl' for .jsonl/.ndjson files, 'csv' otherwise"""
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
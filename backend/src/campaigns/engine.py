@@ -0,0 +1,310 @@
+"""Campaign dialing: work through a contact list with capped concurrency.
+
+A campaign pulls contacts lazily from an iterable, picks a template per
+contact language and dials through the injected dial function. One engine
+thread dispatches new calls while there are free slots and polls live calls
+until they reach a terminal status. Slots are capped both globally (across
+all campaigns) and per campaign, and a slot stays taken for the whole life of
+the call, not just the submit request. Contacts the dialer turns away with a
+retry_after (backpressure, upstream outage, or outside the contact's calling
+window) stay with the campaign and are dialed again later under the same
+caps, instead of being counted as failed or handed off elsewhere.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class Campaign:
+    """State and progress counters for one contact-list campaign"""
+
+    def __init__(self, name: str, contacts: Iterable[Dict], templates: Dict[str, str],
+                 default_template: Optional[str], max_concurrent: int, total: Optional[int] = None):
+        self.id = f"cmp_{uuid.uuid4().hex[:12]}"
+        self.name = name
+        self.templates = templates
+        self.default_template = default_template
+        self.max_concurrent = max_concurrent
+        self.status = "running"
+        self.created_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self.source = contacts
+        self._contacts: Iterator[Dict] = iter(contacts)
+        self.exhausted = False
+        self.deferred: List[Tuple[float, int, Dict]] = []  # heap of (not_before, seq, contact)
+        self._defer_seq = itertools.count()
+        self.live: Dict[str, Dict] = {}  # batch_call_id -> contact
+        self.dialing = 0
+        self.counters = {
+            "total": total,
+            "dialed": 0,
+            "completed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "suppressed": 0,
+            "scheduled": 0,
+            "deferred": 0,
+        }
+        self.errors: deque = deque(maxlen=50)
+
+    def template_for(self, contact: Dict) -> Optional[str]:
+        """Row template wins, then the campaign's template for the row language, then the default"""
+        return (
+            contact.get("template_id")
+            or self.templates.get((contact.get("language") or "").lower())
+            or self.default_template
+        )
+
+    def has_ready_contact(self) -> bool:
+        return not self.exhausted or bool(self.deferred and self.deferred[0][0] <= time.time())
+
+    def defer(self, contact: Dict, delay: float, counter: str = "deferred") -> None:
+        """Dial the contact again after delay seconds; caller holds the engine lock"""
+        heapq.heappush(self.deferred, (time.time() + delay, next(self._defer_seq), contact))
+        self.counters[counter] += 1
+
+    def ready_deferred(self) -> Optional[Dict]:
+        """A deferred contact whose time has come, if any; caller holds the engine lock"""
+        if self.deferred and self.deferred[0][0] <= time.time():
+            return heapq.heappop(self.deferred)[2]
+        return None
+
+    def next_contact(self) -> Optional[Dict]:
+        """Next contact from the list; may read the contact file, so only the engine thread calls it"""
+        if self.exhausted:
+            return None
+        contact = next(self._contacts, None)
+        if contact is None:
+            self.exhausted = True
+        return contact
+
+    def count_total(self) -> None:
+        """Fix the total once the list has been read to the end; caller holds the engine lock"""
+        if self.exhausted and self.counters["total"] is None:
+            # Contacts still being dialed or waiting to retry have not been counted yet
+            self.counters["total"] = (
+                sum(self.counters[key] for key in ("dialed", "skipped", "suppressed"))
+                + self.dialing + len(self.deferred)
+            )
+
+    def close_source(self) -> None:
+        """Release the contact source (e.g. a spooled upload) once no more contacts will be read"""
+        close = getattr(self.source, "close", None)
+        if close is not None:
+            close()
+
+    @property
+    def in_flight(self) -> int:
+        return self.dialing + len(self.live)
+
+    def progress(self) -> Dict:
+        return {
+            "campaign_id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "max_concurrent": self.max_concurrent,
+            "dialing": self.dialing,
+            "live": len(self.live),
+            "waiting_to_retry": len(self.deferred),
+            **self.counters,
+            "recent_errors": list(self.errors)[-10:],
+            # Streamed contact files report their own validation and dedupe counts
+            "ingest": self.source.stats() if hasattr(self.source, "stats") else None,
+        }
+
+
+class CampaignEngine:
+    """Dispatches campaign calls under a global and a per-campaign concurrency cap"""
+
+    def __init__(
+        self,
+        dial_fn: Callable[[Dict, str], Dict],
+        status_fn: Callable[[List[str]], Dict[str, Optional[str]]],
+        emit_fn: Callable[[str, Dict, str], None],
+        max_concurrent_calls: int = 5,
+        poll_interval: float = 5.0,
+        is_suppressed: Optional[Callable[[str], bool]] = None,
+    ):
+        self.dial_fn = dial_fn
+        self.status_fn = status_fn
+        self.is_suppressed = is_suppressed
+        self.emit_fn = emit_fn
+        self.max_concurrent_calls = max_concurrent_calls
+        self.poll_interval = poll_interval
+        self.campaigns: Dict[str, Campaign] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._dialer = ThreadPoolExecutor(max_workers=max_concurrent_calls, thread_name_prefix="campaign-dial")
+        self._thread: Optional[threading.Thread] = None
+        self._round_robin = itertools.count()
+
+    # Public API
+
+    def create_campaign(self, name: str, contacts: Iterable[Dict], templates: Dict[str, str],
+                        default_template: Optional[str] = None, max_concurrent: int = 2,
+                        total: Optional[int] = None) -> Campaign:
+        campaign = Campaign(name, contacts, templates, default_template, max_concurrent, total)
+        with self._lock:
+            self.campaigns[campaign.id] = campaign
+        print(f"📣 Campaign {campaign.id} created: {name}")
+        self._ensure_started()
+        self._wake.set()
+        return campaign
+
+    def set_status(self, campaign_id: str, status: str) -> Optional[Campaign]:
+        """Pause, resume or cancel a campaign; live calls are left to finish"""
+        with self._lock:
+            campaign = self.campaigns.get(campaign_id)
+            if campaign is None or campaign.status in ("completed", "cancelled"):
+                return campaign
+            campaign.status = status
+            if status == "running":
+                # Its last call may have finished while it was paused
+                self._maybe_finish(campaign)
+        if status == "cancelled":
+            campaign.close_source()
+        self._emit_progress(campaign)
+        self._wake.set()
+        return campaign
+
+    def global_in_flight(self) -> int:
+        with self._lock:
+            return sum(c.in_flight for c in self.campaigns.values())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "max_concurrent_calls": self.max_concurrent_calls,
+                "in_flight": sum(c.in_flight for c in self.campaigns.values()),
+                "running_campaigns": sum(1 for c in self.campaigns.values() if c.status == "running"),
+            }
+
+    # Engine loop
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="campaign-engine", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._poll_live_calls()
+                self._dispatch()
+            except Exception as e:
+                print(f"❌ Campaign engine error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _dispatch(self) -> None:
+        """Fill free slots, alternating between running campaigns"""
+        while True:
+            with self._lock:
+                running = [
+                    c for c in self.campaigns.values()
+                    if c.status == "running" and c.has_ready_contact() and c.in_flight < c.max_concurrent
+                ]
+                free_slots = self.max_concurrent_calls - sum(c.in_flight for c in self.campaigns.values())
+                if not running or free_slots <= 0:
+                    return
+                campaign = running[next(self._round_robin) % len(running)]
+                contact = campaign.ready_deferred()
+
+            # Reading the contact file and the suppression lookup happen outside the lock so
+            # they never hold up _dial and _poll_live_calls; this thread is the only dispatcher
+            if contact is None:
+                contact = campaign.next_contact()
+            suppressed = (
+                contact is not None and self.is_suppressed is not None
+                and self.is_suppressed(contact.get("phone_number", ""))
+            )
+
+            with self._lock:
+                if contact is None:
+                    campaign.count_total()
+                    self._maybe_finish(campaign)
+                    continue
+                if suppressed:
+                    campaign.counters["suppressed"] += 1
+                    continue
+                template_id = campaign.template_for(contact)
+                if not template_id:
+                    campaign.counters["skipped"] += 1
+                    campaign.errors.append({"contact": contact.get("phone_number"), "error": "No template for language"})
+                    continue
+                campaign.dialing += 1
+
+            self._dialer.submit(self._dial, campaign, contact, template_id)
+
+    def _dial(self, campaign: Campaign, contact: Dict, template_id: str) -> None:
+        try:
+            result = self.dial_fn(contact, template_id)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+
+        with self._lock:
+            campaign.dialing -= 1
+            if result.get("retry_after") is not None:
+                # Turned away for now: outside the contact's calling window (held until it
+                # opens), or backpressure / an upstream outage. Dial the contact again later.
+                campaign.defer(
+                    contact, float(result["retry_after"]), "scheduled" if result.get("outside_window") else "deferred"
+                )
+            else:
+                campaign.counters["dialed"] += 1
+                if result.get("success") and result.get("batch_call_id"):
+                    campaign.live[result["batch_call_id"]] = contact
+                else:
+                    campaign.counters["failed"] += 1
+                    campaign.errors.append({
+                        "contact": contact.get("phone_number"),
+                        "error": result.get("error") or result.get("message")
+                    })
+            self._maybe_finish(campaign)
+        self._emit_progress(campaign)
+        self._wake.set()
+
+    def _poll_live_calls(self) -> None:
+        with self._lock:
+            live = [(c, batch_call_id) for c in self.campaigns.values() for batch_call_id in c.live]
+
+        if not live:
+            return
+        # One bulk lookup for every live call across all campaigns
+        statuses = self.status_fn([batch_call_id for _, batch_call_id in live])
+        for campaign, batch_call_id in live:
+            status = statuses.get(batch_call_id)
+            if status not in TERMINAL_STATUSES:
+                continue
+            with self._lock:
+                campaign.live.pop(batch_call_id, None)
+                campaign.counters["completed" if status == "completed" else "failed"] += 1
+                self._maybe_finish(campaign)
+            self._emit_progress(campaign)
+
+    def _maybe_finish(self, campaign: Campaign) -> None:
+        # Caller holds self._lock
+        if campaign.exhausted and not campaign.deferred and campaign.in_flight == 0 and campaign.status == "running":
+            campaign.status = "completed"
+            campaign.finished_at = datetime.now().isoformat()
+            campaign.close_source()  # Already read to the end, so this does no file I/O
+            print(f"🏁 Campaign {campaign.id} completed: {campaign.counters}")
+
+    def _emit_progress(self, campaign: Campaign) -> None:
+        try:
+            self.emit_fn("campaign_progress", campaign.progress(), f"campaign:{campaign.id}")
+        except Exception as e:
+            print(f"Error emitting campaign progress: {e}")
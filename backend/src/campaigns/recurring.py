@@ -0,0 +1,337 @@
+"""Recurring protocol follow-ups (e.g. a weekly hypertension check-in).
+
+Schedules are stored in SQLite, which is the source of truth and survives
+restarts. In memory, only schedule ids sit in a hierarchical timer wheel, so
+adding, cancelling and advancing one tick are O(1) no matter how many
+schedules exist. When ids come due the rows are loaded, grouped by template
+and language and handed to the dispatch function in batches, which submits
+each batch as one multi-recipient batch call. A run that fails (open circuit,
+upstream error, admission reject) is retried with backoff, honouring the
+result's retry_after, until the next regular run is due; only a success or
+an explicit skip moves a schedule on by its full interval.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+DEFAULT_RECURRING_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "database", "recurring.db")
+
+SCHEDULE_COLUMNS = (
+    "id", "patient_name", "phone_number", "template_id", "language", "interval_seconds",
+    "next_run", "active", "run_count", "last_run", "last_batch_call_id", "last_error", "created_at",
+    "retry_of", "failures",
+)
+# Added after the first release; created on older databases when they are opened
+MIGRATED_COLUMNS = (("retry_of", "REAL"), ("failures", "INTEGER NOT NULL DEFAULT 0"))
+
+
+class TimerWheel:
+    """Hierarchical timing wheel of keys (Varghese & Lauck)
+
+    Level 0 has one slot per tick, each higher level one slot per full turn of
+    the level below. Keys live in the coarsest slot that fits their deadline
+    and move down a level when that slot comes round, so every operation
+    touches a constant number of slots.
+    """
+
+    def __init__(self, tick_seconds: float = 60.0, slot_bits: int = 6, levels: int = 4, now: Optional[float] = None):
+        self.tick_seconds = tick_seconds
+        self.slot_bits = slot_bits
+        self.mask = (1 << slot_bits) - 1
+        self.levels = levels
+        self.current_tick = self._tick_for(time.time() if now is None else now)
+        self.wheels: List[List[Set[str]]] = [[set() for _ in range(1 << slot_bits)] for _ in range(levels)]
+        self.positions: Dict[str, Tuple[int, int, int]] = {}  # key -> (level, slot, due tick)
+        self.overflow: Dict[str, int] = {}  # beyond the top level's span
+        self.ready: Set[str] = set()  # due on or before the current tick
+
+    def _tick_for(self, timestamp: float) -> int:
+        return int(timestamp // self.tick_seconds)
+
+    def __len__(self):
+        return len(self.positions) + len(self.overflow) + len(self.ready)
+
+    def add(self, key: str, due_time: float) -> None:
+        self.remove(key)
+        self._place(key, self._tick_for(due_time))
+
+    def _place(self, key: str, due_tick: int) -> None:
+        delta = due_tick - self.current_tick
+        if delta <= 0:
+            self.ready.add(key)
+            return
+        for level in range(self.levels):
+            if delta < 1 << (self.slot_bits * (level + 1)):
+                slot = (due_tick >> (self.slot_bits * level)) & self.mask
+                self.wheels[level][slot].add(key)
+                self.positions[key] = (level, slot, due_tick)
+                return
+        self.overflow[key] = due_tick
+
+    def remove(self, key: str) -> None:
+        position = self.positions.pop(key, None)
+        if position is not None:
+            self.wheels[position[0]][position[1]].discard(key)
+        self.overflow.pop(key, None)
+        self.ready.discard(key)
+
+    def advance(self, now: Optional[float] = None) -> List[str]:
+        """Move the wheel up to now and return every key that came due"""
+        target = self._tick_for(time.time() if now is None else now)
+        due = []
+        while self.current_tick < target:
+            self.current_tick += 1
+            self._cascade()
+            slot = self.wheels[0][self.current_tick & self.mask]
+            for key in slot:
+                self.positions.pop(key, None)
+            due.extend(slot)
+            slot.clear()
+        # Keys added already due, or cascaded down exactly on their tick
+        due.extend(self.ready)
+        self.ready.clear()
+        return due
+
+    def _cascade(self) -> None:
+        for level in range(1, self.levels):
+            if self.current_tick & ((1 << (self.slot_bits * level)) - 1):
+                return
+            slot = self.wheels[level][(self.current_tick >> (self.slot_bits * level)) & self.mask]
+            keys = list(slot)
+            slot.clear()
+            for key in keys:
+                _, _, due_tick = self.positions.pop(key)
+                self._place(key, due_tick)
+            if level == self.levels - 1 and self.overflow:
+                overflow, self.overflow = self.overflow, {}
+                for key, due_tick in overflow.items():
+                    self._place(key, due_tick)
+
+
+class RecurringScheduler:
+    """Durable recurring follow-up schedules, one per patient number and template"""
+
+    def __init__(
+        self,
+        path: str,
+        dispatch_fn: Callable[[str, str, List[Dict]], Dict[str, Dict]],
+        tick_seconds: float = 60.0,
+        batch_size: int = 100,
+        retry_seconds: float = 300.0,
+        max_retry_seconds: float = 6 * 3600.0,
+    ):
+        self.path = path
+        self.dispatch_fn = dispatch_fn
+        self.batch_size = batch_size
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.wheel = TimerWheel(tick_seconds)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {"dispatched": 0, "failed": 0, "skipped": 0, "retried": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS recurring_schedules ("
+                "id TEXT PRIMARY KEY, patient_name TEXT, phone_number TEXT NOT NULL, "
+                "template_id TEXT NOT NULL, language TEXT, interval_seconds INTEGER NOT NULL, "
+                "next_run REAL NOT NULL, active INTEGER NOT NULL DEFAULT 1, run_count INTEGER NOT NULL DEFAULT 0, "
+                "last_run REAL, last_batch_call_id TEXT, last_error TEXT, created_at REAL NOT NULL, "
+                "retry_of REAL, failures INTEGER NOT NULL DEFAULT 0, "
+                "UNIQUE (phone_number, template_id))"
+            )
+            existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(recurring_schedules)")}
+            for column, definition in MIGRATED_COLUMNS:
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE recurring_schedules ADD COLUMN {column} {definition}")
+            self._conn.commit()
+        return self._conn
+
+    # Public API
+
+    def upsert(self, patient_name: Optional[str], phone_number: str, template_id: str, language: Optional[str],
+               interval_seconds: int, start_at: Optional[float] = None) -> Dict:
+        """Create or replace the schedule for this patient number and template"""
+        if interval_seconds < self.wheel.tick_seconds:
+            raise ValueError(f"interval must be at least {int(self.wheel.tick_seconds)} seconds")
+        next_run = start_at if start_at is not None else time.time() + interval_seconds
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT INTO recurring_schedules "
+                    "(id, patient_name, phone_number, template_id, language, interval_seconds, next_run, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (phone_number, template_id) DO UPDATE SET "
+                    "patient_name = excluded.patient_name, language = excluded.language, "
+                    "interval_seconds = excluded.interval_seconds, next_run = excluded.next_run, active = 1, "
+                    "retry_of = NULL, failures = 0",
+                    (f"rec_{uuid.uuid4().hex[:12]}", patient_name, phone_number, template_id, language,
+                     int(interval_seconds), next_run, time.time()),
+                )
+            row = conn.execute(
+                "SELECT * FROM recurring_schedules WHERE phone_number = ? AND template_id = ?",
+                (phone_number, template_id),
+            ).fetchone()
+            self.wheel.add(row["id"], next_run)
+        self.ensure_started()
+        return self._to_dict(row)
+
+    def cancel(self, schedule_id: str) -> Optional[Dict]:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("UPDATE recurring_schedules SET active = 0 WHERE id = ?", (schedule_id,))
+            self.wheel.remove(schedule_id)
+            return self.get(schedule_id)
+
+    def get(self, schedule_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT * FROM recurring_schedules WHERE id = ?", (schedule_id,)
+            ).fetchone()
+            return self._to_dict(row) if row else None
+
+    def list(self, phone_number: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[Dict]:
+        query = "SELECT * FROM recurring_schedules WHERE active = 1"
+        params: Tuple = ()
+        if phone_number:
+            query += " AND phone_number = ?"
+            params = (phone_number,)
+        query += " ORDER BY next_run LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._connection().execute(query, params + (limit, offset)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            active = self._connection().execute(
+                "SELECT COUNT(*) FROM recurring_schedules WHERE active = 1"
+            ).fetchone()[0]
+            return {"active_schedules": active, "in_wheel": len(self.wheel), **self.counters}
+
+    def ensure_started(self) -> None:
+        """Load every active schedule into the wheel and start the tick thread (once)"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            rows = self._connection().execute(
+                "SELECT id, next_run FROM recurring_schedules WHERE active = 1"
+            ).fetchall()
+            for row in rows:
+                self.wheel.add(row["id"], row["next_run"])
+            print(f"🔁 Recurring scheduler loaded {len(rows)} schedule(s)")
+            self._thread = threading.Thread(target=self._run, name="recurring-scheduler", daemon=True)
+            self._thread.start()
+
+    # Tick loop
+
+    def _run(self) -> None:
+        while True:
+            tick = self.wheel.tick_seconds
+            time.sleep(tick - time.time() % tick)
+            try:
+                with self._lock:
+                    due = self.wheel.advance()
+                if due:
+                    self._dispatch(due)
+            except Exception as e:
+                print(f"❌ Recurring scheduler error: {e}")
+
+    def _dispatch(self, schedule_ids: List[str]) -> None:
+        rows = []
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(schedule_ids), 500):
+                chunk = schedule_ids[start:start + 500]
+                rows.extend(conn.execute(
+                    f"SELECT * FROM recurring_schedules WHERE active = 1 AND id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall())
+
+        groups: Dict[Tuple[str, str], List[Dict]] = {}
+        for row in rows:
+            schedule = self._to_dict(row)
+            groups.setdefault((schedule["template_id"], schedule["language"] or ""), []).append(schedule)
+
+        print(f"🔁 {len(rows)} recurring follow-up(s) due in {len(groups)} group(s)")
+        for (template_id, language), schedules in groups.items():
+            for start in range(0, len(schedules), self.batch_size):
+                batch = schedules[start:start + self.batch_size]
+                try:
+                    results = self.dispatch_fn(template_id, language, batch)
+                except Exception as e:
+                    results = {schedule["id"]: {"success": False, "error": str(e)} for schedule in batch}
+                self._record(batch, results)
+
+    def _record(self, batch: Iterable[Dict], results: Dict[str, Dict]) -> None:
+        """Store each run's outcome and put the schedule back in the wheel for its next run"""
+        now = time.time()
+        updates = []
+        for schedule in batch:
+            result = results.get(schedule["id"]) or {"success": False, "error": "No result"}
+            interval = schedule["interval_seconds"]
+            # A retry still belongs to the run it is retrying, so the cadence does not drift
+            run_at = schedule["retry_of_unix"] or schedule["next_run_unix"]
+            # After downtime, skip missed runs instead of calling the patient several times
+            next_run = run_at + interval
+            if next_run <= now:
+                next_run += ((now - next_run) // interval + 1) * interval
+            retry_of, failures = None, 0
+            if result.get("success"):
+                self.counters["dispatched"] += 1
+            elif result.get("skipped"):
+                self.counters["skipped"] += 1
+            else:
+                failures = schedule["failures"] + 1
+                delay = result.get("retry_after")
+                if delay is None:
+                    delay = min(self.retry_seconds * 2 ** (failures - 1), self.max_retry_seconds)
+                if now + delay < next_run:
+                    next_run, retry_of = now + delay, run_at
+                    self.counters["retried"] += 1
+                else:
+                    failures = 0  # Out of time for this run; the next regular one starts afresh
+                    self.counters["failed"] += 1
+            updates.append((
+                next_run, now, 1 if result.get("success") else 0,
+                result.get("batch_call_id"), None if result.get("success") else result.get("error"),
+                retry_of, failures, schedule["id"],
+            ))
+
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "UPDATE recurring_schedules SET next_run = ?, last_run = ?, run_count = run_count + ?, "
+                    "last_batch_call_id = COALESCE(?, last_batch_call_id), last_error = ?, "
+                    "retry_of = ?, failures = ? "
+                    "WHERE id = ? AND active = 1",
+                    updates,
+                )
+            for update in updates:
+                self.wheel.add(update[-1], update[0])
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        schedule = {column: row[column] for column in SCHEDULE_COLUMNS}
+        schedule["active"] = bool(schedule["active"])
+        schedule["next_run_unix"] = schedule["next_run"]
+        schedule["retry_of_unix"] = schedule["retry_of"]
+        for column in ("next_run", "last_run", "created_at", "retry_of"):
+            if schedule[column] is not None:
+                schedule[column] = datetime.fromtimestamp(schedule[column], timezone.utc).isoformat()
+        return schedule
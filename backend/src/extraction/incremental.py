@@ -0,0 +1,205 @@
+"""Incremental answer extraction for calls that are still in progress.
+
+Speech updates are fed in one utterance at a time. Each utterance is run
+through the rule pack exactly once, so answers fill in live and the end of
+the call only has to finalize the state instead of re-scanning the full
+transcript. The state only stands in for the real transcript once the
+call_ended webhook has been seen; until then a missed or out-of-order
+update could leave answers incomplete.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from src.extraction.language_packs import EMAIL_PATTERN, NO_SYMPTOMS, classify_question, get_rule_pack
+from src.extraction.transcript import NOT_ANSWERED, extract_generic_answer
+
+# Speaker roles whose turns are the questions rather than the answers
+AGENT_ROLES = ("agent", "assistant", "ai")
+
+
+class IncrementalExtraction:
+    """Per-call extraction state built up from streamed utterances"""
+
+    def __init__(self, call_id: str, questions: List[str], language: Optional[str] = None,
+                 kinds: Optional[List[Optional[str]]] = None):
+        self.call_id = call_id
+        self.questions = list(questions or [])
+        self.pack = get_rule_pack(language)
+        # Template calls pass their compiled schema kinds; ad-hoc questions are classified
+        self.kinds = list(kinds) if kinds is not None else [
+            classify_question(q, self.pack.language) for q in self.questions
+        ]
+        self.answers: List[Optional[str]] = [None] * len(self.questions)
+        self.answer_ranks: List[Optional[int]] = [None] * len(self.questions)
+        self.generic_answers: List[Optional[str]] = [None] * len(self.questions)
+        self.symptoms_seen = set()
+        self.utterances: List[str] = []
+        self.seen_utterance_ids = set()
+        self.conversation_id: Optional[str] = None
+        self.ended = False  # call_ended seen, so every utterance should have arrived
+        self.finalized = False
+        self._lock = threading.Lock()
+
+    def add_utterance(self, text: str, utterance_id: Optional[str] = None, role: Optional[str] = None) -> Dict:
+        """Process one new utterance and return the answers it changed
+
+        Agent turns are kept for the transcript but not scanned, since they
+        contain the questions rather than the answers.
+        """
+        with self._lock:
+            if self.finalized or not text:
+                return {}
+            if utterance_id is not None:
+                if utterance_id in self.seen_utterance_ids:
+                    return {}
+                self.seen_utterance_ids.add(utterance_id)
+
+            self.utterances.append(text)
+            if role in AGENT_ROLES:
+                return {}
+            text_lower = text.lower()
+            changed = {}
+
+            for i, kind in enumerate(self.kinds):
+                if kind == "symptom":
+                    new_symptoms = set(self.pack.find_symptoms(text_lower)) - self.symptoms_seen
+                    if new_symptoms:
+                        self.symptoms_seen |= new_symptoms
+                        changed[f"question_{i+1}"] = self._symptom_answer()
+                    continue
+
+                if self.answer_ranks[i] == 0:
+                    continue  # Already answered by the highest-priority rule
+
+                matched = self._match(kind, text, text_lower)
+                if matched is not None:
+                    rank, answer = matched
+                    # Earlier rules win over later ones, as in the full-transcript scan
+                    if self.answer_ranks[i] is None or rank < self.answer_ranks[i]:
+                        self.answers[i] = answer
+                        self.answer_ranks[i] = rank
+                        changed[f"question_{i+1}"] = answer
+                elif self.answers[i] is None and self.generic_answers[i] is None:
+                    # Tentative only; a typed answer from a later utterance still wins
+                    self.generic_answers[i] = extract_generic_answer(self.questions[i], text_lower)
+
+            if changed:
+                print(f"📡 Live extraction for {self.call_id}: {changed}")
+            return changed
+
+    def _match(self, kind: Optional[str], text: str, text_lower: str) -> Optional[Tuple[int, str]]:
+        """Return (rule rank, answer) for the highest-priority rule matching this utterance"""
+        if kind == "email":
+            match = EMAIL_PATTERN.search(text)
+            return (0, match.group(1)) if match else None
+        if kind == "medication":
+            for rank, (answer, regex) in enumerate(self.pack.medication_keywords):
+                if regex.search(text_lower):
+                    return rank, answer
+            return None
+
+        patterns = {
+            "name": self.pack.name_patterns,
+            "rating": self.pack.rating_patterns,
+            "frequency": self.pack.frequency_patterns,
+        }.get(kind, ())
+        for rank, pattern in enumerate(patterns):
+            match = pattern.search(text_lower)
+            if match:
+                if kind == "name":
+                    return rank, match.group(1).strip()
+                if kind == "rating":
+                    return rank, f"{match.group(1)}/10"
+                return rank, match.group(1) if match.group(1) else match.group(0)
+        return None
+
+    def _symptom_answer(self) -> str:
+        # Report symptoms in the pack's order, like the full-transcript extraction
+        ordered = [label for label, _ in self.pack.symptom_terms if label in self.symptoms_seen]
+        return ", ".join(ordered) if ordered else NO_SYMPTOMS
+
+    def _answer_for(self, i: int, final: bool) -> str:
+        if self.kinds[i] == "symptom":
+            return self._symptom_answer()
+        if self.answers[i] is not None:
+            return self.answers[i]
+        if final and self.generic_answers[i] is not None:
+            return self.generic_answers[i]
+        return NOT_ANSWERED
+
+    def snapshot(self, final: bool = False) -> Dict:
+        """Return the answers in the same shape as extract_information_from_transcript"""
+        with self._lock:
+            return {
+                f"question_{i+1}": {"question": question, "answer": self._answer_for(i, final)}
+                for i, question in enumerate(self.questions)
+            }
+
+    def mark_ended(self, conversation_id: Optional[str] = None) -> None:
+        self.conversation_id = conversation_id or self.conversation_id
+        self.ended = True
+
+    def finalize(self) -> Dict:
+        """Stop accepting utterances and return the final answers"""
+        extracted_info = self.snapshot(final=True)
+        self.finalized = True
+        return extracted_info
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self.utterances)
+
+
+class LiveExtractionStore:
+    """Registry of in-progress extractions keyed by call id
+
+    States are dropped when their call is processed or fails; anything left
+    behind (calls never processed, webhooks for unknown calls) expires after
+    max_age seconds, and at most max_entries states are kept.
+    """
+
+    def __init__(self, max_age: float = 6 * 3600, max_entries: int = 10_000):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._states: "OrderedDict[str, IncrementalExtraction]" = OrderedDict()
+        self._started_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def start(self, call_id: str, questions: List[str], language: Optional[str] = None,
+              kinds: Optional[List[Optional[str]]] = None) -> IncrementalExtraction:
+        with self._lock:
+            self._evict(time.monotonic())
+            state = self._states.get(call_id)
+            if state is None:
+                state = IncrementalExtraction(call_id, questions, language, kinds)
+                self._states[call_id] = state
+                self._started_at[call_id] = time.monotonic()
+            return state
+
+    def _evict(self, now: float) -> None:
+        # Caller holds self._lock; states are in start order, so the oldest are at the front
+        while self._states:
+            call_id = next(iter(self._states))
+            if now - self._started_at[call_id] < self.max_age and len(self._states) < self.max_entries:
+                break
+            del self._states[call_id]
+            del self._started_at[call_id]
+
+    def get(self, call_id: str) -> Optional[IncrementalExtraction]:
+        return self._states.get(call_id)
+
+    def pop(self, call_id: str) -> Optional[IncrementalExtraction]:
+        with self._lock:
+            self._started_at.pop(call_id, None)
+            return self._states.pop(call_id, None)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+# Shared between the webhook blueprint and the call processing endpoints
+live_extractions = LiveExtractionStore(max_age=float(os.getenv("LIVE_EXTRACTION_TTL_SECONDS", str(6 * 3600))))
@@ -0,0 +1,239 @@
+"""Per-language rule packs used to extract answers from call transcripts.
+
+Each pack bundles the precompiled patterns and keyword sets for one
+language. Packs are built lazily the first time a call in that language is
+processed, so an English-only deployment never compiles the Spanish rules.
+"""
+
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+
+DEFAULT_LANGUAGE = "en"
+
+# Question kinds, checked in this order (mirrors the original if/elif chain)
+QUESTION_KINDS = ("name", "email", "rating", "medication", "symptom", "frequency")
+
+# Canonical answers are reported in English so the dashboard stays uniform
+MEDICATION_YES = "Yes, taking as prescribed"
+MEDICATION_NO = "No, not taking medication"
+MEDICATION_PARTIAL = "Taking inconsistently"
+NO_SYMPTOMS = "No specific symptoms mentioned"
+
+EMAIL_PATTERN = re.compile(r"([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})")
+
+# Question keywords are cheap plain strings, so every language's table is kept
+# loaded: templates are authored in English even when the call is in Spanish.
+QUESTION_KEYWORDS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "en": {
+        "name": ("name",),
+        "email": ("email",),
+        "rating": ("satisfied", "satisfaction", "rating", "scale"),
+        "medication": ("medication", "medicine", "lisinopril", "losartan"),
+        "symptom": ("symptom",),
+        "frequency": ("how often", "frequency"),
+    },
+    "es": {
+        "name": ("nombre", "cómo se llama", "como se llama"),
+        "email": ("correo", "email"),
+        "rating": ("escala", "calific", "puntú", "puntu", "satisf"),
+        "medication": ("medicamento", "medicina", "medicación", "medicacion", "lisinopril", "losartan", "losartán"),
+        "symptom": ("síntoma", "sintoma"),
+        "frequency": ("con qué frecuencia", "con que frecuencia", "cuántas veces", "cuantas veces", "frecuencia"),
+    },
+}
+
+
+def _keyword_regex(keywords) -> Pattern:
+    """Compile a keyword set into a single alternation anchored at word starts"""
+    return re.compile(r"\b(?:" + "|".join(re.escape(k) for k in keywords) + ")")
+
+
+class RulePack:
+    """Compiled extraction rules for a single transcript language"""
+
+    def __init__(
+        self,
+        language: str,
+        name_patterns: List[str],
+        rating_patterns: List[str],
+        medication_keywords: List[Tuple[str, Tuple[str, ...]]],
+        symptom_terms: List[Tuple[str, Tuple[str, ...]]],
+        frequency_patterns: List[str],
+        period_terms: List[Tuple[str, Tuple[str, ...]]],
+    ):
+        self.language = language
+        self.name_patterns = [re.compile(p) for p in name_patterns]
+        self.rating_patterns = [re.compile(p) for p in rating_patterns]
+        self.medication_keywords = [(answer, _keyword_regex(words)) for answer, words in medication_keywords]
+        self.symptom_terms = [(label, _keyword_regex(terms)) for label, terms in symptom_terms]
+        self.frequency_patterns = [re.compile(p) for p in frequency_patterns]
+        self.period_terms = [(period, _keyword_regex(terms)) for period, terms in period_terms]
+
+    def find_name(self, text_lower: str) -> Optional[str]:
+        for pattern in self.name_patterns:
+            match = pattern.search(text_lower)
+            if match:
+                return match.group(1).strip()
+        return None
+
+    def find_rating(self, text_lower: str) -> Optional[str]:
+        for pattern in self.rating_patterns:
+            match = pattern.search(text_lower)
+            if match:
+                return f"{match.group(1)}/10"
+        return None
+
+    def find_medication(self, text_lower: str) -> Optional[str]:
+        for answer, regex in self.medication_keywords:
+            if regex.search(text_lower):
+                return answer
+        return None
+
+    def find_symptoms(self, text_lower: str) -> List[str]:
+        return [label for label, regex in self.symptom_terms if regex.search(text_lower)]
+
+    def find_period(self, text_lower: str) -> Optional[str]:
+        for period, regex in self.period_terms:
+            if regex.search(text_lower):
+                return period
+        return None
+
+    def find_frequency(self, text_lower: str) -> Optional[str]:
+        for pattern in self.frequency_patterns:
+            match = pattern.search(text_lower)
+            if match:
+                return match.group(1) if match.group(1) else match.group(0)
+        return None
+
+
+def _build_english_pack() -> RulePack:
+    return RulePack(
+        language="en",
+        name_patterns=[
+            r"my name is ([^.!?]+)",
+            r"i'm ([^.!?]+)",
+            r"i am ([^.!?]+)",
+            r"call me ([^.!?]+)",
+        ],
+        rating_patterns=[
+            r"(\d+)\s*out of\s*\d+",
+            r"(\d+)\s*/\s*\d+",
+            r"rate.*?(\d+)",
+            r"(\d+)\s*(?:stars?|points?)",
+            r"scale.*?(\d+)",
+            r"feeling.*?(\d+)",
+        ],
+        medication_keywords=[
+            (MEDICATION_YES, ("yes", "taking", "keep up", "continue", "prescribed")),
+            (MEDICATION_NO, ("no", "stopped", "not taking", "quit")),
+            (MEDICATION_PARTIAL, ("sometimes", "occasionally", "forget")),
+        ],
+        symptom_terms=[
+            ("headaches", ("headache",)),
+            ("dizziness", ("dizziness", "dizzy")),
+            ("swelling", ("swelling", "swollen")),
+            ("fatigue", ("fatigue", "tired")),
+            ("nausea", ("nausea",)),
+        ],
+        frequency_patterns=[
+            r"(\d+)\s*times?\s*(?:a|per)\s*(?:day|week|month)",
+            r"(?:every|each)\s*(\w+)",
+            r"(daily|weekly|monthly|rarely|never|always|often|sometimes)",
+        ],
+        period_terms=[
+            ("day", ("day", "daily")),
+            ("week", ("week",)),
+            ("month", ("month",)),
+        ],
+    )
+
+
+def _build_spanish_pack() -> RulePack:
+    return RulePack(
+        language="es",
+        name_patterns=[
+            r"me llamo ([^.!?]+)",
+            r"mi nombre es ([^.!?]+)",
+            r"soy ([^.!?]+)",
+        ],
+        rating_patterns=[
+            r"(\d+)\s*de\s*\d+",
+            r"(\d+)\s*/\s*\d+",
+            r"calific.*?(\d+)",
+            r"(\d+)\s*(?:estrellas?|puntos?)",
+            r"escala.*?(\d+)",
+            r"(?:siento|encuentro|estoy).*?(\d+)",
+        ],
+        medication_keywords=[
+            # Negations come first: "no lo tomo" contains the affirmative "lo tomo"
+            (MEDICATION_NO, ("no lo tomo", "no la tomo", "dejé", "deje de", "ya no", "lo suspend", "la suspend")),
+            (MEDICATION_YES, ("sí", "lo tomo", "la tomo", "tomando", "como me indic", "continúo", "continuo", "sigo")),
+            (MEDICATION_PARTIAL, ("a veces", "de vez en cuando", "se me olvida", "olvido")),
+        ],
+        symptom_terms=[
+            ("headaches", ("dolor de cabeza", "dolores de cabeza", "cefalea", "jaqueca")),
+            ("dizziness", ("mareo", "mareado", "mareada", "vértigo", "vertigo")),
+            ("swelling", ("hinchazón", "hinchazon", "hinchado", "hinchada", "inflamación", "inflamacion")),
+            ("fatigue", ("cansancio", "cansado", "cansada", "fatiga", "agotad")),
+            ("nausea", ("náusea", "nausea", "ganas de vomitar")),
+        ],
+        frequency_patterns=[
+            r"(\d+)\s*veces?\s*(?:al|por|a la|cada)\s*(?:d[ií]a|semana|mes)",
+            r"(?:cada|todos los|todas las)\s*(\w+)",
+            r"(diario|diariamente|semanal|mensual|rara vez|nunca|siempre|a menudo|a veces)",
+        ],
+        period_terms=[
+            ("day", ("día", "dia", "diario")),
+            ("week", ("semana",)),
+            ("month", ("mes",)),
+        ],
+    )
+
+
+# Builders are only invoked the first time their language is requested
+_PACK_BUILDERS: Dict[str, Callable[[], RulePack]] = {
+    "en": _build_english_pack,
+    "es": _build_spanish_pack,
+}
+
+_loaded_packs: Dict[str, RulePack] = {}
+_packs_lock = threading.Lock()
+
+
+def normalize_language(language: Optional[str]) -> str:
+    """Map values like 'es-ES', 'ES' or None to a supported pack code"""
+    if not language:
+        return DEFAULT_LANGUAGE
+    code = str(language).strip().lower().replace("_", "-").split("-")[0]
+    return code if code in _PACK_BUILDERS else DEFAULT_LANGUAGE
+
+
+def get_rule_pack(language: Optional[str] = None) -> RulePack:
+    """Return the rule pack for a call language, compiling it on first use"""
+    code = normalize_language(language)
+    pack = _loaded_packs.get(code)
+    if pack is None:
+        with _packs_lock:
+            pack = _loaded_packs.get(code)
+            if pack is None:
+                pack = _PACK_BUILDERS[code]()
+                _loaded_packs[code] = pack
+                print(f"📚 Loaded extraction rules for language: {code}")
+    return pack
+
+
+def classify_question(question: str, language: Optional[str] = None) -> Optional[str]:
+    """Return the question kind, trying the call language before the default"""
+    question_lower = question.lower()
+    code = normalize_language(language)
+    for table_code in dict.fromkeys((code, DEFAULT_LANGUAGE)):
+        keywords = QUESTION_KEYWORDS[table_code]
+        for kind in QUESTION_KINDS:
+            if any(word in question_lower for word in keywords[kind]):
+                return kind
+    return None
+
+
+def supported_languages() -> List[str]:
+    return sorted(_PACK_BUILDERS)
@@ -0,0 +1,241 @@
+"""Declarative answer schemas for agent templates.
+
+Each template lists an ``answer_schema`` entry per question, e.g.::
+
+    "answer_schema": [
+        {"type": "rating", "min": 1, "max": 10},
+        {"type": "yes_no_partial"},
+        {"type": "frequency"},
+        {"type": "symptoms"},
+        {"type": "free_text"}
+    ]
+
+Schemas are validated and compiled into extractors once at startup. Calls made
+from a template then dispatch straight to the right extractor instead of
+guessing each question's type from keywords, and every answer carries a
+typed ``value`` next to the display string.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.extraction.language_packs import (
+    MEDICATION_NO,
+    MEDICATION_PARTIAL,
+    MEDICATION_YES,
+    NO_SYMPTOMS,
+    RulePack,
+    get_rule_pack,
+)
+from src.extraction.transcript import NOT_ANSWERED, extract_generic_answer
+
+
+class SchemaError(ValueError):
+    """Raised when a template's answer schema is invalid"""
+
+
+class AnswerField(ABC):
+    """Base class for a compiled, typed question extractor"""
+
+    type_name = ""
+    # Rule-pack kind the live (incremental) extractor should use for this field
+    kind: Optional[str] = None
+
+    def __init__(self, spec: Dict):
+        self.spec = spec
+
+    @abstractmethod
+    def extract(self, text: str, text_lower: str, pack: RulePack) -> Tuple[Any, Optional[str]]:
+        """Return (typed value, display answer), or (None, None) when nothing matched"""
+
+    def coerce(self, answer: str) -> Any:
+        """Convert a display answer (e.g. from live extraction) to the typed value"""
+        return None if answer == NOT_ANSWERED else answer
+
+
+class RatingField(AnswerField):
+    type_name = "rating"
+    kind = "rating"
+
+    def __init__(self, spec: Dict):
+        super().__init__(spec)
+        self.min = spec.get("min", 1)
+        self.max = spec.get("max", 10)
+        if not isinstance(self.min, int) or not isinstance(self.max, int) or self.min >= self.max:
+            raise SchemaError(f"rating bounds must be integers with min < max, got {self.min}..{self.max}")
+
+    def _in_range(self, value: int) -> Optional[int]:
+        return value if self.min <= value <= self.max else None
+
+    def extract(self, text, text_lower, pack):
+        for pattern in pack.rating_patterns:
+            for match in pattern.finditer(text_lower):
+                value = self._in_range(int(match.group(1)))
+                if value is not None:
+                    return value, f"{value}/{self.max}"
+        return None, None
+
+    def coerce(self, answer):
+        match = re.match(r"(\d+)", answer or "")
+        return self._in_range(int(match.group(1))) if match else None
+
+
+class YesNoPartialField(AnswerField):
+    type_name = "yes_no_partial"
+    kind = "medication"
+
+    VALUES = {MEDICATION_YES: "yes", MEDICATION_NO: "no", MEDICATION_PARTIAL: "partial"}
+
+    def extract(self, text, text_lower, pack):
+        answer = pack.find_medication(text_lower)
+        return (self.VALUES[answer], answer) if answer else (None, None)
+
+    def coerce(self, answer):
+        return self.VALUES.get(answer)
+
+
+class FrequencyField(AnswerField):
+    type_name = "frequency"
+    kind = "frequency"
+
+    def extract(self, text, text_lower, pack):
+        for pattern in pack.frequency_patterns:
+            match = pattern.search(text_lower)
+            if match:
+                answer = match.group(1) if match.group(1) else match.group(0)
+                return self._value(answer, pack.find_period(match.group(0))), answer
+        return None, None
+
+    @staticmethod
+    def _value(answer: str, period: Optional[str]) -> Dict:
+        if answer.isdigit():
+            return {"count": int(answer), "period": period, "label": None}
+        return {"count": None, "period": period, "label": answer}
+
+    def coerce(self, answer):
+        if answer == NOT_ANSWERED:
+            return None
+        return self._value(answer, None)
+
+
+class SymptomSetField(AnswerField):
+    type_name = "symptoms"
+    kind = "symptom"
+
+    def extract(self, text, text_lower, pack):
+        symptoms = pack.find_symptoms(text_lower)
+        return symptoms, ", ".join(symptoms) if symptoms else NO_SYMPTOMS
+
+    def coerce(self, answer):
+        if answer in (NOT_ANSWERED, NO_SYMPTOMS):
+            return []
+        return [symptom.strip() for symptom in answer.split(",") if symptom.strip()]
+
+
+class FreeTextField(AnswerField):
+    type_name = "free_text"
+
+    def __init__(self, spec: Dict, question: str = ""):
+        super().__init__(spec)
+        self.question = question
+
+    def extract(self, text, text_lower, pack):
+        answer = extract_generic_answer(self.question, text_lower)
+        return answer, answer
+
+
+ANSWER_TYPES = {
+    field.type_name: field
+    for field in (RatingField, YesNoPartialField, FrequencyField, SymptomSetField, FreeTextField)
+}
+
+
+class CompiledSchema:
+    """Ordered typed extractors for one template's questions"""
+
+    def __init__(self, template_id: str, questions: List[str], fields: List[AnswerField]):
+        self.template_id = template_id
+        self.questions = questions
+        self.fields = fields
+        self.kinds = [field.kind for field in fields]
+
+    def extract(self, transcript_text: str, language: Optional[str] = None) -> Dict:
+        """Extract typed answers from a full transcript"""
+        pack = get_rule_pack(language)
+        transcript_lower = transcript_text.lower()
+        extracted_info = {}
+        for i, (question, field) in enumerate(zip(self.questions, self.fields)):
+            value, answer = field.extract(transcript_text, transcript_lower, pack)
+            extracted_info[f"question_{i+1}"] = {
+                "question": question,
+                "answer": answer or NOT_ANSWERED,
+                "type": field.type_name,
+                "value": value,
+            }
+            print(f"📊 Q{i+1} [{field.type_name}]: {question[:50]}... -> A: {answer or NOT_ANSWERED}")
+        return extracted_info
+
+    def annotate(self, extracted_info: Dict) -> Dict:
+        """Add type and typed value to answers produced by the live extractor"""
+        for i, field in enumerate(self.fields):
+            entry = extracted_info.get(f"question_{i+1}")
+            if entry is not None:
+                entry["type"] = field.type_name
+                entry["value"] = field.coerce(entry.get("answer"))
+        return extracted_info
+
+
+def compile_schema(template_id: str, questions: List[str], answer_schema: List[Dict]) -> CompiledSchema:
+    """Validate one template's schema and build its extractors"""
+    if len(answer_schema) != len(questions):
+        raise SchemaError(
+            f"template '{template_id}' has {len(questions)} questions but {len(answer_schema)} answer_schema entries"
+        )
+    fields = []
+    for i, (question, spec) in enumerate(zip(questions, answer_schema), 1):
+        field_cls = ANSWER_TYPES.get(spec.get("type"))
+        if field_cls is None:
+            raise SchemaError(
+                f"template '{template_id}' question {i} has unknown answer type {spec.get('type')!r}; "
+                f"expected one of {sorted(ANSWER_TYPES)}"
+            )
+        try:
+            field = field_cls(spec, question) if field_cls is FreeTextField else field_cls(spec)
+        except SchemaError as e:
+            raise SchemaError(f"template '{template_id}' question {i}: {e}") from e
+        fields.append(field)
+    return CompiledSchema(template_id, list(questions), fields)
+
+
+class TemplateSchemaRegistry:
+    """Compiled schemas indexed by template id and by question list"""
+
+    def __init__(self):
+        self._by_template: Dict[str, CompiledSchema] = {}
+        self._by_questions: Dict[Tuple[str, ...], CompiledSchema] = {}
+
+    def add(self, schema: CompiledSchema) -> None:
+        self._by_template[schema.template_id] = schema
+        self._by_questions.setdefault(tuple(schema.questions), schema)
+
+    def resolve(self, template_id: Optional[str], questions: List[str]) -> Optional[CompiledSchema]:
+        """Find the schema for a call; edited questions fall back to keyword extraction"""
+        schema = self._by_template.get(template_id) if template_id else None
+        if schema is not None and schema.questions == list(questions):
+            return schema
+        return self._by_questions.get(tuple(questions))
+
+    def __len__(self):
+        return len(self._by_template)
+
+
+def compile_template_schemas(templates: Dict[str, Dict]) -> TemplateSchemaRegistry:
+    """Compile every template that declares an answer_schema; raises SchemaError on invalid ones"""
+    registry = TemplateSchemaRegistry()
+    for template_id, template in templates.items():
+        answer_schema = template.get("answer_schema")
+        if answer_schema is None:
+            continue
+        registry.add(compile_schema(template_id, template.get("questions", []), answer_schema))
+    return registry
@@ -0,0 +1,108 @@
+"""Transcript answer extraction for completed calls."""
+
+import re
+from typing import Dict, List, Optional
+
+from src.extraction.language_packs import (
+    EMAIL_PATTERN,
+    NO_SYMPTOMS,
+    RulePack,
+    classify_question,
+    get_rule_pack,
+)
+
+NOT_ANSWERED = "Not answered"
+
+
+def extract_answer(kind: Optional[str], transcript_text: str, transcript_lower: str, pack: RulePack) -> Optional[str]:
+    """Run the rules for a single question kind, returning None when nothing matched"""
+    if kind == "name":
+        return pack.find_name(transcript_lower)
+    if kind == "email":
+        match = EMAIL_PATTERN.search(transcript_text)  # Use original case for email
+        return match.group(1) if match else None
+    if kind == "rating":
+        return pack.find_rating(transcript_lower)
+    if kind == "medication":
+        return pack.find_medication(transcript_lower)
+    if kind == "symptom":
+        symptoms = pack.find_symptoms(transcript_lower)
+        return ", ".join(symptoms) if symptoms else NO_SYMPTOMS
+    if kind == "frequency":
+        return pack.find_frequency(transcript_lower)
+    return None
+
+
+def extract_generic_answer(question: str, transcript_lower: str) -> Optional[str]:
+    """Look for a response after any meaningful word from the question"""
+    for word in question.lower().split():
+        word = word.strip(".,!?")
+        if len(word) > 3:  # Only look for meaningful words
+            match = re.search(rf"{re.escape(word)}.*?([^.!?]+)", transcript_lower)
+            if match:
+                potential_answer = match.group(1).strip()
+                if len(potential_answer) > 5:  # Only use if it's a substantial answer
+                    return potential_answer[:100]  # Limit length
+    return None
+
+
+def normalize_transcript(raw_transcript) -> str:
+    """Flatten a conversation transcript (string, list of turns or dict) into plain text"""
+    if isinstance(raw_transcript, list):
+        # If it's a list, try to extract text from each item
+        transcript_parts = []
+        for item in raw_transcript:
+            if isinstance(item, dict):
+                # If item is a dict, look for common text fields
+                text = item.get('text', item.get('content', item.get('message', str(item))))
+                transcript_parts.append(str(text))
+            else:
+                transcript_parts.append(str(item))
+        return " ".join(transcript_parts)
+    elif isinstance(raw_transcript, dict):
+        # If it's a dict, look for common text fields
+        return raw_transcript.get('text', raw_transcript.get('content', str(raw_transcript)))
+    # If it's already a string or other type
+    return str(raw_transcript) if raw_transcript else "No transcript available"
+
+
+# Extract information from transcript - handles both string and list formats
+def extract_information_from_transcript(transcript, questions: List[str], language: Optional[str] = None) -> Dict:
+    """Extract structured information from conversation transcript using the call language's rules"""
+    extracted_info = {}
+
+    # Handle both string and list transcript formats
+    if isinstance(transcript, list):
+        # If transcript is a list, join all parts into a single string
+        transcript_text = " ".join([str(item) for item in transcript if item])
+    elif isinstance(transcript, str):
+        transcript_text = transcript
+    else:
+        # Fallback for other types
+        transcript_text = str(transcript) if transcript else ""
+
+    # Convert transcript to lowercase for easier matching
+    transcript_lower = transcript_text.lower()
+    pack = get_rule_pack(language)
+
+    print(f"🔍 Processing transcript (length: {len(transcript_text)} chars, language: {pack.language})")
+    print(f"📝 Transcript preview: {transcript_text[:200]}...")
+
+    for i, question in enumerate(questions):
+        question_key = f"question_{i+1}"
+
+        kind = classify_question(question, pack.language)
+        answer = extract_answer(kind, transcript_text, transcript_lower, pack)
+
+        # Generic answer extraction (look for responses after question-like patterns)
+        if answer is None:
+            answer = extract_generic_answer(question, transcript_lower) or NOT_ANSWERED
+
+        extracted_info[question_key] = {
+            "question": question,
+            "answer": answer
+        }
+
+        print(f"📊 Q{i+1}: {question[:50]}... -> A: {answer}")
+
+    return extracted_info
@@ -0,0 +1,41 @@
+"""Background polling of calls that have not finished yet.
+
+ElevenLabs batch calls only report completion when asked, so a watcher
+thread refreshes the status of every unfinished call on an interval. The
+refresh function takes care of whatever should happen on completion, such
+as queuing conversation processing, so results no longer wait for someone
+to have the dashboard open.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class CallWatcher:
+    """Periodically refreshes the status of unfinished calls"""
+
+    def __init__(self, pending_fn: Callable[[], Iterable[str]], refresh_fn: Callable[[List[str]], Dict],
+                 interval: float = 15.0):
+        self.pending_fn = pending_fn
+        self.refresh_fn = refresh_fn
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="call-watcher", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                batch_call_ids = list(self.pending_fn())
+                if batch_call_ids:
+                    self.refresh_fn(batch_call_ids)
+            except Exception as e:
+                print(f"❌ Error refreshing pending calls: {e}")
@@ -0,0 +1,128 @@
+"""Background job pipeline for slow upstream work.
+
+Request handlers enqueue a job and answer 202 straight away. Jobs run on a
+small bounded worker pool and report each stage through the emit callback
+(Socket.IO) and get(); finished jobs are kept for a while for status polls.
+The pending queue is bounded too, so a burst of slow upstream calls is
+refused early instead of piling up without limit. A job that is not ready
+yet raises RetryLater and is re-run after a delay, without holding a worker
+while it waits. Waits raised with counts=False (e.g. for an open upstream
+circuit) do not use up the job's attempts.
+"""
+
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+JOB_TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting"""
+
+
+class RetryLater(Exception):
+    """Raised by a job that should run again after delay seconds"""
+
+    def __init__(self, reason: str, delay: float, counts: bool = True):
+        super().__init__(reason)
+        self.reason = reason
+        self.delay = delay
+        self.counts = counts  # False: this wait does not count towards max_attempts
+
+
+class JobQueue:
+    """Bounded worker pool with per-job status and progress events"""
+
+    def __init__(self, emit_fn: Callable[[str, Dict, str], None], max_workers: int = 4,
+                 max_pending: int = 100, keep_finished: int = 1000):
+        self.emit_fn = emit_fn
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: Dict[str, Dict] = {}
+        self._finished: deque = deque()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[[Callable[[str], None]], Dict], meta: Optional[Dict] = None,
+               max_attempts: int = 1) -> Dict:
+        """Queue fn(progress) and return the job record; fn returns a result dict with "success" """
+        job_id = f"job_{uuid.uuid4().hex[:12]}"
+        now = datetime.now().isoformat()
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "stage": "queued",
+            "meta": meta or {},
+            "result": None,
+            "error": None,
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"{self._pending} jobs already waiting")
+            self._pending += 1
+            self._jobs[job_id] = job
+        self._executor.submit(self._run, job_id, fn)
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job["status"] == "running")
+            return {"pending": self._pending - running, "running": running, "tracked": len(self._jobs)}
+
+    def _update(self, job_id: str, **changes: Any) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(changes, updated_at=datetime.now().isoformat())
+            snapshot = dict(job)
+        try:
+            self.emit_fn("job_update", snapshot, f"job:{job_id}")
+        except Exception as e:
+            print(f"Error emitting job update: {e}")
+
+    def _run(self, job_id: str, fn: Callable[[Callable[[str], None]], Dict]) -> None:
+        with self._lock:
+            attempt = self._jobs[job_id]["attempts"] + 1
+            max_attempts = self._jobs[job_id]["max_attempts"]
+        self._update(job_id, status="running", stage="started", attempts=attempt)
+        try:
+            result = fn(lambda stage: self._update(job_id, stage=stage))
+            if result.get("success"):
+                self._update(job_id, status="succeeded", stage="done", result=result)
+            else:
+                self._update(job_id, status="failed", stage="done", result=result,
+                             error=result.get("error") or result.get("message"))
+        except RetryLater as e:
+            if not e.counts or attempt < max_attempts:
+                self._update(job_id, status="waiting", stage=e.reason,
+                             attempts=attempt if e.counts else attempt - 1)
+                timer = threading.Timer(e.delay, self._executor.submit, (self._run, job_id, fn))
+                timer.daemon = True
+                timer.start()
+                return  # Still pending; the retry finishes the bookkeeping
+            self._update(job_id, status="failed", stage="done", error=f"{e.reason} (gave up after {attempt} attempts)")
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}")
+            self._update(job_id, status="failed", stage="done", error=str(e))
+        self._finish(job_id)
+
+    def _finish(self, job_id: str) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._finished.append(job_id)
+            while len(self._finished) > self.keep_finished:
+                self._jobs.pop(self._finished.popleft(), None)
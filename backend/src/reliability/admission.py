@@ -0,0 +1,115 @@
+"""Admission control for outbound calls.
+
+Two limits protect the upstream during bursts. Only max_concurrent calls
+are set up at a time; up to max_queue more wait (for at most queue_timeout)
+and anything beyond that is turned away at once. Each scope a call belongs
+to (e.g. its outbound phone number) also caps how many calls may be live
+at the same time, counting calls still being set up; a multi-recipient
+batch reserves one call per recipient, and a batch bigger than a limit only
+goes through when nothing else in that scope is live. Rejections carry a
+Retry-After hint so callers back off instead of hammering the upstream.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional
+
+
+class AdmissionRejected(Exception):
+    """The call was not admitted; retry after retry_after seconds"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded queue in front of call setup plus live-call limits per scope"""
+
+    def __init__(self, live_fn: Callable[[str], int], limits: Dict[str, int], max_concurrent: int = 8,
+                 max_queue: int = 32, queue_timeout: float = 10.0, retry_after: float = 5.0):
+        self.live_fn = live_fn
+        self.limits = limits
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._running = 0
+        self._queued = 0
+        self._setting_up: Dict[str, int] = {}  # scope -> calls admitted but not yet live
+        self._cond = threading.Condition()
+        self.counters = {"admitted": 0, "rejected_queue_full": 0, "rejected_timeout": 0, "rejected_limit": 0}
+
+    @contextmanager
+    def admit(self, scopes: Iterable[str], calls: int = 1):
+        """Hold a setup slot for the enclosed block, or raise AdmissionRejected
+
+        calls is how many live calls the block will start (0 for calls scheduled for later).
+        """
+        scopes = [scope for scope in scopes if scope in self.limits]
+        self._acquire(scopes, calls)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running -= 1
+                for scope in scopes:
+                    self._setting_up[scope] -= calls
+                self._cond.notify()
+
+    def _acquire(self, scopes: list, calls: int) -> None:
+        with self._cond:
+            full = self._full_scope(scopes, calls)
+            if full is not None:
+                self.counters["rejected_limit"] += 1
+                raise AdmissionRejected(f"{full} is at its limit of {self.limits[full]} live calls", self.retry_after)
+            if self._running >= self.max_concurrent:
+                if self._queued >= self.max_queue:
+                    self.counters["rejected_queue_full"] += 1
+                    raise AdmissionRejected(f"{self._queued} calls already waiting", self.retry_after)
+                self._queued += 1
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self._running >= self.max_concurrent:
+                        left = deadline - time.monotonic()
+                        if left <= 0:
+                            self.counters["rejected_timeout"] += 1
+                            raise AdmissionRejected("timed out waiting for a call setup slot", self.retry_after)
+                        self._cond.wait(left)
+                finally:
+                    self._queued -= 1
+                # Live calls may have started while this one waited
+                full = self._full_scope(scopes, calls)
+                if full is not None:
+                    self.counters["rejected_limit"] += 1
+                    self._cond.notify()
+                    raise AdmissionRejected(f"{full} is at its limit of {self.limits[full]} live calls", self.retry_after)
+            self._running += 1
+            for scope in scopes:
+                self._setting_up[scope] = self._setting_up.get(scope, 0) + calls
+            self.counters["admitted"] += 1
+
+    def _full_scope(self, scopes: list, calls: int) -> Optional[str]:
+        # Caller holds self._cond
+        for scope in scopes:
+            limit = self.limits[scope]
+            if self.live_fn(scope) + self._setting_up.get(scope, 0) + min(calls, limit) > limit:
+                return scope
+        return None
+
+    def stats(self) -> Dict:
+        with self._cond:
+            scopes = {
+                scope: {"limit": limit, "live": self.live_fn(scope), "setting_up": self._setting_up.get(scope, 0)}
+                for scope, limit in self.limits.items()
+            }
+            return {
+                "running": self._running,
+                "queue_depth": self._queued,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "scopes": scopes,
+                **self.counters,
+            }
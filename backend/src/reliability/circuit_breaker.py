@@ -0,0 +1,128 @@
+"""Per-endpoint circuit breakers for upstream calls.
+
+A closed breaker lets everything through and watches the outcome of the
+most recent calls. When too many of them fail, or are too slow, it opens:
+calls fail at once instead of each waiting out its own timeout. After a
+cool-down one probe call is let through (half-open); if it succeeds the
+breaker closes again, otherwise it stays open for another cool-down.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling an endpoint whose breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"circuit open for {name}; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Error-rate and slow-call-rate breaker over a window of recent calls"""
+
+    def __init__(self, name: str, window: int = 50, min_calls: int = 10, failure_rate: float = 0.5,
+                 slow_call_seconds: float = 3.0, slow_call_rate: float = 0.8, open_seconds: float = 30.0):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._calls: Deque[Tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+        self.counters = {"rejected": 0, "opened": 0}
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; after the cool-down this lets one probe through"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at >= self.open_seconds:
+                # Restart the cool-down so only this call probes until its outcome is known
+                self.state, self._opened_at = HALF_OPEN, now
+                return True
+            self.counters["rejected"] += 1
+            return False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self.state == CLOSED:
+                return 0.0
+            return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def record(self, ok: bool, seconds: float) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if ok:
+                    print(f"✅ Circuit for {self.name} closed again")
+                    self.state = CLOSED
+                    self._calls.clear()
+                else:
+                    self._open()
+                return
+            if self.state == OPEN:
+                return  # A call that started before the breaker opened
+            self._calls.append((not ok, seconds >= self.slow_call_seconds))
+            if len(self._calls) < self.min_calls:
+                return
+            failures = sum(1 for failed, _ in self._calls if failed)
+            slow = sum(1 for _, is_slow in self._calls if is_slow)
+            if failures >= self.failure_rate * len(self._calls) or slow >= self.slow_call_rate * len(self._calls):
+                print(f"⚡ Circuit for {self.name} opened: {failures} failed, {slow} slow of {len(self._calls)} calls")
+                self._open()
+
+    def _open(self) -> None:
+        # Caller holds self._lock
+        self.state, self._opened_at = OPEN, time.monotonic()
+        self.counters["opened"] += 1
+
+    def stats(self) -> Dict:
+        retry_after = self.retry_after()
+        with self._lock:
+            return {
+                "state": self.state,
+                "recent_calls": len(self._calls),
+                "recent_failures": sum(1 for failed, _ in self._calls if failed),
+                "recent_slow": sum(1 for _, is_slow in self._calls if is_slow),
+                "retry_after": round(retry_after, 1),
+                **self.counters,
+            }
+
+
+class CircuitBreakers:
+    """One breaker per endpoint name, created on first use with shared settings"""
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, **self.settings)
+            return breaker
+
+    def open_circuit(self, *names: str) -> Optional[CircuitOpen]:
+        """A CircuitOpen for the first of names still cooling down, else None"""
+        for name in names:
+            retry_after = self.get(name).retry_after()
+            if retry_after > 0:
+                return CircuitOpen(name, retry_after)
+        return None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.stats() for breaker in breakers}
@@ -0,0 +1,69 @@
+"""Request deadlines shared by every upstream call a request makes.
+
+A deadline is set once per request with deadline(seconds) and lives in a
+ContextVar, so it follows the request into asyncio.run() and its tasks.
+Each HTTP call takes the time that is left as its timeout, and calls made
+after the budget is spent fail at once instead of waiting out their own
+timeout, which keeps a stuck upstream from holding workers indefinitely.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+# Absolute time.monotonic() value, or None when the current request has no deadline
+current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget was spent before this call could be made"""
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Give the enclosed work at most seconds; an enclosing, earlier deadline still applies"""
+    expires_at = time.monotonic() + seconds
+    outer = current_deadline.get()
+    token = current_deadline.set(expires_at if outer is None else min(outer, expires_at))
+    try:
+        yield
+    finally:
+        current_deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left on the current deadline (may be negative), or None without one"""
+    expires_at = current_deadline.get()
+    return None if expires_at is None else expires_at - time.monotonic()
+
+
+def deadline_expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def request_timeout(default: float) -> float:
+    """Timeout for the next upstream call: the remaining budget, capped at default"""
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+    return min(default, left)
+
+
+def run_stage(name: str, fn: Callable[[], Dict]) -> Dict:
+    """Run one pipeline stage and log its outcome, duration and the budget left"""
+    started = time.monotonic()
+    result = fn()
+    elapsed_ms = (time.monotonic() - started) * 1000
+    left = remaining()
+    budget = f", {left:.1f}s of budget left" if left is not None else ""
+    if result.get("success"):
+        print(f"⏱️  {name}: ok in {elapsed_ms:.0f}ms{budget}")
+    elif deadline_expired():
+        print(f"⏱️  {name}: deadline exceeded after {elapsed_ms:.0f}ms")
+    else:
+        print(f"⏱️  {name}: failed in {elapsed_ms:.0f}ms{budget}")
+    return result
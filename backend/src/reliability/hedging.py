@@ -0,0 +1,141 @@
+"""Hedged requests for idempotent upstream reads.
+
+If the first attempt has not answered by the endpoint's recent latency
+percentile (p95 by default), a second identical attempt is sent and
+whichever succeeds first is used; the other is cancelled. Hedges are paid
+for from a budget that every request tops up by a fraction of a token, so
+extra upstream load stays around that fraction even when the upstream
+slows down for everyone.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyWindow:
+    """Latencies of the most recent requests to one endpoint"""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class HedgeBudget:
+    """Token bucket: each request earns ratio tokens, each hedge spends one"""
+
+    def __init__(self, ratio: float = 0.1, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+class RequestHedger:
+    """Runs idempotent requests with at most one hedge each"""
+
+    def __init__(self, percentile: float = 0.95, min_delay: float = 0.05, max_delay: float = 2.0,
+                 min_samples: int = 20, budget_ratio: float = 0.1, budget_burst: float = 10.0):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.budget = HedgeBudget(budget_ratio, budget_burst)
+        self._windows: Dict[str, LatencyWindow] = {}
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "hedged": 0, "hedge_wins": 0, "over_budget": 0}
+
+    def hedge_delay(self, endpoint: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None until the endpoint has enough samples"""
+        with self._lock:
+            window = self._windows.get(endpoint)
+            if window is None or len(window) < self.min_samples:
+                return None
+            threshold = window.percentile(self.percentile)
+        return min(self.max_delay, max(self.min_delay, threshold))
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            self._windows.setdefault(endpoint, LatencyWindow()).add(seconds)
+
+    async def run(self, endpoint: str, request_fn: Callable[[], Awaitable[T]],
+                  is_ok: Callable[[T], bool] = lambda result: True) -> T:
+        """Await request_fn(), hedging it once if it is slower than the endpoint's threshold"""
+        self.counters["requests"] += 1
+        self.budget.earn()
+        delay = self.hedge_delay(endpoint)
+        started = time.monotonic()
+        primary = asyncio.ensure_future(request_fn())
+
+        if delay is None:
+            result = await primary
+            self.record(endpoint, time.monotonic() - started)
+            return result
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self.budget.try_spend():
+            if not done:
+                self.counters["over_budget"] += 1
+            result = await primary
+            self.record(endpoint, time.monotonic() - started)
+            return result
+
+        self.counters["hedged"] += 1
+        hedge_started = time.monotonic()
+        hedge = asyncio.ensure_future(request_fn())
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None or not is_ok(task.result()):
+                        continue  # The other attempt may still succeed
+                    finished_at = time.monotonic()
+                    if task is hedge:
+                        self.counters["hedge_wins"] += 1
+                        self.record(endpoint, finished_at - hedge_started)
+                    else:
+                        self.record(endpoint, finished_at - started)
+                    return task.result()
+            return await primary  # Both failed: surface the primary's outcome
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            thresholds = {
+                endpoint: round(window.percentile(self.percentile) or 0, 4)
+                for endpoint, window in self._windows.items()
+            }
+        return {"thresholds": thresholds, "budget_tokens": round(self.budget.tokens, 2), **self.counters}
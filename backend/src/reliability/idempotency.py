@@ -0,0 +1,104 @@
+"""Idempotency-Key support for endpoints that must not run twice.
+
+The first request with a key runs normally and its response is stored for a
+TTL. Replays get the stored response without doing the work again, and a
+duplicate that arrives while the first is still running waits for it
+instead of starting a second call. Reusing a key with a different request
+body is rejected. Failures are forgotten so the key can be retried, unless
+the body is marked outcome_unknown: the work may have happened anyway (e.g.
+the upstream timed out after the request was sent), so the key stays taken.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request body"""
+
+
+class IdempotentRequest:
+    """One key's in-flight or completed request"""
+
+    def __init__(self, key: str, fingerprint: str, expires_at: float):
+        self.key = key
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+        self.body: Optional[Dict] = None
+        self.status: Optional[int] = None
+        self.done = threading.Event()
+
+    def wait(self, timeout: float) -> bool:
+        return self.done.wait(timeout)
+
+
+def request_fingerprint(data: Any) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """Bounded, TTL-expiring map of idempotency key to request outcome"""
+
+    def __init__(self, ttl_seconds: float = 24 * 3600, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, IdempotentRequest]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"first": 0, "replayed": 0, "waited": 0, "conflicts": 0}
+
+    def begin(self, key: str, data: Any) -> Tuple[IdempotentRequest, bool]:
+        """Return (entry, True) if the caller should do the work, (entry, False) for a duplicate"""
+        fingerprint = request_fingerprint(data)
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.fingerprint != fingerprint:
+                    self.counters["conflicts"] += 1
+                    raise IdempotencyConflict(key)
+                self.counters["replayed" if entry.done.is_set() else "waited"] += 1
+                return entry, False
+
+            entry = IdempotentRequest(key, fingerprint, now + self.ttl_seconds)
+            self._entries[key] = entry
+            self.counters["first"] += 1
+            return entry, True
+
+    def complete(self, entry: IdempotentRequest, body: Dict, status: int) -> None:
+        """Record the outcome and release waiting duplicates
+
+        Server errors and 429s are handed to the waiters but not kept, so a
+        later retry with the same key can try again, unless the outcome is
+        unknown.
+        """
+        entry.body, entry.status = body, status
+        if (status >= 500 or status == 429) and not body.get("outcome_unknown"):
+            with self._lock:
+                if self._entries.get(entry.key) is entry:
+                    del self._entries[entry.key]
+        entry.done.set()
+
+    def forget(self, entry: IdempotentRequest) -> None:
+        """Drop a completed entry whose work later failed (e.g. a queued job), so the key can be retried"""
+        with self._lock:
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+
+    def _evict(self, now: float) -> None:
+        # Caller holds self._lock; entries are in insertion order, so expired ones are at the front
+        while self._entries:
+            key, oldest = next(iter(self._entries.items()))
+            if oldest.expires_at > now and len(self._entries) < self.max_entries:
+                break
+            if not oldest.done.is_set() and oldest.expires_at > now:
+                break  # Never drop a request that is still running
+            del self._entries[key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), **self.counters}
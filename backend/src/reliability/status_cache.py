@@ -0,0 +1,141 @@
+"""Batch call status cache with stale-while-revalidate.
+
+Terminal statuses never change, so they are kept for good. Live statuses
+are fresh for a few seconds; after that they are still served (up to
+stale_ttl) while one background refresh per call fetches the new value.
+Readers only wait on the upstream API when nothing usable is cached, and
+concurrent misses for the same call share a single fetch. If that fetch
+fails (e.g. the upstream circuit is open), the last known result of any age
+is returned, marked stale.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+TERMINAL_BATCH_STATUSES = ("completed", "failed", "cancelled")
+
+
+class StatusCache:
+    """Cache of get_batch_call_status results keyed by batch call id"""
+
+    def __init__(
+        self,
+        fetch_fn: Callable[[str], Dict],
+        on_update: Optional[Callable[[str, Dict], None]] = None,
+        ttl: float = 3.0,
+        stale_ttl: float = 60.0,
+        max_entries: int = 10_000,
+        refresh_workers: int = 4,
+    ):
+        self.fetch_fn = fetch_fn
+        self.on_update = on_update
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()  # id -> (result, fetched_at)
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="status-refresh")
+        self.counters = {"fresh": 0, "stale": 0, "terminal": 0, "miss": 0, "refreshes": 0, "stale_on_error": 0}
+
+    @staticmethod
+    def is_terminal(result: Dict) -> bool:
+        return result.get("status") in TERMINAL_BATCH_STATUSES
+
+    def peek(self, batch_call_id: str) -> Tuple[Optional[Dict], str]:
+        """Return (cached result, state) without blocking; state is terminal, fresh, stale or miss
+
+        A stale hit starts a background refresh.
+        """
+        with self._lock:
+            entry = self._entries.get(batch_call_id)
+            if entry is None:
+                self.counters["miss"] += 1
+                return None, "miss"
+            result, fetched_at = entry
+            if self.is_terminal(result):
+                self.counters["terminal"] += 1
+                return result, "terminal"
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                self.counters["fresh"] += 1
+                return result, "fresh"
+            if age >= self.stale_ttl:
+                self.counters["miss"] += 1
+                return None, "miss"
+            self.counters["stale"] += 1
+            self._refresh_in_background(batch_call_id)
+            return result, "stale"
+
+    def get(self, batch_call_id: str) -> Dict:
+        """Cached result if usable, otherwise fetch (sharing any fetch already in flight)"""
+        result, _ = self.peek(batch_call_id)
+        if result is not None:
+            return result
+        result = self._fetch_once(batch_call_id).result()
+        if not result.get("success"):
+            with self._lock:
+                entry = self._entries.get(batch_call_id)
+                if entry is not None:
+                    self.counters["stale_on_error"] += 1
+                    return dict(entry[0], stale=True)
+        return result
+
+    def terminal(self, batch_call_id: str) -> Optional[Dict]:
+        """The cached result if the call has finished, else None (never refreshes)"""
+        with self._lock:
+            entry = self._entries.get(batch_call_id)
+            return entry[0] if entry is not None and self.is_terminal(entry[0]) else None
+
+    def store(self, batch_call_id: str, result: Dict) -> None:
+        """Record a freshly fetched result; failed fetches are not cached"""
+        if not result.get("success"):
+            return
+        with self._lock:
+            self._entries[batch_call_id] = (result, time.monotonic())
+            self._entries.move_to_end(batch_call_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "refreshing": len(self._inflight), **self.counters}
+
+    def _fetch_once(self, batch_call_id: str) -> Future:
+        with self._lock:
+            future = self._inflight.get(batch_call_id)
+            if future is not None:
+                return future
+            future = self._inflight[batch_call_id] = Future()
+        self._fetch(batch_call_id, future)
+        return future
+
+    def _fetch(self, batch_call_id: str, future: Future) -> Dict:
+        try:
+            result = self.fetch_fn(batch_call_id)
+        except Exception as e:
+            result = {"success": False, "error": f"Exception getting batch call status: {str(e)}"}
+        self.store(batch_call_id, result)
+        with self._lock:
+            self._inflight.pop(batch_call_id, None)
+        future.set_result(result)
+        return result
+
+    def _refresh_in_background(self, batch_call_id: str) -> None:
+        # Caller holds self._lock; registering the future here keeps it to one refresh per call
+        if batch_call_id in self._inflight:
+            return
+        future = self._inflight[batch_call_id] = Future()
+        self.counters["refreshes"] += 1
+        self._refresher.submit(self._refresh, batch_call_id, future)
+
+    def _refresh(self, batch_call_id: str, future: Future) -> None:
+        result = self._fetch(batch_call_id, future)
+        if result.get("success") and self.on_update:
+            try:
+                self.on_update(batch_call_id, result)
+            except Exception as e:
+                print(f"Error applying refreshed status for {batch_call_id}: {e}")
@@ -1,13 +1,23 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, send_from_directory
 from flask_cors import cross_origin
 import requests
 import os
 import time
-from twilio.rest import Client
-from config import ELEVENLABS_API_KEY, TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER
+from typing import Callable, Dict, Optional
+from config import ELEVENLABS_API_KEY, TWILIO_PHONE_NUMBER
+from src.extraction.incremental import live_extractions
+from src.telephony.tts_cache import tts_cache
+from src.telephony.twiml import CLOSING_MESSAGE, render_gather
 
 phone_calls_bp = Blueprint('phone_calls', __name__)
 
+# Socket.IO emit(event, payload, room), injected by the app that registers the blueprint
+_emit_fn: Optional[Callable[[str, Dict, Optional[str]], None]] = None
+
+def init_phone_calls(emit_fn: Callable[[str, Dict, Optional[str]], None]) -> None:
+    global _emit_fn
+    _emit_fn = emit_fn
+
 @phone_calls_bp.route('/test', methods=['GET'])
 def test():
     """Test endpoint to verify routing is working"""
@@ -16,9 +26,8 @@ def test():
 @phone_calls_bp.route('/test-socket', methods=['GET'])
 def test_socket():
     """Test Socket.IO connection"""
-    from backend.api.index import sio
     print("Testing Socket.IO connection")
-    sio.emit('test_event', {'message': 'Socket.IO test successful'})
+    emit_to_call('test_event', {'message': 'Socket.IO test successful'}, None)
     return jsonify({'message': 'Socket.IO test event sent'})
 
 # ElevenLabs API configuration
@@ -55,30 +64,35 @@ def make_call():
             }
         }
         
+        # Only this route needs the twilio package
+        from src.telephony.twilio_client import get_twilio_client, twilio_configured
+        
         # Initialize Twilio client
-        if not all([TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER]):
+        if not twilio_configured():
             return jsonify({
                 'success': False,
                 'error': 'Twilio credentials not configured',
                 'message': 'Please set TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, and TWILIO_PHONE_NUMBER in your .env file'
             }), 400
         
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        client = get_twilio_client()
         
         try:
             # Make the actual phone call using Twilio
             print(f"Making Twilio call to {phone_number}")
             
-            # Create an interactive TwiML for the call
-            twiml = f"""
-            <Response>
-                <Gather input="speech" action="/api/handle-response" method="POST" speechTimeout="auto" language="en-US">
-                    <Say voice="alice">Hello! This is an AI phone call. The purpose of this call is: {data.get('callPurpose', 'Information gathering')}. 
-                    I have some questions for you. Please answer after the beep.</Say>
-                </Gather>
-                <Say voice="alice">Thank you for your time!</Say>
-            </Response>
-            """
+            # Create an interactive TwiML for the call, playing pre-rendered
+            # audio for the template first message when it is in the cache
+            first_message = data.get('firstMessage')
+            twiml = render_gather(
+                f"Hello! This is an AI phone call. The purpose of this call is: "
+                f"{data.get('callPurpose', 'Information gathering')}. "
+                f"I have some questions for you. Please answer after the beep.",
+                prompt_audio_url=tts_cache.url_for(
+                    first_message, data.get('voiceId', '21m00Tcm4TlvDq8ikWAM'), data.get('language', 'en')
+                ) if first_message else None,
+                closing_audio_url=tts_cache.url_for(CLOSING_MESSAGE)
+            )
             
             # Make the call
             call = client.calls.create(
@@ -92,18 +106,12 @@ def make_call():
             print(f"Twilio call initiated with SID: {call_id}")
             
             # Emit Socket.IO event to update frontend
-            from backend.api.index import sio
             print(f"Emitting Socket.IO event: call_update with data: {{'call_id': '{call_id}', 'status': 'initiated'}}")
-            
-            try:
-                sio.emit('call_update', {
-                    'call_id': call_id,
-                    'status': 'initiated',
-                    'message': 'Call initiated successfully'
-                }, room=None)
-                print("Socket.IO event emitted to all clients")
-            except Exception as e:
-                print(f"Error emitting Socket.IO event: {e}")
+            emit_to_call('call_update', {
+                'call_id': call_id,
+                'status': 'initiated',
+                'message': 'Call initiated successfully'
+            }, None)
             
             return jsonify({
                 'success': True,
@@ -161,14 +169,7 @@ def handle_response():
         ai_response = f"I heard you say: {speech_result}. Thank you for your response!"
         
         # Create TwiML response
-        twiml = f"""
-        <Response>
-            <Gather input="speech" action="/api/handle-response" method="POST" speechTimeout="auto" language="en-US">
-                <Say voice="alice">{ai_response}</Say>
-            </Gather>
-            <Say voice="alice">Thank you for your time!</Say>
-        </Response>
-        """
+        twiml = render_gather(ai_response, closing_audio_url=tts_cache.url_for(CLOSING_MESSAGE))
         
         return twiml, 200, {'Content-Type': 'text/xml'}
         
@@ -176,6 +177,18 @@ def handle_response():
         print(f"Error handling response: {e}")
         return "Error", 500
 
+@phone_calls_bp.record_once
+def serve_tts_clips(state):
+    # Clip URLs follow wherever the app mounts this blueprint; until then calls use <Say>
+    tts_cache.serve_from(f"{state.url_prefix or ''}/tts")
+
+@phone_calls_bp.route('/tts/<key>.mp3', methods=['GET'])
+def get_tts_clip(key):
+    """Serve a pre-rendered TTS clip for Twilio <Play>"""
+    if len(key) != 64 or not all(c in '0123456789abcdef' for c in key):
+        return jsonify({'error': 'Clip not found'}), 404
+    return send_from_directory(tts_cache.cache_dir, f"{key}.mp3", mimetype='audio/mpeg', max_age=31536000)
+
 @phone_calls_bp.route('/call-results/<call_id>', methods=['GET'])
 def get_call_results(call_id):
     """Get the results of a specific call"""
@@ -205,6 +218,15 @@ def get_call_results(call_id):
         print(f"Error retrieving call results: {e}")
         return jsonify({'error': str(e)}), 500
 
+def emit_to_call(event, payload, call_id):
+    """Emit a Socket.IO event to the clients following a call (all clients when call_id is None)"""
+    if _emit_fn is None:
+        return  # Blueprint registered without init_phone_calls: nothing to push to
+    try:
+        _emit_fn(event, payload, call_id)
+    except Exception as e:
+        print(f"Error emitting Socket.IO event {event}: {e}")
+
 @phone_calls_bp.route('/webhook', methods=['POST'])
 def webhook_handler():
     """Handle webhooks from ElevenLabs"""
@@ -216,23 +238,49 @@ def webhook_handler():
         
         # Process different types of webhook events
         event_type = data.get('event_type')
-        call_id = data.get('call_id')
+        call_id = data.get('batch_call_id') or data.get('call_id')
         
         if event_type == 'call_started':
             # Handle call started event
             print(f"Call {call_id} started")
+            state = live_extractions.start(call_id, data.get('questions', []), data.get('language'))
+            state.conversation_id = data.get('conversation_id') or state.conversation_id
         elif event_type == 'call_ended':
             # Handle call ended event
             print(f"Call {call_id} ended")
-            # Process the final transcript and generate JSON
-            transcript = data.get('transcript', '')
-            extracted_info = process_transcript(transcript)
+            state = live_extractions.get(call_id)
+            if state is not None:
+                state.mark_ended(data.get('conversation_id'))
+            if state is not None and state.utterances:
+                # Answers were filled in live; only the final state is left to build
+                extracted_info = {
+                    'transcript': state.transcript,
+                    'timestamp': data.get('timestamp'),
+                    'call_duration': data.get('duration'),
+                    'extracted_data': state.finalize()
+                }
+            else:
+                # Process the final transcript and generate JSON
+                transcript = data.get('transcript', '')
+                extracted_info = process_transcript(transcript)
             
-            # Here you would typically save to database or emit via WebSocket
             print(f"Extracted information: {extracted_info}")
+            emit_to_call('extraction_complete', {'call_id': call_id, 'results': extracted_info}, call_id)
         elif event_type == 'speech_update':
             # Handle real-time speech updates
-            print(f"Speech update for call {call_id}: {data.get('text', '')}")
+            text = data.get('text', '')
+            print(f"Speech update for call {call_id}: {text}")
+            state = live_extractions.get(call_id) or live_extractions.start(
+                call_id, data.get('questions', []), data.get('language')
+            )
+            utterance_id = data.get('utterance_id', data.get('sequence'))
+            changed = state.add_utterance(text, utterance_id, data.get('role'))
+            if changed:
+                emit_to_call('extraction_update', {
+                    'call_id': call_id,
+                    'changed': changed,
+                    'extracted_info': state.snapshot()
+                }, call_id)
         
         return jsonify({'status': 'success'}), 200
         
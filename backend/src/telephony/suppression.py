@@ -0,0 +1,202 @@
+"""Do-not-call / opt-out suppression list.
+
+Suppressed numbers live in a SQLite table keyed by E.164 number (a B-tree
+index on disk). An in-memory Bloom filter sits in front of it: a number the
+filter has never seen is definitely not suppressed, so the common case of
+dialing a permitted number never touches disk. Only filter hits (real
+suppressions plus a ~1% false-positive rate) fall through to the table.
+
+The filter is built by load() at startup. Later rebuilds (to grow it, or to
+clear bits left by removed numbers) read the table on their own connection
+without holding the lock, then swap the new filter in, so lookups never
+wait on a full table scan.
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from src.campaigns.contacts import normalize_e164
+
+DEFAULT_SUPPRESSION_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "database", "suppression.db")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing from one blake2b digest)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SuppressionList:
+    """Suppressed numbers on disk with a Bloom filter in memory"""
+
+    def __init__(self, path: str, initial_capacity: int = 100_000, error_rate: float = 0.01):
+        self.path = path
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self._conn: Optional[sqlite3.Connection] = None
+        self._bloom: Optional[BloomFilter] = None
+        self._removed_since_rebuild = 0
+        self._added_during_rebuild: Optional[list] = None
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self.lookups = {"checks": 0, "filter_hits": 0, "suppressed": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS suppressed ("
+                "phone_number TEXT PRIMARY KEY, reason TEXT, added_at REAL) WITHOUT ROWID"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def load(self) -> None:
+        """Open the table and build the filter; call once at startup"""
+        with self._lock:
+            self._connection()
+        if self._bloom is None:
+            self._rebuild()
+
+    def _filter(self) -> BloomFilter:
+        # Only reached before load(); callers must not hold self._lock
+        if self._bloom is None:
+            self._rebuild()
+        return self._bloom
+
+    def _rebuild(self, wait: bool = True) -> None:
+        """Size a fresh filter for the current list (with room to grow), load every number, swap it in"""
+        if not self._rebuild_lock.acquire(blocking=wait):
+            return  # Another rebuild is already running
+        try:
+            with self._lock:
+                self._connection()  # Creates the table on first use
+                self._added_during_rebuild = []
+            conn = sqlite3.connect(self.path)
+            try:
+                total = conn.execute("SELECT COUNT(*) FROM suppressed").fetchone()[0]
+                bloom = BloomFilter(max(self.initial_capacity, total * 2), self.error_rate)
+                for (phone_number,) in conn.execute("SELECT phone_number FROM suppressed"):
+                    bloom.add(phone_number)
+            finally:
+                conn.close()
+            with self._lock:
+                # Numbers suppressed while the table was being read may be missing from the scan
+                for number in self._added_during_rebuild:
+                    bloom.add(number)
+                self._added_during_rebuild = None
+                self._bloom = bloom
+                self._removed_since_rebuild = 0
+        finally:
+            self._rebuild_lock.release()
+        print(f"🚫 Suppression filter built: {total} numbers, {len(bloom.bits) // 1024} KiB")
+
+    def is_suppressed(self, phone_number: str) -> bool:
+        number = normalize_e164(phone_number) or phone_number
+        self._filter()
+        with self._lock:
+            self.lookups["checks"] += 1
+            if number not in self._bloom:
+                return False
+            self.lookups["filter_hits"] += 1
+            row = self._connection().execute(
+                "SELECT 1 FROM suppressed WHERE phone_number = ?", (number,)
+            ).fetchone()
+            if row is not None:
+                self.lookups["suppressed"] += 1
+            return row is not None
+
+    def add_many(self, phone_numbers: Iterable[str], reason: Optional[str] = None) -> Dict:
+        """Suppress numbers in one transaction; unparseable numbers are returned as invalid"""
+        numbers, invalid = self._normalize_all(phone_numbers)
+        self._filter()
+        with self._lock:
+            conn = self._connection()
+            before = conn.total_changes
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO suppressed (phone_number, reason, added_at) VALUES (?, ?, ?)",
+                    ((number, reason, now) for number in numbers),
+                )
+            added = conn.total_changes - before
+            for number in numbers:
+                self._bloom.add(number)
+            if self._added_during_rebuild is not None:
+                self._added_during_rebuild.extend(numbers)
+            # Past capacity the false-positive rate climbs; resize from disk
+            needs_rebuild = self._bloom.count > self._bloom.capacity
+        if needs_rebuild:
+            self._rebuild(wait=False)
+        return {"added": added, "already_suppressed": len(numbers) - added, "invalid": invalid}
+
+    def remove_many(self, phone_numbers: Iterable[str]) -> Dict:
+        """Lift suppression for numbers; their filter bits stay set until the next rebuild"""
+        numbers, invalid = self._normalize_all(phone_numbers)
+        with self._lock:
+            conn = self._connection()
+            before = conn.total_changes
+            with conn:
+                conn.executemany("DELETE FROM suppressed WHERE phone_number = ?", ((number,) for number in numbers))
+            removed = conn.total_changes - before
+            self._removed_since_rebuild += removed
+            # Stale bits only cost extra disk lookups; rebuild once they pile up
+            needs_rebuild = self._bloom is not None and self._removed_since_rebuild > self._bloom.capacity // 4
+        if needs_rebuild:
+            self._rebuild(wait=False)
+        return {"removed": removed, "not_found": len(numbers) - removed, "invalid": invalid}
+
+    @staticmethod
+    def _normalize_all(phone_numbers: Iterable[str]):
+        numbers, invalid = set(), []
+        for raw in phone_numbers:
+            number = normalize_e164(raw)
+            if number:
+                numbers.add(number)
+            else:
+                invalid.append(raw)
+        return list(numbers), invalid
+
+    def stats(self) -> Dict:
+        self._filter()
+        with self._lock:
+            total = self._connection().execute("SELECT COUNT(*) FROM suppressed").fetchone()[0]
+            bloom = self._bloom
+            return {
+                "suppressed_numbers": total,
+                "filter_capacity": bloom.capacity,
+                "filter_kib": len(bloom.bits) // 1024,
+                "filter_hash_count": bloom.hash_count,
+                **self.lookups,
+            }
+
+
+suppression_list = SuppressionList(os.getenv("SUPPRESSION_DB", DEFAULT_SUPPRESSION_PATH))
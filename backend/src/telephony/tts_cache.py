@@ -0,0 +1,134 @@
+"""Content-addressed on-disk cache of pre-rendered TTS audio.
+
+Template first messages and the fixed Twilio lines never change, so they are
+synthesized once with ElevenLabs and stored under a hash of
+(text, voice_id, language). TwiML can then <Play> the stored clip instead of
+synthesizing the same sentence on every call.
+
+Warm the cache at deploy time (from backend/):
+    python -m src.telephony.tts_cache
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+from typing import Iterable, Optional, Tuple
+
+import httpx
+
+from config import ELEVENLABS_API_KEY
+
+ELEVENLABS_TTS_URL = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+TTS_MODEL_ID = "eleven_turbo_v2_5"  # supports language_code
+TTS_OUTPUT_FORMAT = "mp3_44100_128"
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "tts_cache")
+DEFAULT_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"
+
+
+def clip_key(text: str, voice_id: str, language: str) -> str:
+    """Stable content address for one rendered phrase"""
+    return hashlib.sha256(f"{voice_id}\0{language}\0{text}".encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Pre-rendered audio clips stored as <key>.mp3 files"""
+
+    def __init__(self, cache_dir: str, public_base_url: Optional[str] = None, api_key: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self.public_base_url = (public_base_url or "").rstrip("/")
+        self.api_key = api_key
+        self.route_prefix: Optional[str] = None  # Where clips are served; set when the route is registered
+
+    def serve_from(self, route_prefix: str) -> None:
+        """Record the path the clip route is mounted at, e.g. /api/phone/tts"""
+        self.route_prefix = route_prefix.rstrip("/")
+
+    def path_for_key(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def get(self, text: str, voice_id: str, language: str) -> Optional[str]:
+        """Return the cached clip path, or None if it has not been rendered"""
+        path = self.path_for_key(clip_key(text, voice_id, language))
+        return path if os.path.exists(path) else None
+
+    def url_for(self, text: str, voice_id: str = DEFAULT_VOICE_ID, language: str = "en") -> Optional[str]:
+        """Public URL Twilio can <Play>, only when the clip is cached and served; None means use <Say>"""
+        if not self.public_base_url or self.route_prefix is None:
+            return None
+        key = clip_key(text, voice_id, language)
+        if not os.path.exists(self.path_for_key(key)):
+            return None
+        return f"{self.public_base_url}{self.route_prefix}/{key}.mp3"
+
+    def render(self, text: str, voice_id: str, language: str) -> str:
+        """Synthesize a phrase with ElevenLabs unless it is already cached"""
+        cached = self.get(text, voice_id, language)
+        if cached:
+            return cached
+
+        response = httpx.post(
+            ELEVENLABS_TTS_URL.format(voice_id=voice_id),
+            params={"output_format": TTS_OUTPUT_FORMAT},
+            headers={"xi-api-key": self.api_key, "Content-Type": "application/json"},
+            json={"text": text, "model_id": TTS_MODEL_ID, "language_code": language},
+            timeout=30.0,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"TTS failed: {response.status_code} - {response.text}")
+
+        # Write to a temp file first so a crashed render never leaves a partial clip
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for_key(clip_key(text, voice_id, language))
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp_path, path)
+        return path
+
+    def warm(self, phrases: Iterable[Tuple[str, str, str]]) -> dict:
+        """Render every (text, voice_id, language) phrase that is not cached yet"""
+        stats = {"cached": 0, "rendered": 0, "failed": 0}
+        for text, voice_id, language in phrases:
+            if not text:
+                continue
+            if self.get(text, voice_id, language):
+                stats["cached"] += 1
+                continue
+            try:
+                self.render(text, voice_id, language)
+                stats["rendered"] += 1
+                print(f"🔊 Rendered: {text[:60]}... ({voice_id}, {language})")
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"❌ Failed to render '{text[:60]}...': {e}")
+        return stats
+
+
+tts_cache = TTSCache(
+    os.getenv("TTS_CACHE_DIR", DEFAULT_CACHE_DIR),
+    public_base_url=os.getenv("PUBLIC_BASE_URL"),
+    api_key=ELEVENLABS_API_KEY,
+)
+
+
+def template_phrases(templates: dict, fixed_phrases: Iterable[str]) -> Iterable[Tuple[str, str, str]]:
+    """Every fixed phrase worth pre-rendering: template first messages plus Twilio lines"""
+    for template in templates.values():
+        yield template.get("first_message"), template.get("voice_id", DEFAULT_VOICE_ID), template.get("language", "en")
+    for text in fixed_phrases:
+        yield text, DEFAULT_VOICE_ID, "en"
+
+
+def main() -> int:
+    from src.agents.templates import DEFAULT_AGENT_TEMPLATES
+    from src.telephony.twiml import CLOSING_MESSAGE
+
+    stats = tts_cache.warm(template_phrases(DEFAULT_AGENT_TEMPLATES, [CLOSING_MESSAGE]))
+    print(f"✅ TTS cache warm: {stats}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""Process-wide Twilio REST client.
+
+Building a Client per request also builds a new HTTP session, so every call
+paid for a fresh TLS handshake. The shared client keeps one pooled session.
+"""
+
+import threading
+from typing import Optional
+
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+from config import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER
+
+# Seconds before a Twilio REST request is abandoned
+TWILIO_HTTP_TIMEOUT = 10
+
+_client: Optional[Client] = None
+_client_lock = threading.Lock()
+
+
+def twilio_configured() -> bool:
+    return all([TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER])
+
+
+def get_twilio_client() -> Client:
+    """Return the shared Twilio client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                http_client = TwilioHttpClient(pool_connections=True, timeout=TWILIO_HTTP_TIMEOUT)
+                _client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=http_client)
+    return _client
@@ -0,0 +1,58 @@
+"""TwiML rendering for the Twilio speech-gather loop.
+
+Documents are assembled from precompiled fragments, and every piece of
+caller- or request-supplied text is XML-escaped before it is interpolated.
+"""
+
+from functools import lru_cache
+from typing import Optional
+from xml.sax.saxutils import escape, quoteattr
+
+DEFAULT_ACTION = "/api/phone/handle-response"
+DEFAULT_LANGUAGE = "en-US"
+DEFAULT_VOICE = "alice"
+
+CLOSING_MESSAGE = "Thank you for your time!"
+
+_RESPONSE_OPEN = '<?xml version="1.0" encoding="UTF-8"?><Response>'
+_RESPONSE_CLOSE = "</Response>"
+_GATHER_CLOSE = "</Gather>"
+
+
+@lru_cache(maxsize=64)
+def gather_open(action: str = DEFAULT_ACTION, language: str = DEFAULT_LANGUAGE) -> str:
+    return (
+        f'<Gather input="speech" action={quoteattr(action)} method="POST" '
+        f'speechTimeout="auto" language={quoteattr(language)}>'
+    )
+
+
+def say(text: str, voice: str = DEFAULT_VOICE) -> str:
+    return f"<Say voice={quoteattr(voice)}>{escape(text)}</Say>"
+
+
+def play(url: str) -> str:
+    return f"<Play>{escape(url)}</Play>"
+
+
+@lru_cache(maxsize=16)
+def closing(voice: str = DEFAULT_VOICE, audio_url: Optional[str] = None) -> str:
+    """The fixed goodbye played when the caller stops answering"""
+    return (play(audio_url) if audio_url else say(CLOSING_MESSAGE, voice)) + _RESPONSE_CLOSE
+
+
+def render_gather(prompt: str, language: str = DEFAULT_LANGUAGE, action: str = DEFAULT_ACTION,
+                  voice: str = DEFAULT_VOICE, prompt_audio_url: Optional[str] = None,
+                  closing_audio_url: Optional[str] = None) -> str:
+    """Render a <Gather> turn that speaks the prompt and posts the answer to action
+
+    Pre-rendered clips are played instead of <Say> when their URLs are given.
+    Prompts are mostly generated per turn, so only the fixed fragments are cached.
+    """
+    return "".join((
+        _RESPONSE_OPEN,
+        gather_open(action, language),
+        play(prompt_audio_url) if prompt_audio_url else say(prompt, voice),
+        _GATHER_CLOSE,
+        closing(voice, closing_audio_url),
+    ))
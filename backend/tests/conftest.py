@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules are imported as src.<package>.<module>, the same way api/index.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from src.reliability.admission import AdmissionController, AdmissionRejected
+
+SCOPE = "phone:phnum_1"
+
+
+def make_controller(live=None, **kwargs):
+    live = live if live is not None else {}
+    return AdmissionController(lambda scope: live.get(scope, 0), {SCOPE: 3}, **kwargs)
+
+
+def hold_slot(controller, scopes=(SCOPE,), calls=1):
+    """Admit a call on another thread and keep its slot until released is set"""
+    admitted, released = threading.Event(), threading.Event()
+
+    def run():
+        with controller.admit(scopes, calls=calls):
+            admitted.set()
+            released.wait(5.0)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert admitted.wait(2.0)
+    return released, thread
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    controller = make_controller(max_concurrent=1, max_queue=0, retry_after=7)
+    released, thread = hold_slot(controller)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        with controller.admit([SCOPE]):
+            pass
+    assert rejected.value.retry_after == 7
+    assert controller.stats()["rejected_queue_full"] == 1
+
+    released.set()
+    thread.join(2.0)
+
+
+def test_waiting_too_long_for_a_slot_is_rejected():
+    controller = make_controller(max_concurrent=1, queue_timeout=0.05)
+    released, thread = hold_slot(controller)
+
+    with pytest.raises(AdmissionRejected, match="timed out"):
+        with controller.admit([SCOPE]):
+            pass
+    stats = controller.stats()
+    assert stats["rejected_timeout"] == 1
+    assert stats["queue_depth"] == 0
+
+    released.set()
+    thread.join(2.0)
+
+
+def test_scope_limit_is_checked_again_after_waiting():
+    live = {}
+    controller = make_controller(live, max_concurrent=1, queue_timeout=2.0)
+    released, thread = hold_slot(controller, scopes=())
+    outcome = {}
+
+    def waiter():
+        try:
+            with controller.admit([SCOPE]):
+                outcome["admitted"] = True
+        except AdmissionRejected as e:
+            outcome["rejected"] = e.reason
+
+    waiting = threading.Thread(target=waiter)
+    waiting.start()
+    deadline = time.monotonic() + 2.0
+    while controller.stats()["queue_depth"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert controller.stats()["queue_depth"] == 1
+    # Calls went live while the waiter was queued
+    live[SCOPE] = 3
+    released.set()
+    waiting.join(2.0)
+    thread.join(2.0)
+
+    assert "admitted" not in outcome
+    assert SCOPE in outcome["rejected"]
+    assert controller.stats()["rejected_limit"] == 1
+
+
+def test_batches_reserve_one_call_per_recipient():
+    controller = make_controller({SCOPE: 1})
+    released, thread = hold_slot(controller, calls=2)
+    assert controller.stats()["scopes"][SCOPE]["setting_up"] == 2
+
+    with pytest.raises(AdmissionRejected):
+        with controller.admit([SCOPE]):
+            pass
+    # Calls scheduled for later start nothing now, so they still get in
+    with controller.admit([SCOPE], calls=0):
+        pass
+
+    released.set()
+    thread.join(2.0)
+    assert controller.stats()["scopes"][SCOPE]["setting_up"] == 0
+
+
+def test_oversized_batch_goes_through_only_when_the_scope_is_idle():
+    live = {}
+    controller = make_controller(live)
+    with controller.admit([SCOPE], calls=10):
+        pass
+
+    live[SCOPE] = 1
+    with pytest.raises(AdmissionRejected):
+        with controller.admit([SCOPE], calls=10):
+            pass
@@ -0,0 +1,122 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from src.campaigns.calling_windows import CallingWindow, CallScheduler
+
+# No known prefix, so the scheduler's default timezone (UTC) applies
+UTC_NUMBER = "+99900000000"
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "scheduled_calls.db")
+
+
+def test_release_turned_away_with_retry_after_is_requeued(db_path):
+    attempts = []
+    released = threading.Event()
+
+    def dispatch(payload, scheduled_time_unix):
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            return {"success": False, "error": "account is at its limit", "retry_after": 0.2}
+        released.set()
+        return {"success": True, "batch_call_id": "btcal_1"}
+
+    scheduler = CallScheduler(dispatch, CallingWindow(0, 24), lead_seconds=0, path=db_path)
+    entry = scheduler.schedule(UTC_NUMBER, {"phoneNumber": UTC_NUMBER}, time.time())
+
+    assert released.wait(2.0)
+    assert attempts[1] - attempts[0] >= 0.2
+    assert wait_for(lambda: scheduler.get(entry["schedule_id"])["status"] == "released")
+    assert scheduler.get(entry["schedule_id"])["batch_call_id"] == "btcal_1"
+    stats = scheduler.stats()
+    assert stats["retried"] == 1
+    assert stats["released"] == 1
+    assert stats["failed"] == 0
+
+
+def test_release_failing_without_retry_after_is_marked_failed(db_path):
+    scheduler = CallScheduler(lambda payload, scheduled_time_unix: {"success": False, "error": "bad number"},
+                              CallingWindow(0, 24), lead_seconds=0, path=db_path)
+    entry = scheduler.schedule(UTC_NUMBER, {"phoneNumber": UTC_NUMBER}, time.time())
+
+    assert wait_for(lambda: scheduler.get(entry["schedule_id"])["status"] == "failed")
+    assert scheduler.get(entry["schedule_id"])["error"] == "bad number"
+    assert scheduler.stats()["retried"] == 0
+
+
+def test_retries_are_capped(db_path):
+    attempts = []
+
+    def dispatch(payload, scheduled_time_unix):
+        attempts.append(scheduled_time_unix)
+        return {"success": False, "error": "circuit open", "retry_after": 0.01}
+
+    scheduler = CallScheduler(dispatch, CallingWindow(0, 24), lead_seconds=0, path=db_path, max_retries=2)
+    entry = scheduler.schedule(UTC_NUMBER, {"phoneNumber": UTC_NUMBER}, time.time())
+
+    assert wait_for(lambda: scheduler.get(entry["schedule_id"])["status"] == "failed")
+    assert len(attempts) == 3
+    assert scheduler.get(entry["schedule_id"])["retries"] == 2
+
+
+def test_retry_after_the_window_closes_waits_for_the_next_window(db_path):
+    hour = datetime.now(timezone.utc).hour
+    window = CallingWindow(hour, hour + 1)  # Open now, closed two hours from now
+    turned_away = threading.Event()
+
+    def dispatch(payload, scheduled_time_unix):
+        turned_away.set()
+        return {"success": False, "error": "too many calls", "retry_after": 2 * 3600}
+
+    scheduler = CallScheduler(dispatch, window, lead_seconds=300, path=db_path)
+    entry = scheduler.schedule(UTC_NUMBER, {"phoneNumber": UTC_NUMBER}, time.time())
+    assert turned_away.wait(2.0)
+    assert wait_for(lambda: scheduler.get(entry["schedule_id"])["status"] == "scheduled")
+
+    held = scheduler.get(entry["schedule_id"])
+    opens = scheduler.next_window(UTC_NUMBER, time.time() + 2 * 3600)
+    assert held["window_start"] == pytest.approx(opens)
+    assert datetime.fromtimestamp(held["window_start"], timezone.utc).hour == hour
+    assert held["retries"] == 1
+
+
+def test_held_calls_survive_a_restart(db_path):
+    never = lambda payload, scheduled_time_unix: {"success": True, "batch_call_id": "btcal_1"}
+    tomorrow = time.time() + 24 * 3600
+    first = CallScheduler(never, CallingWindow(0, 24), path=db_path)
+    entry = first.schedule(UTC_NUMBER, {"phoneNumber": UTC_NUMBER, "templateId": "hypertension"}, tomorrow)
+
+    restarted = CallScheduler(never, CallingWindow(0, 24), path=db_path)
+    pending = restarted.pending()
+    assert [held["schedule_id"] for held in pending] == [entry["schedule_id"]]
+    assert pending[0]["window_start"] == pytest.approx(tomorrow)
+    assert restarted._entries[entry["schedule_id"]]["payload"]["templateId"] == "hypertension"
+
+
+def test_calls_interrupted_mid_release_are_not_redialed(db_path):
+    dialed = []
+    first = CallScheduler(lambda payload, scheduled_time_unix: {"success": True}, CallingWindow(0, 24), path=db_path)
+    entry = first.schedule(UTC_NUMBER, {"phoneNumber": UTC_NUMBER}, time.time() + 3600)
+    with first._condition:
+        first._entries[entry["schedule_id"]]["status"] = "releasing"
+        first._set_status(first._entries[entry["schedule_id"]])
+
+    restarted = CallScheduler(lambda payload, scheduled_time_unix: dialed.append(payload) or {"success": True},
+                              CallingWindow(0, 24), path=db_path)
+    assert restarted.get(entry["schedule_id"])["status"] == "failed"
+    assert restarted.pending() == []
+    assert dialed == []
@@ -0,0 +1,50 @@
+import time
+
+from src.reliability.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers
+
+
+def test_opens_when_too_many_recent_calls_fail():
+    breaker = CircuitBreaker("submit_batch_call", min_calls=4, failure_rate=0.5, open_seconds=30)
+    for ok in (True, False, True):
+        breaker.record(ok, 0.1)
+    assert breaker.state == CLOSED  # Too few calls to judge
+
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_opens_when_too_many_recent_calls_are_slow():
+    breaker = CircuitBreaker("create_agent", min_calls=2, slow_call_seconds=1.0, slow_call_rate=0.8)
+    breaker.record(True, 2.0)
+    breaker.record(True, 2.0)
+    assert breaker.state == OPEN
+
+
+def test_one_probe_after_the_cool_down_decides_the_state():
+    breaker = CircuitBreaker("submit_batch_call", min_calls=1, open_seconds=0.05)
+    breaker.record(False, 0.1)
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # Only the probe goes through
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["recent_calls"] == 0
+
+
+def test_open_circuit_names_the_first_endpoint_cooling_down():
+    breakers = CircuitBreakers(min_calls=1, open_seconds=30)
+    assert breakers.open_circuit("submit_batch_call", "create_agent") is None
+
+    breakers.get("create_agent").record(False, 0.1)
+    circuit = breakers.open_circuit("submit_batch_call", "create_agent")
+    assert circuit.name == "create_agent"
+    assert 29 < circuit.retry_after <= 30
@@ -0,0 +1,66 @@
+import asyncio
+
+from src.reliability.hedging import RequestHedger
+
+ENDPOINT = "get_batch_call_status"
+
+
+def warmed_up(seconds=0.01, **kwargs):
+    hedger = RequestHedger(min_samples=5, min_delay=0.01, **kwargs)
+    for _ in range(5):
+        hedger.record(ENDPOINT, seconds)
+    return hedger
+
+
+def attempts(*delays_and_results):
+    """A request_fn whose nth call sleeps and returns the nth (delay, result)"""
+    calls = []
+
+    async def request():
+        delay, result = delays_and_results[len(calls)]
+        calls.append(delay)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return request, calls
+
+
+def test_no_hedge_until_the_endpoint_has_enough_samples():
+    hedger = RequestHedger(min_samples=5)
+    request, calls = attempts((0.05, "slow"))
+
+    assert asyncio.run(hedger.run(ENDPOINT, request)) == "slow"
+    assert len(calls) == 1
+    assert hedger.counters["hedged"] == 0
+
+
+def test_slow_request_is_hedged_and_the_faster_answer_wins():
+    hedger = warmed_up()
+    request, calls = attempts((1.0, "primary"), (0.01, "hedge"))
+
+    assert asyncio.run(hedger.run(ENDPOINT, request)) == "hedge"
+    assert len(calls) == 2
+    assert hedger.counters["hedged"] == 1
+    assert hedger.counters["hedge_wins"] == 1
+
+
+def test_failed_attempt_falls_back_to_the_other():
+    hedger = warmed_up()
+    request, _ = attempts((0.05, {"success": True}), (0.01, {"success": False}))
+
+    result = asyncio.run(hedger.run(ENDPOINT, request, is_ok=lambda result: result["success"]))
+    assert result == {"success": True}
+    assert hedger.counters["hedge_wins"] == 0
+
+
+def test_hedges_stop_when_the_budget_is_spent():
+    hedger = warmed_up(budget_ratio=0.0, budget_burst=1.0)
+    first, _ = attempts((0.05, "primary"), (0.01, "hedge"))
+    second, calls = attempts((0.05, "primary"), (0.01, "hedge"))
+
+    assert asyncio.run(hedger.run(ENDPOINT, first)) == "hedge"
+    assert asyncio.run(hedger.run(ENDPOINT, second)) == "primary"
+    assert len(calls) == 1
+    assert hedger.counters["over_budget"] == 1
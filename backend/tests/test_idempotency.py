@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from src.reliability.idempotency import IdempotencyConflict, IdempotencyStore
+
+REQUEST = {"phoneNumber": "+34600000000", "templateId": "medication_adherence"}
+
+
+def test_duplicate_waits_for_and_replays_the_first_response():
+    store = IdempotencyStore()
+    entry, is_first = store.begin("key-1", REQUEST)
+    assert is_first
+
+    replayed = {}
+
+    def retry():
+        duplicate, duplicate_is_first = store.begin("key-1", REQUEST)
+        assert not duplicate_is_first
+        assert duplicate.wait(2.0)
+        replayed["body"], replayed["status"] = duplicate.body, duplicate.status
+
+    thread = threading.Thread(target=retry)
+    thread.start()
+    store.complete(entry, {"success": True, "batch_call_id": "btcal_1"}, 200)
+    thread.join(2.0)
+
+    assert replayed == {"body": {"success": True, "batch_call_id": "btcal_1"}, "status": 200}
+    assert store.stats()["entries"] == 1
+
+
+def test_reusing_a_key_with_another_body_conflicts():
+    store = IdempotencyStore()
+    store.begin("key-1", REQUEST)
+    with pytest.raises(IdempotencyConflict):
+        store.begin("key-1", dict(REQUEST, phoneNumber="+34600000001"))
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_failures_before_submission_free_the_key(status):
+    store = IdempotencyStore()
+    entry, _ = store.begin("key-1", REQUEST)
+    store.complete(entry, {"success": False, "error": "not placed"}, status)
+
+    _, is_first = store.begin("key-1", REQUEST)
+    assert is_first
+
+
+def test_unknown_outcome_keeps_the_key():
+    # The submit timed out after it was sent: the batch may exist, so a retry must not dial again
+    store = IdempotencyStore()
+    entry, _ = store.begin("key-1", REQUEST)
+    store.complete(entry, {"success": False, "outcome_unknown": True, "error": "read timeout"}, 504)
+
+    replay, is_first = store.begin("key-1", REQUEST)
+    assert not is_first
+    assert replay.body["outcome_unknown"]
+
+
+def test_forget_frees_a_completed_key():
+    store = IdempotencyStore()
+    entry, _ = store.begin("key-1", REQUEST)
+    store.complete(entry, {"success": True, "job_id": "job_1"}, 202)
+    store.forget(entry)
+
+    _, is_first = store.begin("key-1", REQUEST)
+    assert is_first
@@ -0,0 +1,45 @@
+from src.extraction.incremental import LiveExtractionStore
+from src.extraction.language_packs import MEDICATION_YES
+
+QUESTIONS = ["Have you been taking your medication?", "What is your email address?"]
+
+
+def test_utterances_fill_in_answers_and_call_ended_is_recorded():
+    store = LiveExtractionStore()
+    state = store.start("btcal_1", QUESTIONS, "en")
+    state.add_utterance("Have you been taking your medication?", "u1", "agent")
+    state.add_utterance("Yes, I take it every day", "u2", "user")
+    state.add_utterance("Yes, I take it every day", "u2", "user")  # Redelivered webhook
+    state.add_utterance("It is jane@example.com", "u3", "user")
+    assert not state.ended
+
+    state.mark_ended("conv_1")
+    answers = state.finalize()
+    assert state.ended and state.conversation_id == "conv_1"
+    assert len(state.utterances) == 3
+    assert answers["question_1"]["answer"] == MEDICATION_YES
+    assert answers["question_2"]["answer"] == "jane@example.com"
+
+
+def test_states_expire_after_max_age():
+    store = LiveExtractionStore(max_age=0)
+    store.start("btcal_1", QUESTIONS)
+    store.start("btcal_2", QUESTIONS)
+    assert store.get("btcal_1") is None
+    assert len(store) == 1
+
+
+def test_store_is_bounded():
+    store = LiveExtractionStore(max_entries=2)
+    for i in range(5):
+        store.start(f"btcal_{i}", QUESTIONS)
+    assert len(store) == 2
+    assert store.get("btcal_4") is not None
+
+
+def test_pop_forgets_the_state():
+    store = LiveExtractionStore()
+    store.start("btcal_1", QUESTIONS)
+    assert store.pop("btcal_1") is not None
+    assert store.pop("btcal_1") is None
+    assert len(store) == 0
@@ -0,0 +1,45 @@
+import time
+
+from src.jobs.job_queue import JobQueue, RetryLater
+
+
+def wait_for_status(queue, job_id, status, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"{job_id} is {queue.get(job_id)['status']}, not {status}")
+
+
+def test_retries_give_up_after_max_attempts():
+    queue = JobQueue(lambda event, payload, room: None)
+    runs = []
+
+    def job(progress):
+        runs.append(1)
+        raise RetryLater("upstream busy", 0.01)
+
+    job_id = queue.submit("make_call", job, max_attempts=3)["job_id"]
+    job = wait_for_status(queue, job_id, "failed")
+    assert len(runs) == 3
+    assert "gave up after 3 attempts" in job["error"]
+
+
+def test_waits_that_do_not_count_leave_the_attempts_alone():
+    queue = JobQueue(lambda event, payload, room: None)
+    runs = []
+
+    def job(progress):
+        runs.append(1)
+        if len(runs) <= 3:
+            # E.g. waiting out an open circuit: the call was never tried
+            raise RetryLater("circuit open", 0.01, counts=False)
+        return {"success": True}
+
+    job_id = queue.submit("make_call", job, max_attempts=1)["job_id"]
+    job = wait_for_status(queue, job_id, "succeeded")
+    assert len(runs) == 4
+    assert job["attempts"] == 1
+    assert queue.stats()["pending"] == 0
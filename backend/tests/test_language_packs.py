@@ -0,0 +1,15 @@
+from src.extraction.language_packs import MEDICATION_NO, MEDICATION_PARTIAL, MEDICATION_YES, get_rule_pack
+
+
+def test_spanish_negated_medication_answers_are_no():
+    pack = get_rule_pack("es")
+    assert pack.find_medication("no lo tomo") == MEDICATION_NO
+    assert pack.find_medication("no, no la tomo nunca") == MEDICATION_NO
+    assert pack.find_medication("ya no tomo la pastilla") == MEDICATION_NO
+
+
+def test_spanish_affirmative_and_partial_medication_answers():
+    pack = get_rule_pack("es")
+    assert pack.find_medication("sí, lo tomo todos los días") == MEDICATION_YES
+    assert pack.find_medication("la tomo como me indicaron") == MEDICATION_YES
+    assert pack.find_medication("a veces se me olvida") == MEDICATION_PARTIAL
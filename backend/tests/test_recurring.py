@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from src.campaigns.recurring import RecurringScheduler
+
+WEEK = 7 * 24 * 3600
+
+
+@pytest.fixture
+def outcomes():
+    return []
+
+
+@pytest.fixture
+def scheduler(tmp_path, outcomes):
+    def dispatch(template_id, language, schedules):
+        return {schedule["id"]: outcomes.pop(0) for schedule in schedules}
+
+    scheduler = RecurringScheduler(str(tmp_path / "recurring.db"), dispatch, retry_seconds=300)
+    scheduler.ensure_started = lambda: None  # Runs are driven by the test, not the tick thread
+    return scheduler
+
+
+def run_due(scheduler, schedule):
+    scheduler._dispatch([schedule["id"]])
+    return scheduler.get(schedule["id"])
+
+
+def test_success_moves_on_by_the_full_interval(scheduler, outcomes):
+    due = time.time() - 1
+    schedule = scheduler.upsert("Ana", "+34600000000", "hypertension", "es", WEEK, start_at=due)
+    outcomes.append({"success": True, "batch_call_id": "btcal_1"})
+
+    schedule = run_due(scheduler, schedule)
+    assert schedule["next_run_unix"] == pytest.approx(due + WEEK)
+    assert schedule["run_count"] == 1
+    assert schedule["failures"] == 0
+
+
+def test_failure_retries_soon_and_keeps_the_cadence(scheduler, outcomes):
+    due = time.time() - 1
+    schedule = scheduler.upsert("Ana", "+34600000000", "hypertension", "es", WEEK, start_at=due)
+
+    outcomes.append({"success": False, "error": "too many calls", "retry_after": 5})
+    schedule = run_due(scheduler, schedule)
+    assert schedule["next_run_unix"] == pytest.approx(time.time() + 5, abs=1)
+    assert schedule["retry_of_unix"] == pytest.approx(due)
+    assert schedule["run_count"] == 0
+
+    outcomes.append({"success": False, "error": "circuit open"})
+    schedule = run_due(scheduler, schedule)
+    assert schedule["next_run_unix"] == pytest.approx(time.time() + 600, abs=1)  # Second failure: doubled
+    assert schedule["failures"] == 2
+
+    outcomes.append({"success": True, "batch_call_id": "btcal_1"})
+    schedule = run_due(scheduler, schedule)
+    assert schedule["next_run_unix"] == pytest.approx(due + WEEK)
+    assert schedule["retry_of"] is None
+    assert schedule["failures"] == 0
+    assert scheduler.stats()["retried"] == 2
+
+
+def test_skip_moves_on_by_the_full_interval(scheduler, outcomes):
+    due = time.time() - 1
+    schedule = scheduler.upsert("Ana", "+34600000000", "hypertension", "es", WEEK, start_at=due)
+    outcomes.append({"success": False, "skipped": True, "error": "Number is on the do-not-call list"})
+
+    schedule = run_due(scheduler, schedule)
+    assert schedule["next_run_unix"] == pytest.approx(due + WEEK)
+    assert schedule["retry_of"] is None
+
+
+def test_retries_stop_when_the_next_run_is_due(scheduler, outcomes):
+    due = time.time() - 1
+    schedule = scheduler.upsert("Ana", "+34600000000", "hypertension", "es", 600, start_at=due)
+    outcomes.append({"success": False, "error": "upstream error", "retry_after": 900})
+
+    schedule = run_due(scheduler, schedule)
+    assert schedule["next_run_unix"] == pytest.approx(due + 600)
+    assert schedule["retry_of"] is None
+    assert scheduler.stats()["failed"] == 1
@@ -0,0 +1,90 @@
+import threading
+import time
+
+from src.reliability.status_cache import StatusCache
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_fresh_and_terminal_results_are_served_from_the_cache():
+    fetches = []
+
+    def fetch(batch_call_id):
+        fetches.append(batch_call_id)
+        return {"success": True, "status": "completed" if batch_call_id == "btcal_done" else "in_progress"}
+
+    cache = StatusCache(fetch, ttl=60)
+    cache.get("btcal_live")
+    cache.get("btcal_done")
+    assert cache.peek("btcal_live")[1] == "fresh"
+    assert cache.peek("btcal_done")[1] == "terminal"
+    assert cache.terminal("btcal_done")["status"] == "completed"
+    assert cache.terminal("btcal_live") is None
+    assert fetches == ["btcal_live", "btcal_done"]
+
+
+def test_stale_result_is_served_while_one_refresh_runs():
+    refreshed = threading.Event()
+    updates = []
+    statuses = ["pending", "in_progress"]
+
+    def fetch(batch_call_id):
+        status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+        if status == "in_progress":
+            refreshed.wait(2.0)
+        return {"success": True, "status": status}
+
+    cache = StatusCache(fetch, on_update=lambda batch_call_id, result: updates.append(result["status"]),
+                        ttl=0, stale_ttl=60)
+    cache.get("btcal_1")
+    # Both reads get the old value at once; only the first starts a refresh
+    assert cache.peek("btcal_1") == ({"success": True, "status": "pending"}, "stale")
+    assert cache.peek("btcal_1")[1] == "stale"
+    assert cache.stats()["refreshes"] == 1
+
+    refreshed.set()
+    assert wait_for(lambda: updates == ["in_progress"])
+    assert cache.get("btcal_1")["status"] == "in_progress"
+
+
+def test_concurrent_misses_share_one_fetch():
+    release = threading.Event()
+    fetches = []
+
+    def fetch(batch_call_id):
+        fetches.append(batch_call_id)
+        release.wait(2.0)
+        return {"success": True, "status": "in_progress"}
+
+    cache = StatusCache(fetch)
+    results = []
+    readers = [threading.Thread(target=lambda: results.append(cache.get("btcal_1"))) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    assert wait_for(lambda: cache.stats()["refreshing"] == 1 and cache.stats()["miss"] == 4)
+    release.set()
+    for reader in readers:
+        reader.join(2.0)
+
+    assert fetches == ["btcal_1"]
+    assert [result["status"] for result in results] == ["in_progress"] * 4
+
+
+def test_failed_fetch_falls_back_to_the_last_known_result():
+    responses = iter([
+        {"success": True, "status": "in_progress"},
+        {"success": False, "error": "circuit open"},
+    ])
+    cache = StatusCache(lambda batch_call_id: next(responses), ttl=0, stale_ttl=0)
+    cache.get("btcal_1")
+
+    result = cache.get("btcal_1")
+    assert result == {"success": True, "status": "in_progress", "stale": True}
+    assert cache.stats()["stale_on_error"] == 1
@@ -127,7 +127,7 @@ function App() {
                 clearInterval(interval)
                 setPollingInterval(null)
               } else {
-                setCallStatus('✅ Call completed! Click "Get Results" to fetch the conversation.')
+                setCallStatus('✅ Call completed! Processing the conversation...')
               }
             } else if (status === 'failed' || status === 'cancelled') {
               setCallStatus(`❌ Call ${status}`)
@@ -296,7 +296,10 @@ function App() {
       
       const data = await response.json()
       
-      if (data.success) {
+      if (response.status === 202) {
+        // Processing runs in the background; status polling picks up the results
+        setCallStatus('⏳ Processing conversation... results will appear automatically.')
+      } else if (data.success) {
         setCallResults(data.results)
         setCallStatus('✅ Conversation results retrieved!')
         setDebugInfo(null) // Clear debug info on success